@@ -0,0 +1,107 @@
+"""
+Compares page text extraction strategies over a local corpus of saved HTML pages.
+
+Usage:
+    python scripts/benchmark_extraction.py --corpus tests/fixtures/html_corpus --repeat 3
+
+Every `<name>.html` in the corpus is extracted with the previous approach
+(BeautifulSoup html.parser, whole-page get_text, first 5000 chars) and with
+ContentExtractor on each installed backend. An optional `<name>.txt` next to
+a page holds its hand-copied article text; the useful-text ratio is then the
+share of extracted words that belong to the article. Without it, the ratio
+falls back to the share of extracted text in sentence-like lines.
+
+The default corpus, tests/fixtures/html_corpus, is a handful of small pages
+with the usual boilerplate (cookie banner, navigation, related links,
+sidebars, footer) and hand-labelled article text. Point --corpus at a
+directory of saved real pages for representative timings.
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bs4 import BeautifulSoup
+from src.search.extractor import ContentExtractor
+from src.utils.text import tokenize
+
+MAX_CHARS = 5000
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tests', 'fixtures', 'html_corpus')
+
+def get_text_baseline(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    for script in soup(["script", "style"]):
+        script.decompose()
+    text = soup.get_text()
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    return ' '.join(chunk for chunk in chunks if chunk)[:MAX_CHARS]
+
+def useful_ratio(text, gold):
+    if not text:
+        return 0.0
+    if gold is not None:
+        available = Counter(tokenize(gold, drop_stopwords=False))
+        words = tokenize(text, drop_stopwords=False)
+        useful = 0
+        for word in words:
+            if available[word] > 0:
+                available[word] -= 1
+                useful += 1
+        return useful / len(words) if words else 0.0
+    sentences = re.split(r'(?<=[.!?])\s+|\n', text)
+    useful = sum(len(s) for s in sentences if len(s.split()) >= 8 and s.rstrip()[-1:] in '.!?')
+    return useful / len(text)
+
+def load_corpus(corpus):
+    pages = []
+    for path in sorted(glob.glob(os.path.join(corpus, '*.html'))):
+        with open(path, 'rb') as f:
+            html = f.read().decode('utf-8', errors='replace')
+        gold_path = os.path.splitext(path)[0] + '.txt'
+        gold = None
+        if os.path.exists(gold_path):
+            with open(gold_path, 'r', encoding='utf-8', errors='replace') as f:
+                gold = f.read()
+        pages.append((os.path.basename(path), html, gold))
+    return pages
+
+def run(name, extract, pages, repeat):
+    elapsed, ratios, chars = 0.0, [], 0
+    for _, html, gold in pages:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            text = extract(html)
+        elapsed += (time.perf_counter() - start) / repeat
+        ratios.append(useful_ratio(text, gold))
+        chars += len(text)
+    print(
+        f'{name:<28} {elapsed / len(pages) * 1000:8.2f} ms/page '
+        f'{sum(ratios) / len(ratios):8.1%} useful {chars // len(pages):7d} chars/page'
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark page text extraction')
+    parser.add_argument('--corpus', default=CORPUS, help='Directory of saved .html pages')
+    parser.add_argument('--repeat', type=int, default=3, help='Extractions per page, averaged')
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus)
+    if not pages:
+        print(f'No .html files found in {args.corpus}')
+        return
+    labelled = sum(1 for _, _, gold in pages if gold is not None)
+    print(f'{len(pages)} pages, {labelled} with article text\n')
+
+    run('get_text (previous)', get_text_baseline, pages, args.repeat)
+    for backend in ContentExtractor.available_backends():
+        extractor = ContentExtractor(max_chars=MAX_CHARS, backend=backend)
+        run(f'extractor ({backend})', extractor.extract, pages, args.repeat)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Load-tests the SSE server with concurrent clients.
+
+Usage:
+    python -m src.server --port 8000 --max-concurrent 8
+    python scripts/load_test.py --url http://127.0.0.1:8000 --clients 8 --requests 3
+
+Each client has its own session and sends its requests one after another.
+Per request it records the time to the first token event, the tokens per
+second from the first token to the end of the stream, and whether the server
+refused it (503). Tokens are counted as streamed chunks, one per token with
+Ollama. --disconnect-after N drops every stream after N tokens, to check
+that abandoned generations stop.
+"""
+import argparse
+import http.client
+import json
+import statistics
+import threading
+import time
+from urllib.parse import urlparse
+
+def run_request(url, prompt, session_id, disconnect_after=0, timeout=300):
+    """
+    Sends one /chat request and reads its event stream.
+
+    Returns:
+        dict: status, ttft (s), tokens, tokens_per_sec, total (s) and error
+    """
+    target = urlparse(url)
+    connection = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=timeout)
+    result = {'status': None, 'ttft': None, 'tokens': 0, 'tokens_per_sec': None, 'total': None, 'error': None}
+    start = time.perf_counter()
+    first_token_at = None
+    try:
+        body = json.dumps({'prompt': prompt, 'session_id': session_id})
+        connection.request('POST', '/chat', body=body, headers={'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        result['status'] = response.status
+        if response.status != 200:
+            response.read()
+            return result
+
+        event = None
+        for raw in response:
+            line = raw.decode('utf-8').rstrip('\n')
+            if line.startswith('event: '):
+                event = line[7:]
+            elif line.startswith('data: ') and event == 'token':
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                    result['ttft'] = first_token_at - start
+                result['tokens'] += 1
+                if disconnect_after and result['tokens'] >= disconnect_after:
+                    break
+            elif line.startswith('data: ') and event == 'error':
+                result['error'] = json.loads(line[6:]).get('error')
+    except (OSError, http.client.HTTPException) as e:
+        result['error'] = str(e)
+    finally:
+        connection.close()
+
+    end = time.perf_counter()
+    result['total'] = end - start
+    if first_token_at is not None and result['tokens'] > 1 and end > first_token_at:
+        result['tokens_per_sec'] = (result['tokens'] - 1) / (end - first_token_at)
+    return result
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(int(share * len(ordered)), len(ordered) - 1)]
+
+def summarize(results, wall_time):
+    ok = [r for r in results if r['status'] == 200 and r['ttft'] is not None]
+    refused = sum(1 for r in results if r['status'] == 503)
+    failed = len(results) - len(ok) - refused
+    print(f"Requests: {len(results)} ({len(ok)} streamed, {refused} refused with 503, {failed} failed)")
+    if not ok:
+        return
+    ttfts = [r['ttft'] for r in ok]
+    rates = [r['tokens_per_sec'] for r in ok if r['tokens_per_sec']]
+    tokens = sum(r['tokens'] for r in ok)
+    print(
+        f"TTFT: mean {statistics.mean(ttfts):.3f}s, p50 {percentile(ttfts, 0.5):.3f}s, "
+        f"p95 {percentile(ttfts, 0.95):.3f}s, max {max(ttfts):.3f}s"
+    )
+    if rates:
+        print(
+            f"Tokens/sec per stream: mean {statistics.mean(rates):.1f}, "
+            f"p50 {percentile(rates, 0.5):.1f}, min {min(rates):.1f}"
+        )
+    print(f"Aggregate: {tokens} tokens in {wall_time:.2f}s = {tokens / wall_time:.1f} tokens/sec")
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the assistant SSE server')
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--clients', type=int, default=4, help='Concurrent clients')
+    parser.add_argument('--requests', type=int, default=2, help='Sequential requests per client')
+    parser.add_argument('--prompt', default='Tell me something interesting about the history of tea -fast')
+    parser.add_argument('--disconnect-after', type=int, default=0, help='Drop each stream after N tokens')
+    args = parser.parse_args()
+
+    results = []
+    lock = threading.Lock()
+
+    def client(index):
+        for _ in range(args.requests):
+            result = run_request(args.url, args.prompt, f'load-{index}', args.disconnect_after)
+            with lock:
+                results.append(result)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    summarize(results, time.perf_counter() - start)
+
+if __name__ == '__main__':
+    main()
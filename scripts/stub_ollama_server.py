@@ -0,0 +1,119 @@
+"""
+Minimal stand-in for the Ollama HTTP API, for exercising the model scheduler,
+streaming and cancellation without loading real models.
+
+Usage:
+    python scripts/stub_ollama_server.py --port 11435 --token-delay 0.02
+    OLLAMA_HOST=http://127.0.0.1:11435 python -m src.main
+
+Implements /api/chat and /api/generate (streamed NDJSON or single JSON).
+Replies are canned per system prompt so the gates of the assistant get
+answers they can parse.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+class StubState:
+    token_delay = 0.02
+    reply_words = 40
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+def canned_reply(body):
+    messages = body.get('messages') or []
+    system = ' '.join(m.get('content', '') for m in messages if m.get('role') == 'system')
+    if body.get('format'):
+        return '{"personal_info": {}, "interests": [], "preferences": {}}'
+    if 'select the best' in system:
+        return '0'
+    if 'evaluates' in system or 'Opinion Check' in system:
+        return 'True'
+    if 'memory analyzer' in system:
+        return '{"personal_info": {}, "interests": [], "preferences": {}}'
+    if 'query generator' in system:
+        return 'latest world news'
+    return ' '.join(['token'] * StubState.reply_words)
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length) or b'{}')
+        with StubState.lock:
+            StubState.active += 1
+            StubState.max_active = max(StubState.max_active, StubState.active)
+        try:
+            self._respond(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client cancelled the generation
+        finally:
+            with StubState.lock:
+                StubState.active -= 1
+
+    def _respond(self, body):
+        key = 'message' if self.path == '/api/chat' else 'response'
+        # Load/prefill requests (no messages or num_predict=1) answer with a single token
+        if (not body.get('messages') and not body.get('prompt')) or (body.get('options') or {}).get('num_predict') == 1:
+            words = ['']
+        else:
+            words = canned_reply(body).split(' ')
+
+        def chunk(text, done):
+            data = {'model': body.get('model', ''), 'created_at': '2024-01-01T00:00:00Z', 'done': done}
+            data[key] = {'role': 'assistant', 'content': text} if key == 'message' else text
+            if done:
+                data.update(done_reason='stop', prompt_eval_count=len(json.dumps(body)) // 4, eval_count=len(words))
+            return data
+
+        if body.get('stream', True) is False:
+            time.sleep(StubState.token_delay * len(words))
+            payload = json.dumps(chunk(' '.join(words), True)).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for index, word in enumerate(words):
+            time.sleep(StubState.token_delay)
+            text = word if index == len(words) - 1 else word + ' '
+            self._write_chunk((json.dumps(chunk(text, False)) + '\n').encode())
+        self._write_chunk((json.dumps(chunk('', True)) + '\n').encode())
+        self.wfile.write(b'0\r\n\r\n')
+
+    def _write_chunk(self, data):
+        self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+def main():
+    parser = argparse.ArgumentParser(description='Stub Ollama server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11435)
+    parser.add_argument('--token-delay', type=float, default=0.02, help='Seconds between streamed tokens')
+    parser.add_argument('--reply-words', type=int, default=40, help='Length of free-form replies')
+    args = parser.parse_args()
+
+    StubState.token_delay = args.token_delay
+    StubState.reply_words = args.reply_words
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    print(f'Stub Ollama listening on http://{args.host}:{args.port}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f'Max concurrent requests: {StubState.max_active}')
+
+if __name__ == '__main__':
+    main()
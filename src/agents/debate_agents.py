@@ -5,14 +5,20 @@ from src.config import system_messages as msgs
 from src.search.query import QueryGenerator
 from src.search.search_engine import SearchEngine
 from src.search.scraper import WebScraper
+from src.agents.debate_research import DebateResearcher
+from src.agents.debate_scheduler import DebateScheduler, DebateStage
+from src.pipeline.prompt_builder import PromptBuilder
 from src.utils.thinking_indicator import ThinkingIndicator
 from src.utils.colors import Colors
 
 class DebateController:
-    def __init__(self):
-        self.query_generator = QueryGenerator()
-        self.search_engine = SearchEngine()
-        self.scraper = WebScraper()
+    def __init__(self, query_generator=None, search_engine=None, scraper=None):
+        # Share the assistant's search components (and their HTTP connection pool) when given
+        self.query_generator = query_generator or QueryGenerator()
+        self.search_engine = search_engine or SearchEngine()
+        self.scraper = scraper or WebScraper()
+        self.researcher = DebateResearcher(self.query_generator, self.search_engine, self.scraper)
+        self.scheduler = DebateScheduler()
         self.name_prefixes = [
             "Logic", "Reason", "Wisdom", "Truth", "Think", "Mind",
             "Brain", "Intel", "Smart", "Sage", "Know", "Bright"
@@ -27,7 +33,7 @@ class DebateController:
         suffix = random.choice(self.name_suffixes)
         return f"{prefix}{suffix}"
 
-    def run_debate(self, convo, fast_mode=False):
+    def run_debate(self, convo, fast_mode=False, session='default', on_token=None):
         # Skip debate if the last message is too short or just a greeting
         last_message = convo[-1]['content']
         if len(last_message.split()) < 30:
@@ -38,6 +44,9 @@ class DebateController:
         
         # Get the topic and make it more debatable
         topic = convo[-1]['content']
+
+        # One search serves both agents; pages keep downloading while the first agent streams
+        research = self.researcher.start(topic, session)
         debate_context = (
             f"DEBATE TOPIC: The implications and impacts of these current events:\n{topic}\n\n"
             "Consider:\n"
@@ -49,134 +58,51 @@ class DebateController:
         )
         
         model = 'llama3.2:3b' if fast_mode else 'deepseek-r1:7b'
-        
-        # First Agent - Light blue
-        first_color = Fore.LIGHTBLUE_EX
         first_name = self._generate_agent_name()
-        Colors.print(f"{first_name} (First Agent)", Colors.FIRST_AGENT)
-        
-        research_context = self._get_research_context(topic, "research needed to support arguments about this topic")
-        first_context = f"{debate_context}\n\nRESEARCH CONTEXT:\n{research_context}" if research_context else debate_context
-        
-        first_response = self._get_agent_response(
-            msgs.first_debate_agent_msg,
-            [{'role': 'user', 'content': first_context}],
-            model,
-            first_color
-        )
-        if first_response:
-            convo.append({'role': 'assistant', 'content': first_response})
-            print('\n')
-            
+
+        def first_context(results):
+            research_context = research.supporting()
+            content = f"{debate_context}\n\nRESEARCH CONTEXT:\n{research_context}" if research_context else debate_context
+            return [{'role': 'user', 'content': content}]
+
+        def second_context(results):
             # Second Agent with research capability
-            print(f'{Fore.CYAN}[Second Agent]{" "*26}{Style.RESET_ALL}')
-            counter_research = self._get_research_context(topic, "research needed to counter these arguments")
-            second_context = (
+            counter_research = research.counter()
+            content = (
                 f"FIRST POSITION ON THE IMPLICATIONS OF:\n{topic}\n\n"
-                f"THEIR ARGUMENT:\n{first_response}\n\n"
-                f"RESEARCH CONTEXT:\n{counter_research}\n\n" if counter_research else ""
-                "Present a counter-argument about the implications and impacts. "
+                f"THEIR ARGUMENT:\n{results['first']}\n\n"
+                + (f"RESEARCH CONTEXT:\n{counter_research}\n\n" if counter_research else "")
+                + "Present a counter-argument about the implications and impacts. "
                 "You MUST take the opposite position on how these events should be interpreted."
             )
-            second_response = self._get_agent_response(
-                msgs.second_debate_agent_msg,
-                [{'role': 'user', 'content': second_context}],
-                model,
-                Fore.LIGHTGREEN_EX
+            return [{'role': 'user', 'content': content}]
+
+        def analysis_context(results):
+            # Third Party Analysis - gets both responses
+            content = (
+                f"TOPIC: {topic}\n\n"
+                f"FIRST POSITION:\n{results['first']}\n\n"
+                f"SECOND POSITION:\n{results['second']}\n\n"
+                "Analyze these opposing viewpoints."
             )
-            if second_response:
-                convo.append({'role': 'assistant', 'content': second_response})
-                print('\n')
-                
-                # Third Party Analysis - gets both responses
-                print(f'{Fore.CYAN}[Third Party Analysis]{" "*20}{Style.RESET_ALL}')
-                analysis_context = (
-                    f"TOPIC: {topic}\n\n"
-                    f"FIRST POSITION:\n{first_response}\n\n"
-                    f"SECOND POSITION:\n{second_response}\n\n"
-                    "Analyze these opposing viewpoints."
-                )
-                analysis = self._get_agent_response(
-                    msgs.third_party_analyzer_msg,
-                    [{'role': 'user', 'content': analysis_context}],
-                    model,
-                    Fore.LIGHTMAGENTA_EX
-                )
-                if analysis:
-                    convo.append({'role': 'assistant', 'content': analysis})
-                    print('\n')
-                    
-                    # Add fun summary
-                    print(f'{Fore.CYAN}[Quick Summary]{" "*20}{Style.RESET_ALL}')
-                    summary = self._get_agent_response(
-                        msgs.summary_agent_msg,
-                        [{'role': 'user', 'content': analysis}],
-                        'llama3.2:3b',
-                        Fore.CYAN
-                    )
-                    if summary:
-                        convo.append({'role': 'assistant', 'content': summary})
-                        print('\n')
+            return [{'role': 'user', 'content': content}]
+
+        stages = [
+            DebateStage('first', f"{first_name} (First Agent)", model, msgs.first_debate_agent_msg,
+                        first_context, Colors.FIRST_AGENT, Colors.FIRST_AGENT),
+            DebateStage('second', "Second Agent", model, msgs.second_debate_agent_msg,
+                        second_context, Colors.SECOND_AGENT),
+            DebateStage('analysis', "Third Party Analysis", model, msgs.third_party_analyzer_msg,
+                        analysis_context, Colors.ANALYZER),
+            # Add fun summary
+            DebateStage('summary', "Quick Summary", 'llama3.2:3b', msgs.summary_agent_msg,
+                        lambda results: [{'role': 'user', 'content': results['analysis']}], Colors.SUMMARY)
+        ]
+
+        # Load the debate model while the research runs
+        self.scheduler.warm(stages[0], session)
+        for stage, response in self.scheduler.run(stages, session, on_token):
+            # Tagged so the context window sheds transcripts first once the conversation grows
+            convo.append(PromptBuilder.message('assistant', response, 'debate'))
         
         return convo
-        
-    def _get_agent_response(self, system_msg, context, model='llama3.2:3b', color=Fore.YELLOW):
-        try:
-            response_stream = ollama.chat(
-                model=model,
-                messages=[
-                    {'role': 'system', 'content': system_msg},
-                    *context
-                ],
-                stream=True
-            )
-            
-            complete_response = ''
-            for chunk in response_stream:
-                print(f'{color}{chunk["message"]["content"]}{Style.RESET_ALL}', end='', flush=True)
-                complete_response += chunk["message"]["content"]
-                
-            return complete_response
-            
-        except Exception as e:
-            print(f'{Fore.RED}[Error: {str(e)}]{Style.RESET_ALL}')
-            return None
-
-    def _get_research_context(self, topic, research_purpose):
-        print(f'{Fore.CYAN}[Searching for debate context]{" "*5}{Style.RESET_ALL}')
-        try:
-            # Extract actual text content, removing any <think> tags and their content
-            clean_topic = ' '.join([
-                line for line in topic.split('\n') 
-                if not line.strip().startswith('<think>') and 
-                not line.strip().startswith('</think>')
-            ])
-            
-            # Use the query generator instead of custom logic
-            query = self.query_generator.generate([{'role': 'user', 'content': clean_topic}])
-            print(f'{Fore.GREEN}[Research query: {query}]{Style.RESET_ALL}')
-            
-            # Search
-            results = self.search_engine.search(query)
-            if not results:
-                print(f'{Fore.YELLOW}[No search results found, using base context]{Style.RESET_ALL}')
-                return (
-                    "Consider discussing these aspects:\n"
-                    "- Current political landscape\n"
-                    "- Recent policy developments\n"
-                    "- Public opinion and reactions\n"
-                    "- Potential future implications"
-                )
-                
-            for result in results:
-                content = self.scraper.scrape(result['link'])
-                if content and len(content.strip()) > 200:
-                    print(f'{Fore.GREEN}[Found relevant content]{Style.RESET_ALL}')
-                    return content[:2000]  # Limit content length
-            
-            print(f'{Fore.YELLOW}[No useful content found, using base context]{Style.RESET_ALL}')
-            return "Consider discussing current events and their implications based on available information."
-            
-        except Exception as e:
-            print(f'{Fore.RED}[Research error: {str(e)}]{Style.RESET_ALL}')
-            return None 
\ No newline at end of file
@@ -0,0 +1,130 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from colorama import Fore, Style
+from src.search.content_quality import ContentScorer
+from src.search.passages import PassageSelector
+
+NO_RESULTS_CONTEXT = (
+    "Consider discussing these aspects:\n"
+    "- Current political landscape\n"
+    "- Recent policy developments\n"
+    "- Public opinion and reactions\n"
+    "- Potential future implications"
+)
+
+NO_CONTENT_CONTEXT = "Consider discussing current events and their implications based on available information."
+
+class ResearchJob:
+    """
+    Research for one debate, running in the background.
+
+    The pages of a single search are fetched concurrently. The first useful page
+    becomes the supporting evidence for the first agent; the remaining pages
+    are kept as counter evidence and keep downloading while the first agent streams.
+    Each side gets the passages most relevant to the research query, within `max_tokens`.
+    """
+
+    def __init__(self, max_tokens, selector=None):
+        self.max_tokens = max_tokens
+        self.selector = selector or PassageSelector()
+        self.query = ''
+        self.pages = []
+        self.fallback = None
+        self._first_page = threading.Event()
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    def add_page(self, page):
+        with self._lock:
+            self.pages.append(page)
+        self._first_page.set()
+
+    def finish(self, fallback=None):
+        self.fallback = fallback
+        self._first_page.set()
+        self._done.set()
+
+    def supporting(self, timeout=None):
+        """Waits for the first useful page (or the end of research) and returns it as context."""
+        self._first_page.wait(timeout)
+        with self._lock:
+            pages = self.pages[:1]
+        return self._format(pages)
+
+    def counter(self, timeout=None):
+        """Waits for the remaining pages and returns the ones not used as supporting evidence."""
+        self._done.wait(timeout)
+        with self._lock:
+            # With a single useful page both sides argue from the same source
+            pages = self.pages[1:] or self.pages[:1]
+        return self._format(pages)
+
+    def _format(self, pages):
+        if not pages:
+            return self.fallback
+        budget = self.max_tokens // len(pages)
+        return '\n\n'.join(self.selector.select(page, self.query, max_tokens=budget) for page in pages)
+
+class DebateResearcher:
+    """Runs one search per debate and splits the fetched pages into supporting and counter evidence."""
+
+    def __init__(self, query_generator, search_engine, scraper, max_pages=4, max_tokens=500):
+        self.query_generator = query_generator
+        self.search_engine = search_engine
+        self.scraper = scraper
+        self.max_pages = max_pages
+        self.max_tokens = max_tokens
+        self.selector = PassageSelector()
+        self.content_scorer = ContentScorer()
+        self.executor = ThreadPoolExecutor(max_workers=max_pages, thread_name_prefix='debate-research')
+
+    def start(self, topic, session='default'):
+        """Starts researching `topic` in the background and returns the ResearchJob immediately."""
+        job = ResearchJob(self.max_tokens, self.selector)
+        threading.Thread(target=self._run, args=(job, topic, session), daemon=True).start()
+        return job
+
+    def _run(self, job, topic, session):
+        print(f'{Fore.CYAN}[Searching for debate context]{" "*5}{Style.RESET_ALL}')
+        try:
+            # Extract actual text content, removing any <think> tags and their content
+            clean_topic = ' '.join([
+                line for line in topic.split('\n')
+                if not line.strip().startswith('<think>') and
+                not line.strip().startswith('</think>')
+            ])
+
+            query = self.query_generator.generate([{'role': 'user', 'content': clean_topic}], session)
+            print(f'{Fore.GREEN}[Research query: {query}]{Style.RESET_ALL}')
+            job.query = query
+
+            results = self.search_engine.search(query)
+            if not results:
+                print(f'{Fore.YELLOW}[No search results found, using base context]{Style.RESET_ALL}')
+                job.finish(NO_RESULTS_CONTEXT)
+                return
+
+            futures = [
+                self.executor.submit(self._fetch, job, result['link'], query)
+                for result in results[:self.max_pages]
+            ]
+            for future in futures:
+                future.result()
+
+            if not job.pages:
+                print(f'{Fore.YELLOW}[No useful content found, using base context]{Style.RESET_ALL}')
+            job.finish(NO_CONTENT_CONTEXT)
+
+        except Exception as e:
+            print(f'{Fore.RED}[Research error: {str(e)}]{Style.RESET_ALL}')
+            job.finish()
+
+    def _fetch(self, job, link, query):
+        try:
+            content = self.scraper.scrape(link)
+            # Cookie walls, bot checks and navigation-only pages make poor evidence
+            if content and self.content_scorer.assess(content, query)['verdict'] != 'reject':
+                print(f'{Fore.GREEN}[Found relevant content]{Style.RESET_ALL}')
+                job.add_page(content)
+        except Exception as e:
+            print(f'{Fore.RED}[Research error: {str(e)}]{Style.RESET_ALL}')
@@ -0,0 +1,147 @@
+import threading
+import time
+from colorama import Fore, Style
+from src.utils.colors import Colors
+from src.utils.metrics import Metrics
+from src.utils.model_manager import ModelManager, GenerationCancelled
+
+class DebateStage:
+    """One streamed model call of a debate."""
+
+    def __init__(self, name, header, model, system_msg, build_context, color, header_color=Colors.SYSTEM):
+        """
+        Args:
+            name (str): Key of this stage's response in the results passed to later stages
+            header (str): Text announced before the stage streams
+            model (str): Model answering this stage
+            system_msg (str): Static system prompt of the stage
+            build_context (callable): Takes the results so far and returns the user messages
+            color (str): Colorama color of the streamed tokens
+            header_color (str, optional): Color of the announcement. Defaults to Colors.SYSTEM.
+        """
+        self.name = name
+        self.header = header
+        self.model = model
+        self.system_msg = system_msg
+        self.build_context = build_context
+        self.color = color
+        self.header_color = header_color
+
+class DebateScheduler:
+    """
+    Runs debate stages back to back while overlapping their setup.
+
+    Stages depend on each other's full output, so generation itself stays
+    sequential. As soon as a stage produces its first token, the next
+    stage's model is loaded and its static system prompt is prefilled in
+    the background, so model load and prompt evaluation of stage N+1 overlap
+    with token generation of stage N.
+
+    For every stage the scheduler reports:
+    - queue: time from the previous stage finishing until the request is sent
+      (building the context, e.g. waiting for research)
+    - prefill: time from sending the request until the first token
+    - generation: time from the first token until the stream ends
+    """
+
+    def run(self, stages, session='default', on_token=None):
+        """
+        Streams every stage in order, stopping at the first stage without a response.
+
+        Args:
+            stages (list): DebateStage objects, in order
+            session (str, optional): Session the debate belongs to, for fair queuing. Defaults to 'default'.
+            on_token (callable, optional): on_token(stage_name, text) called for every streamed chunk
+
+        Returns:
+            list: (stage, response) tuples of the stages that completed
+        """
+        results = {}
+        completed = []
+        timings = []
+        try:
+            for index, stage in enumerate(stages):
+                next_stage = stages[index + 1] if index + 1 < len(stages) else None
+                ready_at = time.perf_counter()
+                Colors.print(stage.header, stage.header_color)
+                context = stage.build_context(results)
+                response, timing = self._stream(stage, context, next_stage, ready_at, session, on_token)
+                timings.append((stage.name, timing))
+                if not response:
+                    break
+                results[stage.name] = response
+                completed.append((stage, response))
+                print('\n')
+        except KeyboardInterrupt:
+            # Leaving the stream already aborted the current generation; stop the debate's warm-ups too
+            ModelManager.cancel_preloads(session)
+            print(f'\n{Fore.YELLOW}[Debate interrupted]{Style.RESET_ALL}')
+        except GenerationCancelled:
+            # Only the debate's streams and warm-ups are abandoned; the session's
+            # memory extraction and summary keep running, as do other sessions
+            ModelManager.cancel_streams(session)
+            ModelManager.cancel_preloads(session)
+            print(f'\n{Fore.YELLOW}[Debate cancelled]{Style.RESET_ALL}')
+
+        self._report(timings)
+        return completed
+
+    def _stream(self, stage, context, next_stage, ready_at, session='default', on_token=None):
+        timing = {'queue': 0.0, 'prefill': 0.0, 'generation': 0.0}
+        try:
+            sent_at = time.perf_counter()
+            timing['queue'] = sent_at - ready_at
+            response_stream = ModelManager.chat(
+                model=stage.model,
+                messages=[
+                    {'role': 'system', 'content': stage.system_msg},
+                    *context
+                ],
+                stream=True,
+                session=session
+            )
+            if response_stream is None:
+                return None, timing
+
+            complete_response = ''
+            first_token_at = None
+            for chunk in response_stream:
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                    timing['prefill'] = first_token_at - sent_at
+                    if next_stage:
+                        self.warm(next_stage, session)
+                print(f'{stage.color}{chunk["message"]["content"]}{Style.RESET_ALL}', end='', flush=True)
+                if on_token:
+                    on_token(stage.name, chunk["message"]["content"])
+                complete_response += chunk["message"]["content"]
+            if response_stream.cancelled:
+                raise GenerationCancelled()
+
+            if first_token_at is not None:
+                timing['generation'] = time.perf_counter() - first_token_at
+            return complete_response, timing
+
+        except GenerationCancelled:
+            raise
+        except Exception as e:
+            print(f'{Fore.RED}[Error: {str(e)}]{Style.RESET_ALL}')
+            return None, timing
+
+    def warm(self, stage, session='default'):
+        """Loads the stage model and prefills its system prompt in the background."""
+        threading.Thread(
+            target=ModelManager.preload,
+            args=(stage.model, stage.system_msg, session),
+            daemon=True
+        ).start()
+
+    def _report(self, timings):
+        for name, timing in timings:
+            for phase, seconds in timing.items():
+                Metrics.observe(f'debate.{name}.{phase}', seconds)
+            Colors.print(
+                f"{name}: queue={timing['queue']:.2f}s prefill={timing['prefill']:.2f}s "
+                f"generation={timing['generation']:.2f}s",
+                Colors.SYSTEM
+            )
@@ -9,7 +9,7 @@ class OpinionChecker:
         self.model = model
 
     @log_step("Opinion check")
-    def check(self, convo):
+    def check(self, convo, session='default'):
         # Skip checking greetings or very short responses
         last_response = convo[-1]['content']
         if len(last_response.split()) < 30:
@@ -21,7 +21,8 @@ class OpinionChecker:
                 {'role': 'system', 'content': msgs.opinion_check_agent_msg},
                 {'role': 'user', 'content': prompt}
             ],
-            model=self.model
+            model=self.model,
+            session=session
         )
         content = response['message']['content']
         print(f'{Fore.LIGHTRED_EX}IS OPINION BASED: {content}{Style.RESET_ALL}')
@@ -41,15 +41,15 @@ query_msg = (
 
 best_search_msg = (
     'You are not an AI assistant that responds to a user. You are an AI model trained to select the best ' 
-    'search result out of a list of ten results. The best search result is the link an expert human search '
+    'search result out of a short numbered list of results. The best search result is the link an expert human search '
     'engine user would click first to find the data to respond to a USER_PROMPT after searching DuckDuckGo '
     'for the SEARCH_QUERY. \nAll user messages you receive in this conversation will have the format of: \n'
-    '   SEARCH_RESULTS: 1J,13,071 \n'
+    '   SEARCH_RESULTS: one line per result, "<index>. <title> | <site> | <description>" \n'
     '   USER_PROMPT: "this will be an actual prompt to a web search enabled AI assistant" \n'
-    '   SEARCH_QUERY: "search query ran to get the above 10 links" In\n'
+    '   SEARCH_QUERY: "search query ran to get the above links" \n'
     'You must select the index from the 0 indexed SEARCH_RESULTS list and only respond with the index of '
     'the best search result to check for the data the AI assistant needs to respond. That means your responses '
-    'to this conversation should always be 1 token, being and integer between 0-9. '
+    'to this conversation should always be 1 token, being an integer index from the SEARCH_RESULTS list. '
 )
 
 contains_data_msg = (
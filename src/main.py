@@ -1,140 +1,235 @@
-import ollama
-import json
+import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from colorama import Fore, Style
 from src.agents.debate_agents import DebateController
 from src.agents.opinion_agent import OpinionChecker
 from src.search.query import QueryGenerator
 from src.search.scraper import WebScraper
 from src.search.search_engine import SearchEngine
+from src.search.search_decider import SearchDecider
+from src.search.ranking import ResultRanker
+from src.search.content_quality import ContentScorer
+from src.search.passages import PassageSelector
 from src.config import system_messages as msgs
-from src.memory.user_memory import UserMemory
-from src.utils.thinking_indicator import ThinkingIndicator, thinking_context
+from src.utils.thinking_indicator import thinking_context
 from src.utils.colors import Colors
-from src.utils.model_manager import ModelManager  # New import for centralized chat calls
+from src.utils.model_manager import ModelManager, GenerationCancelled
+from src.utils.http_client import HttpClient
+from src.utils.metrics import Metrics
+from src.utils.text import estimate_tokens
+from src.pipeline.turn_pipeline import TurnPipeline
+from src.pipeline.context_window import ContextWindow
+from src.pipeline.prompt_builder import PromptBuilder
+from src.pipeline.session_manager import SessionManager
 
 class Assistant:
-    def __init__(self):
-        self.debate_controller = DebateController()
+    # Token budgets for page text in the answer prompt and in each validation call
+    SEARCH_CONTEXT_TOKENS = 1200
+    VALIDATION_TOKENS = 600
+
+    def __init__(self, search_fan_out=4, concurrent_turns=1):
+        """
+        Args:
+            search_fan_out (int, optional): Top results fetched and validated concurrently per search. Defaults to 4.
+            concurrent_turns (int, optional): Turns expected to run at once (the server's limit). Defaults to 1.
+        """
+        self.http_client = HttpClient.shared()
         self.opinion_checker = OpinionChecker()
         self.query_generator = QueryGenerator()
-        self.scraper = WebScraper()
-        self.search_engine = SearchEngine()
-        self.memory = UserMemory()
-        self.fast_mode = False
-        self.conversation = [msgs.assistant_msg]
+        self.scraper = WebScraper(self.http_client)
+        self.search_engine = SearchEngine(self.http_client)
+        self.search_decider = SearchDecider()
+        self.ranker = ResultRanker()
+        self.content_scorer = ContentScorer()
+        self.passage_selector = PassageSelector()
+        self.debate_controller = DebateController(self.query_generator, self.search_engine, self.scraper)
+        self.pipeline = TurnPipeline()
+        self.context_window = ContextWindow()
+        # Conversation, memory and mode are per session; everything above is shared by all sessions
+        self.sessions = SessionManager(self.pipeline.submit_background)
+        # Number of top results fetched and validated concurrently; 0 selects results one by one with the LLM
+        self.search_fan_out = search_fan_out
+        # A turn runs at most `search_fan_out` fetches or validations at once (a validation takes
+        # over from its finished fetch), so concurrent turns never queue behind each other's fan-out
+        self.search_executor = ThreadPoolExecutor(
+            max_workers=max(search_fan_out, 1) * max(concurrent_turns, 1), thread_name_prefix='search'
+        )
 
     def run(self):
         while True:
             try:
                 prompt = input('User: \n')
-                self.conversation = self.process_input(prompt)
+                self.process_input(prompt)
             except KeyboardInterrupt:
                 print("\nGoodbye!")
+                self.sessions.save_all()
+                self.pipeline.shutdown()
                 break
             except Exception as e:
                 Colors.print(f"Error: {str(e)}", Colors.ERROR)
                 continue
 
-    def process_input(self, prompt):
+    def process_input(self, prompt, session_id=SessionManager.DEFAULT_SESSION, on_token=None):
+        """
+        Answers one user message within a session.
+
+        Turns of the same session run one at a time; different sessions run concurrently.
+
+        Args:
+            prompt (str): What the user typed, optionally ending in '-fast'
+            session_id (str, optional): Session the message belongs to. Defaults to 'default'.
+            on_token (callable, optional): on_token(channel, text) called for every streamed
+                chunk; channel is 'answer' or the debate stage name. Raising
+                GenerationCancelled from it, or cancelling the session's streams,
+                aborts the turn and its generation.
+
+        Returns:
+            list: The session's conversation after the turn
+        """
+        with self.sessions.use(session_id) as session:
+            return self._process_turn(session, prompt, on_token)
+
+    def _process_turn(self, session, prompt, on_token=None):
         # Check for fast mode and update accordingly
         if prompt.strip().endswith('-fast'):
-            self.fast_mode = True
+            session.fast_mode = True
             prompt = prompt[:-5].strip()
             print(f'{Fore.CYAN}[Fast mode enabled]{" " * 5}{Style.RESET_ALL}')
         else:
-            self.fast_mode = False
+            session.fast_mode = False
 
-        # Update memory with user input
-        self.memory.update_memory(prompt)
-        
-        # Append memory context if available, else add the user prompt directly
-        memory_context = self.memory.get_relevant_memory(prompt)
-        if memory_context:
-            memory_prompt = (
-                f"USER MEMORY CONTEXT:\n{json.dumps(memory_context, indent=2)}\n\n"
-                f"USER PROMPT: {prompt}"
+        # Swap older turns for the summary prepared in the background after the previous turn
+        session.conversation = session.summarizer.apply(session.conversation)
+
+        timer = self.pipeline.start_turn()
+
+        # Memory retrieval and the search decision are independent, run them concurrently
+        gates = self.pipeline.run_gates({
+            'memory': lambda: session.memory.get_relevant_memory(prompt),
+            'search': lambda: self._should_search({'role': 'user', 'content': prompt}, session.session_id)
+        }, timer)
+
+        # History is append-only: the user message is built once, with memory and
+        # search context in a fixed position, and stored exactly as it is sent
+        memory_context = session.prompt_builder.serialize_memory(gates['memory'])
+        user_message = session.prompt_builder.user_message(prompt, memory_context)
+
+        if gates['search']:
+            with timer.stage('search'):
+                context = self._perform_search(session.conversation + [user_message], session.session_id)
+            pool = self.http_client.stats()
+            Colors.print(f"HTTP pool: {pool['hits']} reused / {pool['misses']} new connections", Colors.SYSTEM)
+            self.scraper.page_cache.report()
+            Colors.print(
+                f"Content validation: {Metrics.get('search.validation_calls')} LLM calls over "
+                f"{Metrics.get('search.runs')} searches", Colors.SYSTEM
+            )
+            user_message = session.prompt_builder.user_message(
+                prompt, memory_context, search_context=context, search_failed=not context
             )
-            self.conversation.append({'role': 'user', 'content': memory_prompt})
-        else:
-            self.conversation.append({'role': 'user', 'content': prompt})
 
-        # Check if search is needed using a context manager for the spinner
-        if self._should_search(self.conversation[-1]):
-            context = self._perform_search(self.conversation)
-            self.conversation = self.conversation[:-1]
-            
-            if context:
-                prompt = f'SEARCH RESULT: {context} \n\nUSER PROMPT: {prompt}'
-            else:
-                prompt = self._get_failed_search_prompt(prompt)
-            
-            self.conversation.append({'role': 'user', 'content': prompt})
+        session.conversation.append(user_message)
 
         # Get assistant response using the centralized ModelManager.chat
         print(f'{Fore.CYAN}[Assistant responding]{" "*5}{Style.RESET_ALL}')
-        model = ModelManager.get_model(self.fast_mode)
+        model = ModelManager.get_model(session.fast_mode)
+        # The trimmed conversation is kept so the next turns extend a stable prefix
+        session.conversation = self.context_window.fit(session.conversation, model)
+        answer_start = time.perf_counter()
         response_stream = ModelManager.chat(
-            messages=self.conversation,
+            messages=session.prompt_builder.render(session.conversation),
             model=model,
-            stream=True
+            stream=True,
+            session=session.session_id
         )
         if response_stream is None:
             Colors.print("Failed to get response from model", Colors.ERROR)
-            return self.conversation
+            return session.conversation
 
         complete_response = ''
         try:
             for chunk in response_stream:
                 if chunk and 'message' in chunk and 'content' in chunk['message']:
                     content = chunk['message']['content']
+                    if not complete_response:
+                        timer.record('prefill', time.perf_counter() - answer_start)
+                        timer.record('ttft', timer.total())
                     print(f'{Fore.YELLOW}{content}{Style.RESET_ALL}', end='', flush=True)
+                    if on_token:
+                        on_token('answer', content)
                     complete_response += content
+            if response_stream.cancelled:
+                raise GenerationCancelled()
+        except GenerationCancelled:
+            print(f'\n{Fore.YELLOW}[Generation cancelled]{Style.RESET_ALL}')
+            # Drop the unanswered message, so the history holds no turn the client never saw answered
+            if session.conversation and session.conversation[-1].get('id') == user_message['id']:
+                session.conversation.pop()
+            return session.conversation
         except Exception as e:
             Colors.print(f"Error processing response stream: {str(e)}", Colors.ERROR)
-            return self.conversation
+            return session.conversation
         
-        self.conversation.append({'role': 'assistant', 'content': complete_response})
+        timer.record('answer', time.perf_counter() - answer_start)
+        session.conversation.append(PromptBuilder.message('assistant', complete_response))
         print('\n')
+        self.pipeline.report(timer)
+        self.search_decider.report()
 
-        if self.opinion_checker.check(self.conversation):
-            self.conversation = self.debate_controller.run_debate(self.conversation, self.fast_mode)
+        # Memory extraction does not influence this answer; it is filtered, batched and run in the background
+        session.memory_extraction.observe(prompt)
+        session.memory_extraction.report()
+
+        if self.opinion_checker.check(session.conversation, session.session_id):
+            session.conversation = self.debate_controller.run_debate(
+                session.conversation, session.fast_mode, session=session.session_id, on_token=on_token
+            )
+
+        # Compact the history off the critical path, ready for the next turn
+        self.pipeline.submit_background(
+            'summary', session.summarizer.update, list(session.conversation), session.session_id
+        )
+        session.summarizer.report()
         
-        return self.conversation
+        return session.conversation
 
-    def _should_search(self, message):
-        # Use thinking_context to automatically start/stop the indicator
+    def _should_search(self, message, session=SessionManager.DEFAULT_SESSION):
+        # Rules and the local classifier answer most prompts; the LLM gate only sees the uncertain ones
         try:
-            with thinking_context("Checking if search needed"):
-                response = ModelManager.chat(
-                    messages=[
-                        {'role': 'system', 'content': msgs.search_or_not_msg},
-                        message
-                    ],
-                    model='llama3.2:3b'
-                )
-            content = response['message']['content']
-            Colors.print(f"Search needed: {content}", Colors.SUCCESS)
-            return 'true' in content.lower()
+            return self.search_decider.should_search(message['content'], session)
         except Exception as e:
             Colors.print(f"Error checking search need: {str(e)}", Colors.ERROR)
             return False
 
-    def _perform_search(self, convo):
+    def _perform_search(self, convo, session=SessionManager.DEFAULT_SESSION):
         print(f'{Fore.CYAN}[Starting search process]{" "*5}{Style.RESET_ALL}')
-        query = self.query_generator.generate(convo)
+        query = self.query_generator.generate(convo, session)
         print(f'{Fore.GREEN}[Query: {query}]{Style.RESET_ALL}')
         
         results = self.search_engine.search(query)
+        Metrics.incr('search.runs')
         
         if not results:
             print(f'{Fore.RED}[Error: No search results found]{Style.RESET_ALL}')
             return None
-        
+
+        if self.search_fan_out > 0:
+            page_text = self._fan_out_search(results, query, convo, session)
+        else:
+            page_text = self._search_sequentially(results, query, convo, session)
+        if not page_text:
+            return None
+        # Only the passages relevant to the question reach the answer model
+        return self.passage_selector.select(page_text, query, convo[-1]['content'], self.SEARCH_CONTEXT_TOKENS)
+
+    def _search_sequentially(self, results, query, convo, session):
         context = None
         context_found = False
         
         while not context_found and len(results) > 0:
-            best_result = self._get_best_result(results, query, convo)
+            best_result = self._get_best_result(results, query, convo, session)
             if best_result is None:
                 print(f'{Fore.RED}[Error: Failed to select best result]{Style.RESET_ALL}')
                 return None
@@ -144,7 +239,7 @@ class Assistant:
                 print(f'{Fore.CYAN}[Selected URL: {page_link}]{Style.RESET_ALL}')
                 page_text = self.scraper.scrape(page_link)
                 
-                if page_text and self._validate_content(page_text, query, convo):
+                if page_text and self._validate_content(page_text, query, convo, session=session):
                     context = page_text
                     context_found = True
                     print(f'{Fore.GREEN}[Success: Got valid content]{Style.RESET_ALL}')
@@ -158,12 +253,84 @@ class Assistant:
         
         return context
 
-    def _validate_content(self, content, query, convo):
+    def _fan_out_search(self, results, query, convo, session):
+        """
+        Fetches the top results concurrently and returns the first page that passes validation.
+
+        Pages are scored locally as they arrive: an accepted page is returned at
+        once and rejected pages are dropped. An uncertain page is sent to the LLM
+        as soon as its own fetch finished, so validation overlaps the slower
+        fetches; once one passes, queued validations are skipped.
+        """
+        # Fetch the locally best-ranked results rather than the search engine's first few
+        ranked = self.ranker.rank(results, query, convo[-1]['content'])
+        candidates = [result for _, result in ranked[:self.search_fan_out]]
+        print(f'{Fore.CYAN}[Fetching {len(candidates)} results concurrently]{Style.RESET_ALL}')
+        fetches = {self.search_executor.submit(self._fetch_page, result['link']) for result in candidates}
+        validations = set()
+        found = threading.Event()
+        try:
+            pending = set(fetches)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    page_text = future.result()
+                    if not page_text:
+                        continue
+                    if future in validations:
+                        found.set()
+                        print(f'{Fore.GREEN}[Success: Got valid content]{Style.RESET_ALL}')
+                        return page_text
+                    assessment = self._assess_content(page_text, query, convo)
+                    if assessment['verdict'] == 'accept':
+                        print(f'{Fore.GREEN}[Success: Got valid content]{Style.RESET_ALL}')
+                        return page_text
+                    if assessment['verdict'] == 'uncertain':
+                        validation = self.search_executor.submit(
+                            self._validate_candidate, page_text, query, convo, assessment, found, session
+                        )
+                        validations.add(validation)
+                        pending.add(validation)
+        finally:
+            found.set()
+            for future in fetches | validations:
+                future.cancel()
+
+        print(f'{Fore.RED}[No result contained useful content]{Style.RESET_ALL}')
+        return None
+
+    def _fetch_page(self, page_link):
+        try:
+            print(f'{Fore.CYAN}[Fetching URL: {page_link}]{Style.RESET_ALL}')
+            return self.scraper.scrape(page_link)
+        except Exception as e:
+            print(f'{Fore.RED}[Error processing result: {str(e)}]{Style.RESET_ALL}')
+            return None
+
+    def _validate_candidate(self, page_text, query, convo, assessment, found, session):
+        # Another candidate may have passed while this one was queued
+        if found.is_set():
+            return None
+        return page_text if self._validate_content(page_text, query, convo, assessment, session) else None
+
+    def _assess_content(self, content, query, convo):
+        assessment = self.content_scorer.assess(content, query, convo[-1]['content'])
+        print(
+            f"{Fore.CYAN}[Content quality: {assessment['verdict']} "
+            f"({assessment['score']:.2f}, {assessment['reason']})]{Style.RESET_ALL}"
+        )
+        return assessment
+
+    def _validate_content(self, content, query, convo, assessment=None, session=SessionManager.DEFAULT_SESSION):
         print(f'{Fore.CYAN}[Validating content]{" "*5}{Style.RESET_ALL}')
-        if len(content) < 200:  # Basic length check
-            return False
+        # Obvious junk and obvious hits are settled locally, only uncertain pages cost an LLM call
+        assessment = assessment or self._assess_content(content, query, convo)
+        if assessment['verdict'] != 'uncertain':
+            return assessment['verdict'] == 'accept'
         
-        needed_prompt = f'PAGE_TEXT: {content[:5000]} \nUSER_PROMPT: {convo[-1]["content"]} \nSEARCH_QUERY: {query}'
+        Metrics.incr('search.validation_calls')
+        passages = self.passage_selector.select(content, query, convo[-1]['content'], self.VALIDATION_TOKENS)
+        needed_prompt = f'PAGE_TEXT: {passages} \nUSER_PROMPT: {convo[-1]["content"]} \nSEARCH_QUERY: {query}'
         try:
             response = ModelManager.chat(
                 messages=[
@@ -171,7 +338,8 @@ class Assistant:
                     {'role': 'user', 'content': needed_prompt}
                 ],
                 model='llama3.2:3b',
-                timeout=15
+                timeout=15,
+                session=session
             )
             result = 'true' in response['message']['content'].lower()
             print(f'{Fore.GREEN}[Content validation: {result}]{Style.RESET_ALL}')
@@ -180,38 +348,50 @@ class Assistant:
             print(f'{Fore.RED}[Validation timeout/error - skipping]{Style.RESET_ALL}')
             return False
 
-    def _get_best_result(self, results, query, convo):
-        # Use thinking_context to wrap the selection process
-        with thinking_context("Selecting best result"):
-            best_msg = f'SEARCH_RESULTS: {results} \nUSER PROMPT: {convo[-1]["content"]} \nSEARCH_QUERY: {query}'
-            for attempt in range(2):
-                try:
-                    response = ModelManager.chat(
-                        messages=[
-                            {'role': 'system', 'content': msgs.best_search_msg},
-                            {'role': 'user', 'content': best_msg}
-                        ],
-                        model='llama3.2:3b'
-                    )
-                    result = response['message']['content'].strip()
-                    if result.isdigit() and 0 <= int(result) < len(results):
-                        print(f'{Fore.GREEN}[Selected result {result}]{Style.RESET_ALL}')
-                        return int(result)
-                    else:
-                        print(f'{Fore.RED}[Invalid result: not a valid index]{Style.RESET_ALL}')
-                except Exception as e:
-                    print(f'{Fore.RED}[Error: invalid response format]{Style.RESET_ALL}')
-                    continue
-        print(f'{Fore.RED}[Failed to select result]{Style.RESET_ALL}')
-        return None
+    def _get_best_result(self, results, query, convo, session=SessionManager.DEFAULT_SESSION):
+        """
+        Returns the index in `results` of the result to fetch next.
+
+        Results are ranked locally first. A clear winner is used directly;
+        otherwise the LLM only picks from a short list of the top results.
+        """
+        ranked = self.ranker.rank(results, query, convo[-1]['content'])
+        winner = self.ranker.clear_winner(ranked)
+        if winner is not None:
+            Metrics.incr('search.select.local')
+            print(f'{Fore.GREEN}[Selected result {results.index(winner)} (ranked)]{Style.RESET_ALL}')
+            return results.index(winner)
 
-    def _get_failed_search_prompt(self, original_prompt):
-        return (
-            f'USER PROMPT: \n{original_prompt} \n\nFAILED SEARCH: \nThe '
-            'AI search model was unable to extract any reliable data. Explain that '
-            'and ask if the user would like to search again or respond '
-            'without web search context.'
+        shortlist = self.ranker.shortlist(ranked)
+        lines = '\n'.join(
+            f"{i}. {r.get('title', '')} | {self.ranker.host(r['link'])} | {r['search_description'][:200]}"
+            for i, r in enumerate(shortlist)
         )
+        best_msg = f'SEARCH_RESULTS:\n{lines}\nUSER_PROMPT: {convo[-1]["content"]}\nSEARCH_QUERY: {query}'
+        Metrics.incr('search.select.llm')
+        Metrics.observe('search.select.prompt_tokens', estimate_tokens(best_msg))
+        # Use thinking_context to wrap the selection process
+        try:
+            with thinking_context("Selecting best result"):
+                response = ModelManager.chat(
+                    messages=[
+                        {'role': 'system', 'content': msgs.best_search_msg},
+                        {'role': 'user', 'content': best_msg}
+                    ],
+                    model='llama3.2:3b',
+                    session=session
+                )
+            match = re.search(r'\d+', response['message']['content'])
+            if match and int(match.group()) < len(shortlist):
+                choice = shortlist[int(match.group())]
+                print(f'{Fore.GREEN}[Selected result {results.index(choice)}]{Style.RESET_ALL}')
+                return results.index(choice)
+            print(f'{Fore.RED}[Invalid result: not a valid index, using top ranked]{Style.RESET_ALL}')
+        except Exception as e:
+            print(f'{Fore.RED}[Error selecting result, using top ranked: {str(e)}]{Style.RESET_ALL}')
+        # The local ranking is a sound choice on its own, so a bad answer needs no retry
+        Metrics.incr('search.select.fallback')
+        return results.index(shortlist[0])
 
     def _get_agent_response(self, system_msg, context, model='deepseek-r1:7b', color=Fore.YELLOW):
         # Use thinking_context to ensure the indicator stops even on errors
@@ -0,0 +1,129 @@
+import threading
+from colorama import Fore, Style
+from src.utils.colors import Colors
+from src.utils.metrics import Metrics
+from src.utils.model_manager import ModelManager
+from src.utils.model_scheduler import Priority
+from src.pipeline.prompt_builder import PromptBuilder
+from src.utils.text import estimate_tokens
+
+SUMMARY_PREFIX = 'CONVERSATION SUMMARY (earlier turns):\n'
+
+SUMMARIZER_PROMPT = (
+    'You maintain a running summary of a conversation between a user and an AI assistant. '
+    'You receive the previous summary (possibly empty) and the next turns. Produce an updated summary that:\n'
+    '1. Keeps facts, decisions, open questions and the topics the user cares about\n'
+    '2. Drops greetings, filler and the full text of search results or debates (keep their conclusions)\n'
+    '3. Is written in short plain sentences, at most 200 words\n'
+    'Respond only with the summary.'
+)
+
+class ConversationSummarizer:
+    """
+    Background stage that folds older turns into a running summary message.
+
+    Like UserMemory it runs off the critical path: update() is scheduled after
+    a response finished streaming and summarizes everything except the most
+    recent turns with the fast model; apply() swaps the folded turns for the
+    summary at the start of the next turn, so that prompt is already compact.
+
+    Folded turns are remembered by message id, not by object: by the time the
+    summary is applied, ContextWindow may have compressed some of them into
+    new dicts or dropped them.
+    """
+
+    def __init__(self, model='llama3.2:3b', trigger_tokens=2500, keep_recent=4, max_turn_chars=1500):
+        """
+        Args:
+            model (str, optional): Model writing the summary. Defaults to 'llama3.2:3b'.
+            trigger_tokens (int, optional): Conversation size that triggers summarization. Defaults to 2500.
+            keep_recent (int, optional): Most recent messages never folded. Defaults to 4.
+            max_turn_chars (int, optional): Characters of each folded message shown to the summarizer
+        """
+        self.model = model
+        self.trigger_tokens = trigger_tokens
+        self.keep_recent = keep_recent
+        self.max_turn_chars = max_turn_chars
+        self._pending = None
+        self._lock = threading.Lock()
+
+    def update(self, conversation, session='default'):
+        """Summarizes the foldable part of `conversation` if it grew past the trigger."""
+        total = sum(estimate_tokens(m['content']) for m in conversation)
+        if total < self.trigger_tokens:
+            return
+
+        start = 2 if self._is_summary(conversation, 1) else 1
+        end = len(conversation) - self.keep_recent
+        folded = conversation[start:end]
+        if not folded:
+            return
+
+        previous = conversation[1]['content'][len(SUMMARY_PREFIX):] if start == 2 else ''
+        transcript = '\n\n'.join(
+            f"{m['role'].upper()}: {m['content'][:self.max_turn_chars]}" for m in folded
+        )
+        response = ModelManager.chat(
+            messages=[
+                {'role': 'system', 'content': SUMMARIZER_PROMPT},
+                {'role': 'user', 'content': f"PREVIOUS SUMMARY:\n{previous or '(none)'}\n\nNEXT TURNS:\n{transcript}"}
+            ],
+            model=self.model,
+            priority=Priority.BACKGROUND,
+            session=session
+        )
+        if response is None:
+            return
+
+        summary = response['message']['content'].strip()
+        if not summary:
+            return
+        replaced = conversation[1:end]
+        saved = sum(estimate_tokens(m['content']) for m in replaced) - estimate_tokens(SUMMARY_PREFIX + summary)
+        cost = (response.get('prompt_eval_count') or 0) + (response.get('eval_count') or 0)
+        Metrics.incr('summarizer.runs')
+        Metrics.incr('summarizer.tokens_saved', max(saved, 0))
+        Metrics.incr('summarizer.tokens_spent', cost)
+
+        with self._lock:
+            self._pending = ({m.get('id') for m in replaced} - {None}, summary)
+
+    def apply(self, conversation):
+        """
+        Returns `conversation` with the turns folded by the last update() replaced by the summary.
+
+        The folded turns still present must form the start of the conversation
+        (some may have been dropped by the context window meanwhile); otherwise
+        the conversation is returned unchanged.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, None
+        if pending is None:
+            return conversation
+
+        replaced, summary = pending
+        folded = 0
+        while 1 + folded < len(conversation) and conversation[1 + folded].get('id') in replaced:
+            folded += 1
+        rest = conversation[1 + folded:]
+        if any(m.get('id') in replaced for m in rest):
+            return conversation
+        # Nothing folded left: only a newer summary would make this one stale
+        if not folded and self._is_summary(conversation, 1):
+            return conversation
+
+        print(f'{Fore.CYAN}[Folded {folded} messages into the conversation summary]{Style.RESET_ALL}')
+        summary_msg = PromptBuilder.message('system', SUMMARY_PREFIX + summary, 'summary')
+        return [conversation[0], summary_msg, *rest]
+
+    def report(self):
+        runs = Metrics.get('summarizer.runs')
+        if runs:
+            Colors.print(
+                f"Summarizer: {runs} runs saved {Metrics.get('summarizer.tokens_saved')} prompt tokens "
+                f"for {Metrics.get('summarizer.tokens_spent')} summarization tokens",
+                Colors.SYSTEM
+            )
+
+    def _is_summary(self, conversation, index):
+        return len(conversation) > index and conversation[index].get('kind') == 'summary'
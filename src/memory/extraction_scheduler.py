@@ -0,0 +1,94 @@
+import re
+import threading
+from src.utils.colors import Colors
+from src.utils.metrics import Metrics
+
+class MemoryExtractionScheduler:
+    """
+    Decides when user messages are worth an LLM memory-extraction call.
+
+    - Messages without a first-person statement or preference cue ("I live
+      in...", "my favourite...", "call me...", "from now on...") never reach
+      the LLM; questions and chit-chat are the vast majority of turns
+    - Messages that pass are queued and extracted together once `batch_size`
+      are pending or the oldest has waited `max_delay_turns` turns
+    - Strong cues (a name, an explicit standing instruction) flush the queue at once
+    - Extraction runs through `submit`, e.g. TurnPipeline.submit_background,
+      after the turn's answer has been sent
+    """
+
+    PERSONAL_CUES = re.compile(
+        r"\b(i am|i'm|im|i was|i live|i work|i study|i have|i've got|i own|i like|i love|i enjoy|i hate|"
+        r"i dislike|i don'?t like|i prefer|i'd rather|i usually|i always|i never|i speak|i use|"
+        r"my (name|job|wife|husband|partner|kids?|son|daughter|dog|cat|family|hobby|hobbies|favou?rite|"
+        r"birthday|age|home|city|country|work|school|team)|i'm from|i come from|call me|"
+        r"from now on|please (always|never)|i want you to|keep (your )?(answers|responses))\b",
+        re.IGNORECASE
+    )
+    STRONG_CUES = re.compile(
+        r"\b(my name is|call me|from now on|please (always|never)|i want you to|keep (your )?(answers|responses))\b",
+        re.IGNORECASE
+    )
+    MIN_WORDS = 3
+
+    def __init__(self, memory, submit, batch_size=3, max_delay_turns=3, session='default'):
+        """
+        Args:
+            memory (UserMemory): Memory receiving the extracted facts
+            submit (callable): submit(name, fn, *args) scheduling a background job
+            batch_size (int, optional): Pending messages that trigger an extraction. Defaults to 3.
+            max_delay_turns (int, optional): Turns a pending message waits at most. Defaults to 3.
+            session (str, optional): Session the extraction calls are scheduled for. Defaults to 'default'.
+        """
+        self.memory = memory
+        self.submit = submit
+        self.batch_size = batch_size
+        self.max_delay_turns = max_delay_turns
+        self.session = session
+        self._pending = []
+        self._waited = 0
+        self._lock = threading.Lock()
+
+    def observe(self, message):
+        """Records one user turn and schedules an extraction if one is due."""
+        Metrics.incr('memory.turns')
+        candidate = self.is_candidate(message)
+        with self._lock:
+            if candidate:
+                self._pending.append(message)
+            elif self._pending:
+                self._waited += 1
+            due = self._pending and (
+                len(self._pending) >= self.batch_size
+                or self._waited >= self.max_delay_turns
+                or (candidate and self.STRONG_CUES.search(message))
+            )
+        if not candidate:
+            Metrics.incr('memory.skipped')
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Schedules extraction of every pending message (e.g. before exit)."""
+        with self._lock:
+            batch, self._pending, self._waited = self._pending, [], 0
+        if not batch:
+            return None
+        Metrics.incr('memory.extraction_calls')
+        return self.submit('memory', self.memory.update_memory, batch, self.session)
+
+    def is_candidate(self, message):
+        return len(message.split()) >= self.MIN_WORDS and bool(self.PERSONAL_CUES.search(message))
+
+    def report(self):
+        turns = Metrics.get('memory.turns')
+        if turns:
+            parsed = Metrics.get('memory.parse.ok') + Metrics.get('memory.parse.recovered')
+            attempts = parsed + Metrics.get('memory.parse.failed')
+            parse_rate = f'{parsed / attempts:.0%}' if attempts else 'n/a'
+            Colors.print(
+                f"Memory extraction: {Metrics.get('memory.extraction_calls') * 100 / turns:.0f} calls per 100 turns "
+                f"({Metrics.get('memory.skipped')} of {turns} turns skipped), "
+                f"{parse_rate} parsed ({Metrics.get('memory.parse.recovered')} recovered)",
+                Colors.SYSTEM
+            )
@@ -0,0 +1,68 @@
+from collections import defaultdict
+from src.utils.text import tokenize, bm25_scores, estimate_tokens
+
+class MemoryIndex:
+    """
+    Inverted index over user memory facts, for picking the ones relevant to a prompt.
+
+    Each fact ('personal_info'/'preferences' key and value, or an interest) is
+    indexed by its terms. search() scores the facts sharing a term with the
+    prompt with BM25 and returns the best `top_k` that fit in `max_tokens`.
+    Facts under PINNED_KEYS (e.g. the user's name) are returned first whatever
+    the prompt, since they shape every answer.
+    """
+
+    PINNED_KEYS = ('name', 'preferred_name')
+
+    def __init__(self, top_k=8, max_tokens=120):
+        """
+        Args:
+            top_k (int, optional): Most facts returned per prompt. Defaults to 8.
+            max_tokens (int, optional): Token budget for the returned facts. Defaults to 120.
+        """
+        self.top_k = top_k
+        self.max_tokens = max_tokens
+        self.facts = []
+        self._terms = []
+        self._postings = defaultdict(set)
+
+    def rebuild(self, memory):
+        """Indexes every fact of `memory` (UserMemory's dictionary layout)."""
+        facts = [('personal_info', k, v) for k, v in memory.get('personal_info', {}).items()]
+        facts += [('interests', i, i) for i in memory.get('interests', [])]
+        facts += [('preferences', k, v) for k, v in memory.get('preferences', {}).items()]
+        self.facts = facts
+        self._terms = [tokenize(f"{key.replace('_', ' ')} {value}") for _, key, value in facts]
+        self._postings = defaultdict(set)
+        for i, terms in enumerate(self._terms):
+            for term in terms:
+                self._postings[term].add(i)
+
+    def search(self, prompt):
+        """
+        Returns the facts relevant to `prompt`.
+
+        Args:
+            prompt (str): The current user prompt
+
+        Returns:
+            list: (category, key, value) facts, pinned facts first, then by relevance
+        """
+        query = {term: 1.0 for term in tokenize(prompt)}
+        candidates = sorted(set().union(*(self._postings.get(term, ()) for term in query)))
+        scores = bm25_scores([self._terms[i] for i in candidates], query)
+        ranked = [i for _, i in sorted(zip(scores, candidates), key=lambda item: (-item[0], item[1]))]
+        pinned = [
+            i for i, (category, key, _) in enumerate(self.facts)
+            if category == 'personal_info' and key in self.PINNED_KEYS
+        ]
+
+        selected, used = [], 0
+        for i in pinned + [i for i in ranked if i not in pinned]:
+            category, key, value = self.facts[i]
+            cost = estimate_tokens(f'{key}={value}')
+            if len(selected) >= self.top_k or used + cost > self.max_tokens:
+                continue
+            selected.append(self.facts[i])
+            used += cost
+        return selected
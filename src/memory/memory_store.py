@@ -0,0 +1,156 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from src.utils.colors import Colors
+from src.utils.metrics import Metrics
+
+class MemoryStore:
+    """
+    Durable storage for user memory facts, in SQLite (WAL mode) under data/memory.
+
+    This class is responsible for:
+    - Storing one row per fact, keyed by (category, key), so an update writes
+      only the facts that changed instead of the whole memory
+    - Applying each batch of changes in a single transaction
+    - Loading the whole memory in UserMemory's dictionary layout at startup
+    - Migrating the previous user_memory.json file on first use
+
+    Categories are 'personal_info' and 'preferences' (key -> value) and
+    'interests' (the interest is both key and value).
+    """
+
+    CATEGORIES = ('personal_info', 'interests', 'preferences')
+
+    def __init__(self, path=None, legacy_json=None):
+        """
+        Args:
+            path (str, optional): SQLite file. Defaults to data/memory/memory.db
+            legacy_json (str, optional): JSON memory file to import when the store is empty.
+                Defaults to data/memory/user_memory.json next to the database.
+        """
+        if path is None:
+            memory_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', 'memory')
+            os.makedirs(memory_dir, exist_ok=True)
+            path = os.path.join(memory_dir, 'memory.db')
+        if legacy_json is None:
+            legacy_json = os.path.join(os.path.dirname(path), 'user_memory.json')
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        # WAL keeps committed transactions durable across crashes with a cheaper fsync policy
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS facts ('
+            'category TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, updated_at REAL NOT NULL, '
+            'PRIMARY KEY (category, key))'
+        )
+        self._conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        self._conn.commit()
+        self._migrate(legacy_json)
+
+    def load(self):
+        """
+        Reads every fact.
+
+        Returns:
+            dict: 'personal_info', 'interests', 'preferences' and 'last_updated'
+        """
+        memory = {'personal_info': {}, 'interests': [], 'preferences': {}, 'last_updated': None}
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT category, key, value FROM facts ORDER BY updated_at, rowid'
+            ).fetchall()
+            last_updated = self._conn.execute("SELECT value FROM meta WHERE key = 'last_updated'").fetchone()
+        for category, key, value in rows:
+            if category == 'interests':
+                memory['interests'].append(value)
+            elif category in memory:
+                memory[category][key] = value
+        memory['last_updated'] = last_updated[0] if last_updated else None
+        return memory
+
+    def apply(self, upserts=(), deletes=(), last_updated=None):
+        """
+        Writes a batch of changes atomically.
+
+        Args:
+            upserts (iterable): (category, key, value) facts to insert or overwrite
+            deletes (iterable): (category, key) facts to remove
+            last_updated (str, optional): ISO timestamp recorded with the batch
+
+        Returns:
+            bool: True if the batch was committed (or empty), False if the write failed
+        """
+        upserts, deletes = list(upserts), list(deletes)
+        if not upserts and not deletes:
+            return True
+        now = time.time()
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        'INSERT INTO facts (category, key, value, updated_at) VALUES (?, ?, ?, ?) '
+                        'ON CONFLICT (category, key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at',
+                        [(category, key, value, now) for category, key, value in upserts]
+                    )
+                    self._conn.executemany('DELETE FROM facts WHERE category = ? AND key = ?', deletes)
+                    if last_updated:
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO meta (key, value) VALUES ('last_updated', ?)", (last_updated,)
+                        )
+            except sqlite3.Error as e:
+                Colors.print(f"Error saving memory: {str(e)}", Colors.ERROR)
+                return False
+        Metrics.incr('memory_store.writes', len(upserts) + len(deletes))
+        return True
+
+    @classmethod
+    def diff(cls, before, after):
+        """
+        Returns the (upserts, deletes) that turn memory `before` into `after`.
+
+        Args:
+            before (dict): Memory in UserMemory's layout
+            after (dict): Memory in UserMemory's layout
+
+        Returns:
+            tuple: list of (category, key, value), list of (category, key)
+        """
+        upserts, deletes = [], []
+        for category in cls.CATEGORIES:
+            old, new = cls._facts(before, category), cls._facts(after, category)
+            upserts.extend((category, key, value) for key, value in new.items() if old.get(key) != value)
+            deletes.extend((category, key) for key in old if key not in new)
+        return upserts, deletes
+
+    @staticmethod
+    def _facts(memory, category):
+        values = memory.get(category) or ({} if category != 'interests' else [])
+        if category == 'interests':
+            return {interest: interest for interest in values}
+        return {key: str(value) for key, value in values.items()}
+
+    def _migrate(self, legacy_json):
+        if not legacy_json or not os.path.exists(legacy_json):
+            return
+        with self._lock:
+            has_facts = self._conn.execute('SELECT 1 FROM facts LIMIT 1').fetchone()
+        if has_facts:
+            return
+        try:
+            with open(legacy_json, 'r') as f:
+                legacy = json.load(f)
+        except (OSError, ValueError) as e:
+            Colors.print(f"Could not migrate {legacy_json}: {str(e)}", Colors.ERROR)
+            return
+
+        upserts, _ = self.diff({}, legacy)
+        if not self.apply(upserts, last_updated=legacy.get('last_updated') or None):
+            # Left in place, so the import is retried on the next start
+            Colors.print(f"Could not migrate {legacy_json}, will retry on next start", Colors.ERROR)
+            return
+        # Keep the old file for reference, but never import it twice
+        os.replace(legacy_json, legacy_json + '.migrated')
+        Colors.print(f"Migrated {len(upserts)} memory facts from {os.path.basename(legacy_json)}", Colors.SYSTEM)
@@ -1,50 +1,62 @@
-import json
-import os
+import copy
+import threading
 import ollama
 from datetime import datetime
 from colorama import Fore, Style
 from src.config import system_messages as msgs
 from src.utils.thinking_indicator import ThinkingIndicator, thinking_context
 from src.utils.model_manager import ModelManager
+from src.utils.model_scheduler import Priority
+from src.memory.memory_store import MemoryStore
+from src.memory.memory_index import MemoryIndex
+from src.utils.metrics import Metrics
+from src.utils.json_extract import JsonObjectExtractor
+
+MEMORY_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'personal_info': {'type': 'object', 'additionalProperties': {'type': 'string'}},
+        'interests': {'type': 'array', 'items': {'type': 'string'}},
+        'preferences': {'type': 'object', 'additionalProperties': {'type': 'string'}}
+    },
+    'required': ['personal_info', 'interests', 'preferences']
+}
 
 class UserMemory:
-    def __init__(self):
-        # Create memory directory if it doesn't exist
-        self.memory_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', 'memory')
-        os.makedirs(self.memory_dir, exist_ok=True)
-        
-        # Set memory file path
-        self.memory_file = os.path.join(self.memory_dir, 'user_memory.json')
+    def __init__(self, store=None):
+        # Facts live in SQLite; the dictionary below is the in-memory copy served to every turn
+        self.store = store or MemoryStore()
         self.memory = self._load_memory()
+        self.index = MemoryIndex()
+        self.index.rebuild(self.memory)
+        # update_memory runs in the background while get_relevant_memory serves the next turn
+        self._lock = threading.RLock()
 
     def _load_memory(self):
         try:
-            if os.path.exists(self.memory_file):
-                with open(self.memory_file, 'r') as f:
-                    return json.load(f)
-                
-            empty_memory = self._get_empty_memory()
-            with open(self.memory_file, 'w') as f:
-                json.dump(empty_memory, f, indent=4)
-            return empty_memory
-            
+            return self.store.load()
         except Exception as e:
             print(f'{Fore.RED}[Error loading memory: {str(e)}]{Style.RESET_ALL}')
             return self._get_empty_memory()
 
-    def _save_memory(self):
-        try:
-            with open(self.memory_file, 'w') as f:
-                json.dump(self.memory, f, indent=4)
-        except Exception as e:
-            print(f'{Fore.RED}[Error saving memory: {str(e)}]{Style.RESET_ALL}')
+    def _save_memory(self, before):
+        # Only the facts that changed since `before` are written
+        upserts, deletes = MemoryStore.diff(before, self.memory)
+        self.store.apply(upserts, deletes, last_updated=self.memory['last_updated'])
+
+    def update_memory(self, message_content, session='default'):
+        """
+        Extracts facts from one user message or a batch of them and stores them.
 
-    def update_memory(self, message_content):
-        print(f'{Fore.CYAN}[Analyzing memory]{" "*5}{Style.RESET_ALL}')
-        response = self._analyze_for_memory(message_content)
-        if response:
-            self._update_from_analysis(response)
-            self._save_memory()
+        Runs off the critical path, so no spinner or progress output that would interleave with the answer.
+        """
+        messages = [message_content] if isinstance(message_content, str) else list(message_content)
+        if not messages:
+            return
+        updates = self._analyze_for_memory(messages, session)
+        if updates:
+            with self._lock:
+                self._update_from_analysis(updates)
 
     def _get_empty_memory(self):
         return {
@@ -54,28 +66,50 @@ class UserMemory:
             "last_updated": None
         }
 
-    def _analyze_for_memory(self, content):
+    def _analyze_for_memory(self, messages, session='default'):
         try:
-            with thinking_context("Analyzing message"):
-                current_memory = json.dumps(self.memory, indent=2)
-                messages = [
-                    {'role': 'system', 'content': msgs.MEMORY_ANALYZER_PROMPT},
-                    {'role': 'user', 'content': (
-                        f"Previous memory:\n{current_memory}\n\n"
-                        f"New message from user:\n{content}\n\n"
-                        "Extract any new personal information, interests, or preferences. "
-                        "Return ONLY a JSON object with new information."
-                    )}
-                ]
-                response = ModelManager.chat(
-                    messages=messages,
-                    model='llama3.2:3b'
-                )
-            return response['message']['content']
+            # Only the facts related to these messages, not the whole memory: merging happens locally
+            with self._lock:
+                known = self.index.search(' '.join(messages))
+            current_memory = '\n'.join(f'{category}: {key}={value}' for category, key, value in known) or '(none)'
+            new_messages = '\n'.join(f'- {message}' for message in messages)
+            messages = [
+                {'role': 'system', 'content': msgs.MEMORY_ANALYZER_PROMPT},
+                {'role': 'user', 'content': (
+                    f"Previous memory:\n{current_memory}\n\n"
+                    f"New messages from user:\n{new_messages}\n\n"
+                    "Extract any new personal information, interests, or preferences. "
+                    "Return ONLY a JSON object with new information."
+                )}
+            ]
+            # Constrained to the schema by the server; the extractor still recovers objects
+            # wrapped in prose or code fences, and generation stops once the object is complete
+            stream = ModelManager.chat(
+                messages=messages,
+                model='llama3.2:3b',
+                stream=True,
+                format=MEMORY_SCHEMA,
+                priority=Priority.BACKGROUND,
+                session=session
+            )
+            if stream is None:
+                return None
+            extractor = JsonObjectExtractor()
+            for chunk in stream:
+                if extractor.feed(chunk['message']['content']) is not None:
+                    break
+            updates = extractor.close()
         except Exception as e:
             print(f'{Fore.RED}[Memory analysis error: {str(e)}]{Style.RESET_ALL}')
             return None
 
+        if updates is None:
+            Metrics.incr('memory.parse.failed')
+            print(f'{Fore.RED}[Memory update skipped: no JSON object in the reply]{Style.RESET_ALL}')
+        else:
+            Metrics.incr('memory.parse.recovered' if extractor.repaired else 'memory.parse.ok')
+        return updates
+
     def _cleanup_memory(self):
         """Remove empty, invalid, or nonsense entries from memory"""
         # Clean personal_info
@@ -100,53 +134,63 @@ class UserMemory:
             if v and isinstance(v, str) and v.strip() and v.lower() not in ['null', 'none', 'unknown', '', 'yes', 'no']
         }
 
-    def _update_from_analysis(self, analysis):
+    def _update_from_analysis(self, updates):
         try:
-            # First try to clean up the JSON
-            analysis = analysis.strip()
-            if not analysis.startswith('{'):
-                analysis = '{'
-            if not analysis.endswith('}'):
-                analysis = analysis + '}'
-            
-            updates = json.loads(analysis)
+            before = copy.deepcopy(self.memory)
             
             # Only update personal_info if there's new non-empty data
-            if 'personal_info' in updates and updates['personal_info']:
+            if isinstance(updates.get('personal_info'), dict):
                 for key, value in updates['personal_info'].items():
                     if value:  # Only update if new value is not empty
                         self.memory['personal_info'][key] = value
                 
             # Only update interests if there are new non-empty ones
-            if 'interests' in updates and updates['interests']:
-                new_interests = [i.lower() for i in updates['interests'] if i]  # Skip empty interests
+            if isinstance(updates.get('interests'), list):
+                new_interests = [i.lower() for i in updates['interests'] if i and isinstance(i, str)]  # Skip empty interests
                 if new_interests:  # Only extend if there are valid interests
                     self.memory['interests'].extend(new_interests)
                     self.memory['interests'] = list(set(self.memory['interests']))  # Remove duplicates
                 
             # Only update preferences if there are new non-empty ones
-            if 'preferences' in updates and updates['preferences']:
+            if isinstance(updates.get('preferences'), dict):
                 for key, value in updates['preferences'].items():
                     if value:  # Only update if new value is not empty
                         self.memory['preferences'][key] = value
             
             self.memory['last_updated'] = datetime.now().isoformat()
             self._cleanup_memory()  # Clean up after updates
-            self._save_memory()
+            self._save_memory(before)
+            self.index.rebuild(self.memory)
             
-        except json.JSONDecodeError as e:
-            print(f'{Fore.RED}[Memory update skipped: Invalid JSON format]{Style.RESET_ALL}')
         except Exception as e:
             print(f'{Fore.RED}[Memory update error: {str(e)}]{Style.RESET_ALL}')
 
     def get_relevant_memory(self, context):
+        """
+        Returns the stored facts relevant to `context` (the user prompt), in the memory layout.
+
+        Only the top-scoring facts within the index's token budget are returned,
+        so the prompt does not grow with everything ever remembered.
+        """
         print(f'{Fore.CYAN}[Retrieving memory]{" "*5}{Style.RESET_ALL}')
-        if not self.memory['personal_info'] and not self.memory['interests'] and not self.memory['preferences']:
-            print(f'{Fore.YELLOW}[No stored memory]{Style.RESET_ALL}')
+        with self._lock:
+            if not self.memory['personal_info'] and not self.memory['interests'] and not self.memory['preferences']:
+                print(f'{Fore.YELLOW}[No stored memory]{Style.RESET_ALL}')
+                return None
+            facts = self.index.search(context or '')
+            total = len(self.index.facts)
+
+        Metrics.observe('memory.facts_selected', len(facts))
+        if not facts:
+            print(f'{Fore.YELLOW}[No relevant memory]{Style.RESET_ALL}')
             return None
-        
-        return {
-            'personal_info': self.memory['personal_info'],
-            'interests': self.memory['interests'],
-            'preferences': self.memory['preferences']
-        } 
\ No newline at end of file
+        print(f'{Fore.CYAN}[Using {len(facts)}/{total} memory facts]{Style.RESET_ALL}')
+
+        # Fresh containers, so the background update cannot mutate what the prompt is built from
+        relevant = {'personal_info': {}, 'interests': [], 'preferences': {}}
+        for category, key, value in facts:
+            if category == 'interests':
+                relevant['interests'].append(value)
+            else:
+                relevant[category][key] = value
+        return relevant
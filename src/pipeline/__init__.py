@@ -0,0 +1 @@
+# Empty file to make pipeline a package
\ No newline at end of file
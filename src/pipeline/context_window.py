@@ -0,0 +1,106 @@
+from src.utils.colors import Colors
+from src.utils.metrics import Metrics
+from src.utils.text import estimate_tokens
+
+class ContextWindow:
+    """
+    Token budget for the conversation sent to the answer model.
+
+    Messages may carry a 'kind' key ('search' for user turns with scraped
+    page text, 'debate' for debate transcripts) which is used to choose what
+    to shed first; PromptBuilder.render strips it before sending.
+
+    When the history exceeds the model's budget it is reduced in this order:
+    1. Search payloads of earlier turns are replaced by their user prompt
+    2. Debate transcripts are dropped, oldest first
+    3. The oldest remaining turns are dropped, a user message together with
+       the assistant messages answering it
+    The system message, the running conversation summary ('summary') and the
+    current user message are always kept.
+
+    Trimming goes down to `low_water` of the budget rather than just under it.
+    The caller keeps the trimmed conversation, so the following turns append
+    to an unchanged prefix until the budget is reached again, instead of
+    shifting the start of the prompt (and invalidating the server's prompt
+    cache) on every turn.
+    """
+
+    BUDGETS = {
+        'llama3.2:3b': 3000,
+        'deepseek-r1:7b': 6000
+    }
+    DEFAULT_BUDGET = 3000
+    SEARCH_MARKER = 'USER PROMPT:'
+
+    def __init__(self, budgets=None, low_water=0.75):
+        """
+        Args:
+            budgets (dict, optional): Prompt token budget per model name, merged over BUDGETS
+            low_water (float, optional): Share of the budget left after trimming. Defaults to 0.75.
+        """
+        self.budgets = {**self.BUDGETS, **(budgets or {})}
+        self.low_water = low_water
+
+    def budget(self, model):
+        return self.budgets.get(model, self.DEFAULT_BUDGET)
+
+    def fit(self, messages, model):
+        """
+        Returns the conversation reduced to the token budget of `model`.
+
+        Args:
+            messages (list): Conversation, starting with the system message
+            model (str): Model that will receive the prompt
+
+        Returns:
+            list: The same list if it fits, otherwise a trimmed copy
+        """
+        budget = self.budget(model)
+        pinned, history, current = messages[0], list(messages[1:-1]), messages[-1]
+        fixed = estimate_tokens(pinned['content']) + estimate_tokens(current['content'])
+
+        def total():
+            return fixed + sum(estimate_tokens(m['content']) for m in history)
+
+        if total() <= budget:
+            self._record(total(), budget, len(messages), len(messages))
+            return messages
+
+        target = budget * self.low_water
+        history = [self._compress(m) if m.get('kind') == 'search' else m for m in history]
+        while total() > target and any(m.get('kind') == 'debate' for m in history):
+            history.remove(next(m for m in history if m.get('kind') == 'debate'))
+        while total() > target and any(m.get('kind') != 'summary' for m in history):
+            self._drop_oldest_turn(history)
+
+        trimmed = [pinned, *history, current]
+        self._record(total(), budget, len(trimmed), len(messages))
+        return trimmed
+
+    def _record(self, tokens, budget, kept, total_messages):
+        Metrics.observe('context.tokens_sent', tokens)
+        Colors.print(
+            f"Context: {tokens}/{budget} tokens, {kept}/{total_messages} messages sent", Colors.SYSTEM
+        )
+
+    def _drop_oldest_turn(self, history):
+        start = next(i for i, m in enumerate(history) if m.get('kind') != 'summary')
+        end = start + 1
+        # Never leave a reply without the question it answers
+        if history[start]['role'] == 'user':
+            while end < len(history) and history[end]['role'] == 'assistant':
+                end += 1
+        del history[start:end]
+
+    def _compress(self, message):
+        content = message['content']
+        marker = content.rfind(self.SEARCH_MARKER)
+        prompt = content[marker + len(self.SEARCH_MARKER):].strip() if marker != -1 else ''
+        compressed = {
+            'role': message['role'],
+            'content': f'[Earlier search results omitted]\n\n{self.SEARCH_MARKER} {prompt}',
+            'kind': 'compressed'
+        }
+        if 'id' in message:
+            compressed['id'] = message['id']
+        return compressed
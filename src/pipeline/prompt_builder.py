@@ -0,0 +1,120 @@
+import uuid
+from src.utils.colors import Colors
+from src.utils.metrics import Metrics
+from src.utils.text import estimate_tokens
+
+FAILED_SEARCH_NOTE = (
+    'FAILED SEARCH: \nThe AI search model was unable to extract any reliable data. Explain that '
+    'and ask if the user would like to search again or respond without web search context.'
+)
+
+class PromptBuilder:
+    """
+    Assembles prompts so consecutive turns share a byte-stable prefix.
+
+    The conversation is append-only: system message, then every turn exactly
+    as it was sent. Volatile content (memory, search results) only ever
+    appears inside the newest user message, in a fixed order:
+
+        USER MEMORY CONTEXT / SEARCH RESULT / FAILED SEARCH / USER PROMPT
+
+    Memory is serialized compactly and deterministically, so the same facts
+    produce identical bytes. This lets the model server reuse its KV cache for
+    everything up to the new user message. render() measures how much of
+    each prompt repeats the previous one.
+    """
+
+    def __init__(self):
+        self._last_prompt = ''
+
+    @staticmethod
+    def message(role, content, kind=None):
+        """
+        Creates a conversation message with a stable 'id'.
+
+        The id survives compression by ContextWindow and saving to disk, so
+        stages that refer back to earlier turns (the summarizer) do not depend
+        on object identity. Like 'kind', it is stripped by render().
+        """
+        message = {'role': role, 'content': content, 'id': uuid.uuid4().hex}
+        if kind:
+            message['kind'] = kind
+        return message
+
+    def user_message(self, prompt, memory_context=None, search_context=None, search_failed=False):
+        """
+        Builds the user message of a turn.
+
+        Args:
+            prompt (str): What the user typed
+            memory_context (str, optional): Relevant user memory, from serialize_memory()
+            search_context (str, optional): Validated page text
+            search_failed (bool, optional): Whether a search ran without usable results
+
+        Returns:
+            dict: Message, tagged 'kind': 'search' when it carries page text
+        """
+        sections = []
+        if memory_context:
+            sections.append(f'USER MEMORY CONTEXT:\n{memory_context}')
+        if search_context:
+            sections.append(f'SEARCH RESULT: {search_context}')
+        elif search_failed:
+            sections.append(FAILED_SEARCH_NOTE)
+
+        if not sections:
+            return self.message('user', prompt)
+        content = '\n\n'.join(sections + [f'USER PROMPT: {prompt}'])
+        return self.message('user', content, 'search' if search_context else None)
+
+    def render(self, messages):
+        """
+        Returns the messages as sent to the model (bookkeeping keys stripped)
+        and records the share of the prompt that repeats the previous one.
+        """
+        sent = [{'role': m['role'], 'content': m['content']} for m in messages]
+        serialized = ''.join(f"<{m['role']}>{m['content']}" for m in sent)
+        reused = self._common_prefix(self._last_prompt, serialized)
+        ratio = reused / len(serialized) if serialized else 0.0
+        self._last_prompt = serialized
+        Metrics.observe('prompt.prefix_reuse', ratio)
+        Colors.print(f"Prompt prefix reuse: {ratio:.0%} ({reused}/{len(serialized)} chars)", Colors.SYSTEM)
+        return sent
+
+    def serialize_memory(self, memory_context):
+        """
+        Renders retrieved memory for the prompt and records its token cost.
+
+        One line per category with "key=value" pairs, a fraction of the tokens
+        of JSON. Sorted, so the same facts always give the same bytes.
+        """
+        if not memory_context:
+            return None
+        lines = []
+        for category in sorted(memory_context):
+            value = memory_context[category]
+            if isinstance(value, dict):
+                items = [f'{k}={v}' for k, v in sorted(value.items())]
+            elif isinstance(value, list):
+                items = sorted(str(v) for v in value)
+            else:
+                items = [str(value)] if value else []
+            if items:
+                lines.append(f"{category}: {'; '.join(items)}")
+        serialized = '\n'.join(lines)
+        tokens = estimate_tokens(serialized)
+        Metrics.observe('memory.tokens_injected', tokens)
+        Colors.print(f"Memory context: {tokens} tokens", Colors.SYSTEM)
+        return serialized or None
+
+    def _common_prefix(self, a, b):
+        limit = min(len(a), len(b))
+        low, high = 0, limit
+        # Binary search on slice equality is far cheaper than a char-by-char loop in Python
+        while low < high:
+            mid = (low + high + 1) // 2
+            if a[:mid] == b[:mid]:
+                low = mid
+            else:
+                high = mid - 1
+        return low
@@ -0,0 +1,202 @@
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from src.config import system_messages as msgs
+from src.memory.conversation_summarizer import ConversationSummarizer
+from src.memory.extraction_scheduler import MemoryExtractionScheduler
+from src.memory.memory_store import MemoryStore
+from src.memory.user_memory import UserMemory
+from src.pipeline.prompt_builder import PromptBuilder
+from src.utils.colors import Colors
+from src.utils.metrics import Metrics
+
+class Session:
+    """
+    Everything the assistant keeps per user session.
+
+    Search, scraping and model clients are shared by all sessions; a session
+    owns its conversation, memory, answer mode and the stages that hold
+    per-conversation state (summary, prompt prefix, pending memory extraction).
+    `lock` serializes the turns of one session while different sessions run concurrently.
+    """
+
+    def __init__(self, session_id, memory, submit_background, conversation=None, fast_mode=False):
+        self.session_id = session_id
+        self.conversation = conversation or [msgs.assistant_msg]
+        self.fast_mode = fast_mode
+        self.memory = memory
+        self.summarizer = ConversationSummarizer()
+        self.prompt_builder = PromptBuilder()
+        self.memory_extraction = MemoryExtractionScheduler(memory, submit_background, session=session_id)
+        self.lock = threading.Lock()
+        # Serializes saves, so an older snapshot never lands on disk after a newer one
+        self.save_lock = threading.Lock()
+        self.last_active = time.time()
+        # Requests currently holding the session; such sessions are never evicted
+        self.users = 0
+        # Evictions whose save has not finished yet
+        self.pending_saves = 0
+
+    def to_dict(self):
+        return {
+            'session_id': self.session_id,
+            'conversation': self.conversation,
+            'fast_mode': self.fast_mode,
+            'saved_at': time.time()
+        }
+
+class SessionManager:
+    """
+    In-memory table of active sessions with LRU eviction to disk.
+
+    This class is responsible for:
+    - Creating sessions on first use and restoring saved ones from data/sessions
+    - Keeping at most `max_sessions` in memory, evicting the least recently used
+    - Saving sessions idle for longer than `idle_timeout` and dropping them from memory
+    - Giving each session its own memory store (the 'default' session keeps the
+      original data/memory store, so the command line assistant is unchanged)
+    """
+
+    DEFAULT_SESSION = 'default'
+    SESSION_ID = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+    def __init__(self, submit_background, max_sessions=64, idle_timeout=30 * 60, path=None):
+        """
+        Args:
+            submit_background (callable): submit(name, fn, *args) used for memory extraction jobs
+            max_sessions (int, optional): Sessions kept in memory. Defaults to 64.
+            idle_timeout (int, optional): Seconds after which an idle session is saved and unloaded
+            path (str, optional): Directory for saved sessions. Defaults to data/sessions
+        """
+        if path is None:
+            path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', 'sessions')
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.submit_background = submit_background
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions = OrderedDict()
+        # Evicted sessions still being written; a get() takes them back instead of reading a stale file
+        self._saving = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def use(self, session_id=DEFAULT_SESSION):
+        """
+        Holds a session for one turn: loads it if needed, keeps it from being
+        evicted and serializes it against other turns of the same session.
+
+        Raises:
+            ValueError: If `session_id` is not 1-64 letters, digits, '-' or '_'
+        """
+        session = self.get(session_id, hold=True)
+        try:
+            with session.lock:
+                yield session
+        finally:
+            with self._lock:
+                session.users -= 1
+                session.last_active = time.time()
+
+    def get(self, session_id=DEFAULT_SESSION, hold=False):
+        """
+        Returns the session, loading or creating it as needed.
+
+        Raises:
+            ValueError: If `session_id` is not 1-64 letters, digits, '-' or '_'
+        """
+        if not self.SESSION_ID.match(session_id or ''):
+            raise ValueError(f"Invalid session id: {session_id!r}")
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._saving.pop(session_id, None)
+                if session is None:
+                    session = self._load(session_id)
+                    Metrics.incr('sessions.loaded')
+                self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
+            session.last_active = time.time()
+            if hold:
+                session.users += 1
+            evicted = self._select_evictions()
+        for old in evicted:
+            self._save(old)
+            with self._lock:
+                old.pending_saves -= 1
+                if not old.pending_saves and self._saving.get(old.session_id) is old:
+                    del self._saving[old.session_id]
+        return session
+
+    def save_all(self):
+        """Saves every in-memory session (e.g. on shutdown)."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+        for session in sessions:
+            self._save(session)
+
+    def stats(self):
+        with self._lock:
+            return {'active': len(self._sessions), 'evicted': Metrics.get('sessions.evicted')}
+
+    def _select_evictions(self):
+        now = time.time()
+        evicted = []
+        # Oldest first; sessions in the middle of a turn are never evicted
+        for session_id, session in list(self._sessions.items()):
+            over_capacity = len(self._sessions) > self.max_sessions
+            idle = now - session.last_active > self.idle_timeout
+            if not over_capacity and not idle:
+                break
+            if session.users:
+                continue
+            del self._sessions[session_id]
+            session.pending_saves += 1
+            self._saving[session_id] = session
+            evicted.append(session)
+            Metrics.incr('sessions.evicted')
+        return evicted
+
+    def _load(self, session_id):
+        conversation, fast_mode = None, False
+        file_path = self._file(session_id)
+        if os.path.exists(file_path):
+            try:
+                with open(file_path, 'r') as f:
+                    saved = json.load(f)
+                conversation = saved.get('conversation')
+                # Sessions saved before messages carried ids; the summarizer matches turns by id
+                for message in (conversation or [])[1:]:
+                    message.setdefault('id', uuid.uuid4().hex)
+                fast_mode = bool(saved.get('fast_mode'))
+            except (OSError, ValueError) as e:
+                Colors.print(f"Could not restore session {session_id}: {str(e)}", Colors.ERROR)
+        return Session(session_id, self._memory(session_id), self.submit_background, conversation, fast_mode)
+
+    def _memory(self, session_id):
+        if session_id == self.DEFAULT_SESSION:
+            return UserMemory()
+        memory_dir = os.path.join(self.path, session_id)
+        os.makedirs(memory_dir, exist_ok=True)
+        return UserMemory(MemoryStore(path=os.path.join(memory_dir, 'memory.db')))
+
+    def _save(self, session):
+        with session.save_lock:
+            session.memory_extraction.flush()
+            file_path = self._file(session.session_id)
+            temp_path = file_path + '.tmp'
+            try:
+                with open(temp_path, 'w') as f:
+                    json.dump(session.to_dict(), f, ensure_ascii=False)
+                # Atomic replace, so a crash mid-write never leaves a truncated session
+                os.replace(temp_path, file_path)
+            except (OSError, TypeError, ValueError) as e:
+                Colors.print(f"Could not save session {session.session_id}: {str(e)}", Colors.ERROR)
+
+    def _file(self, session_id):
+        return os.path.join(self.path, f'{session_id}.json')
@@ -0,0 +1,91 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.colors import Colors
+from src.utils.metrics import StageTimer
+
+class TurnPipeline:
+    """
+    Runs the independent pre-answer gates of a turn concurrently and pushes
+    work that does not influence the answer (memory persistence) into the background.
+
+    Gates share a thread pool, so the critical path of a turn costs the slowest
+    gate instead of the sum of all of them. Background jobs run on a single
+    worker so they are applied in submission order.
+    """
+
+    def __init__(self, max_workers=4):
+        self.gate_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='turn-gate')
+        self.background_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='turn-background')
+        self._background = []
+
+    def start_turn(self):
+        return StageTimer('turn')
+
+    def run_gates(self, gates, timer):
+        """
+        Runs every gate concurrently and waits for all of them.
+
+        Args:
+            gates (dict): Mapping of gate name to a zero-argument callable
+            timer (StageTimer): Timer receiving one stage per gate plus the 'gates' wall time
+
+        Returns:
+            dict: Mapping of gate name to its result (None if the gate raised)
+        """
+        start = time.perf_counter()
+        futures = {
+            name: self.gate_executor.submit(self._timed, timer, name, gate)
+            for name, gate in gates.items()
+        }
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                Colors.print(f"Gate '{name}' failed: {str(e)}", Colors.ERROR)
+                results[name] = None
+        timer.record('gates', time.perf_counter() - start)
+        return results
+
+    def submit_background(self, name, fn, *args, **kwargs):
+        """Schedules `fn` off the critical path and returns its future."""
+        future = self.background_executor.submit(self._run_background, name, fn, *args, **kwargs)
+        self._background = [f for f in self._background if not f.done()] + [future]
+        return future
+
+    def wait_background(self, timeout=None):
+        """Blocks until all pending background jobs finished (e.g. before exit)."""
+        for future in list(self._background):
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                pass
+        self._background = [f for f in self._background if not f.done()]
+
+    def report(self, timer):
+        """Prints the per-stage breakdown and the time saved by running gates concurrently."""
+        gate_names = [name for name in timer.stages if name.startswith('gate:')]
+        serial = sum(timer.stages[name] for name in gate_names)
+        parallel = timer.stages.get('gates', 0.0)
+        timer.report()
+        if gate_names:
+            Colors.print(
+                f"Gates serial={serial:.2f}s parallel={parallel:.2f}s saved={max(serial - parallel, 0.0):.2f}s",
+                Colors.SYSTEM
+            )
+
+    def shutdown(self):
+        self.wait_background()
+        self.gate_executor.shutdown(wait=False)
+        self.background_executor.shutdown(wait=True)
+
+    def _timed(self, timer, name, gate):
+        with timer.stage(f'gate:{name}'):
+            return gate()
+
+    def _run_background(self, name, fn, *args, **kwargs):
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            Colors.print(f"Background job '{name}' failed: {str(e)}", Colors.ERROR)
+            return None
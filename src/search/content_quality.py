@@ -0,0 +1,107 @@
+import re
+from src.utils.metrics import Metrics
+from src.utils.text import tokenize
+
+class ContentScorer:
+    """
+    Fast local quality check of scraped page text, run before the LLM validation call.
+
+    Signals:
+    - Keyword overlap: share of query terms (and, with less weight, prompt terms) on the page
+    - Content ratio: share of the words in prose sentences rather than in
+      navigation, menu and footer fragments. Measured on sentences, not lines,
+      since page text may arrive as a single line
+    - Interstitial signatures: cookie walls, paywalls, bot checks, "enable JavaScript" pages
+
+    assess() returns a verdict: 'reject' and 'accept' are confident enough to
+    skip the LLM, 'uncertain' pages still go to it. The score orders candidates
+    so the most promising page is validated first.
+    """
+
+    INTERSTITIALS = re.compile(
+        r'enable javascript|javascript is (disabled|required)|please turn on javascript|'
+        r'we use cookies|cookie (policy|settings|preferences)|accept (all )?cookies|'
+        r'are you a robot|verify you are (a )?human|captcha|checking your browser|just a moment|'
+        r'access denied|403 forbidden|404 not found|page not found|'
+        r'subscribe to (continue|read)|to continue reading|already a subscriber|create a free account to',
+        re.IGNORECASE
+    )
+    MIN_CHARS = 200
+    # A run of text ending in sentence punctuation; menus and link lists rarely have any
+    SENTENCE = re.compile(r'[^.!?\n]+[.!?]+["\'\u201d)\]]*')
+    MIN_WORDS_PER_SENTENCE = 6
+    # Longer "sentences" are fragments glued to the next full stop
+    MAX_WORDS_PER_SENTENCE = 80
+    # Navigation is mostly Title Case ("Home News Sport Business")
+    MAX_CAPITALIZED = 0.5
+    # An interstitial signature only condemns pages with little else on them
+    INTERSTITIAL_MAX_CHARS = 1500
+
+    def __init__(self, accept_score=0.75, reject_score=0.25, prompt_weight=0.3):
+        """
+        Args:
+            accept_score (float, optional): Score at or above which a page is accepted without the LLM
+            reject_score (float, optional): Score below which a page is rejected without the LLM
+            prompt_weight (float, optional): Weight of user prompt terms relative to query terms
+        """
+        self.accept_score = accept_score
+        self.reject_score = reject_score
+        self.prompt_weight = prompt_weight
+
+    def assess(self, text, query, prompt=''):
+        """
+        Scores page text against the search that found it.
+
+        Args:
+            text (str): Scraped page text
+            query (str): Search query that found the page
+            prompt (str, optional): User prompt behind the query
+
+        Returns:
+            dict: 'verdict' ('reject', 'accept' or 'uncertain'), 'score' (0-1) and 'reason'
+        """
+        if not text or len(text.strip()) < self.MIN_CHARS:
+            return self._verdict('reject', 0.0, 'too short')
+
+        interstitial = self.INTERSTITIALS.search(text)
+        if interstitial and len(text) < self.INTERSTITIAL_MAX_CHARS:
+            return self._verdict('reject', 0.0, f'interstitial: {interstitial.group().lower()}')
+
+        overlap = self._overlap(set(tokenize(text)), query, prompt)
+        if overlap == 0:
+            return self._verdict('reject', 0.0, 'no query terms')
+
+        ratio = self._content_ratio(text)
+        score = 0.6 * overlap + 0.4 * ratio
+        if interstitial:
+            score -= 0.15
+
+        if score < self.reject_score:
+            return self._verdict('reject', score, f'overlap {overlap:.0%}, content {ratio:.0%}')
+        if score >= self.accept_score and not interstitial:
+            return self._verdict('accept', score, f'overlap {overlap:.0%}, content {ratio:.0%}')
+        return self._verdict('uncertain', score, f'overlap {overlap:.0%}, content {ratio:.0%}')
+
+    def _overlap(self, page_terms, query, prompt):
+        weights = {term: 1.0 for term in tokenize(query)}
+        for term in tokenize(prompt):
+            weights.setdefault(term, self.prompt_weight)
+        if not weights:
+            return 0.0
+        return sum(w for term, w in weights.items() if term in page_terms) / sum(weights.values())
+
+    def _content_ratio(self, text):
+        total = len(text.split())
+        content = 0
+        for sentence in self.SENTENCE.findall(text):
+            words = sentence.split()
+            if not self.MIN_WORDS_PER_SENTENCE <= len(words) <= self.MAX_WORDS_PER_SENTENCE:
+                continue
+            capitalized = sum(word[0].isupper() for word in words) / len(words)
+            if capitalized <= self.MAX_CAPITALIZED:
+                content += len(words)
+        return content / total if total else 0.0
+
+    def _verdict(self, verdict, score, reason):
+        Metrics.incr(f'content_quality.{verdict}')
+        return {'verdict': verdict, 'score': max(score, 0.0), 'reason': reason}
@@ -0,0 +1,322 @@
+import re
+from html.parser import HTMLParser
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+try:
+    from selectolax.parser import HTMLParser as SelectolaxParser
+except ImportError:
+    SelectolaxParser = None
+
+SKIP_TAGS = frozenset([
+    'head', 'script', 'style', 'noscript', 'template', 'svg', 'canvas', 'iframe',
+    'form', 'button', 'select', 'nav', 'header', 'footer', 'aside'
+])
+BLOCK_TAGS = frozenset([
+    'p', 'div', 'li', 'ul', 'ol', 'dl', 'dt', 'dd', 'pre', 'blockquote', 'section', 'article', 'main',
+    'table', 'tr', 'td', 'th', 'figcaption', 'br', 'hr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'
+])
+HEADING_TAGS = frozenset(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
+CONTENT_TAGS = frozenset(['article', 'main'])
+VOID_TAGS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source', 'track', 'wbr'
+])
+# Page wrappers are never skipped, whatever their class says ("single has-sidebar")
+STRUCTURAL_TAGS = frozenset(['html', 'body', 'main', 'article'])
+# Text inside these never counts as page text, not even for the unfiltered fallback
+HIDDEN_TAGS = frozenset(['head', 'script', 'style', 'noscript', 'template', 'svg'])
+BOILERPLATE_WORDS = frozenset([
+    'nav', 'navbar', 'navigation', 'menu', 'footer', 'cookie', 'cookies', 'consent', 'banner', 'sidebar',
+    'breadcrumb', 'breadcrumbs', 'share', 'sharing', 'social', 'promo', 'advert', 'ad', 'ads',
+    'newsletter', 'subscribe', 'related', 'comment', 'comments', 'popup', 'modal', 'skip'
+])
+# Parts that may accompany a boilerplate word in one class token ("site-footer", "cookie-banner")
+BOILERPLATE_MODIFIERS = frozenset([
+    'site', 'main', 'global', 'primary', 'secondary', 'top', 'bottom', 'left', 'right', 'mobile',
+    'page', 'links', 'link', 'bar', 'box', 'area', 'wrapper', 'container', 'widget', 'section', 'list', 'signup'
+])
+_TOKEN_PARTS = re.compile(r'[_-]+')
+_WHITESPACE = re.compile(r'\s+')
+
+def is_boilerplate(marker):
+    """
+    Whether a class/id string marks boilerplate.
+
+    Only whole tokens count: "footer" or "site-footer" do, but state classes
+    such as "has-sidebar", "comments-open" or "ads-enabled" do not.
+    """
+    for token in marker.lower().split():
+        parts = [part for part in _TOKEN_PARTS.split(token) if part]
+        if (parts and any(part in BOILERPLATE_WORDS for part in parts)
+                and all(part in BOILERPLATE_WORDS or part in BOILERPLATE_MODIFIERS for part in parts)):
+            return True
+    return False
+
+class _BlockCollector:
+    """
+    Receives parser events and keeps the text blocks that look like article body.
+
+    A block is the text between two block-level tags. It is kept when it has
+    enough words and few of them are link text (text density), or when it sits
+    inside <article>/<main>. Headings are kept when body text follows them.
+    Subtrees that are navigation, forms or marked as boilerplate by their
+    class/id are skipped entirely (never html/body/main/article). If nothing
+    passes, the unfiltered page text is returned instead of an empty string.
+    `done` turns true once `max_chars` of body text were collected, so callers
+    can stop parsing early.
+
+    The method names follow lxml's parser target interface.
+    """
+
+    def __init__(self, max_chars, min_words=8, max_link_density=0.5):
+        self.max_chars = max_chars
+        self.min_words = min_words
+        self.max_link_density = max_link_density
+        self.blocks = []
+        self.fallback = []
+        self.raw = []
+        self.raw_chars = 0
+        self.chars = 0
+        self.done = False
+        self._stack = []
+        self._skip_depth = None
+        self._hidden_depth = None
+        self._content_depth = None
+        self._link_depth = 0
+        self._parts = []
+        self._link_chars = 0
+        self._heading = None
+        self._in_heading = False
+
+    def start(self, tag, attrib):
+        tag = tag.lower() if isinstance(tag, str) else ''
+        if tag in VOID_TAGS:
+            if tag in BLOCK_TAGS:
+                self._flush()
+            return
+        self._stack.append(tag)
+        if tag in HIDDEN_TAGS and self._hidden_depth is None:
+            self._hidden_depth = len(self._stack)
+        if self._skip_depth is not None:
+            return
+        marker = f"{attrib.get('class') or ''} {attrib.get('id') or ''}"
+        skip = tag in SKIP_TAGS or (
+            tag not in STRUCTURAL_TAGS and (is_boilerplate(marker) or attrib.get('aria-hidden') == 'true')
+        )
+        if skip:
+            self._flush()
+            self._skip_depth = len(self._stack)
+            return
+        if tag in BLOCK_TAGS:
+            self._flush()
+        if tag in CONTENT_TAGS and self._content_depth is None:
+            self._content_depth = len(self._stack)
+        if tag in HEADING_TAGS:
+            self._in_heading = True
+        if tag == 'a':
+            self._link_depth += 1
+
+    def end(self, tag):
+        tag = tag.lower() if isinstance(tag, str) else ''
+        if tag in VOID_TAGS or tag not in self._stack:
+            return
+        # Unclosed children (<p>, <li> without end tags) are closed along with their parent
+        while self._stack:
+            depth = len(self._stack)
+            current = self._stack.pop()
+            if self._hidden_depth is not None and depth <= self._hidden_depth:
+                self._hidden_depth = None
+            if self._skip_depth is not None:
+                if depth == self._skip_depth:
+                    self._skip_depth = None
+            else:
+                if current in BLOCK_TAGS:
+                    self._flush()
+                if current == 'a':
+                    self._link_depth = max(self._link_depth - 1, 0)
+            if self._content_depth is not None and depth <= self._content_depth:
+                self._content_depth = None
+            if current == tag:
+                break
+
+    def data(self, data):
+        if self._hidden_depth is None and self.raw_chars < self.max_chars:
+            self.raw.append(data)
+            self.raw_chars += len(data)
+        if self._skip_depth is not None or self.done:
+            return
+        self._parts.append(data)
+        if self._link_depth:
+            self._link_chars += len(data.strip())
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        self._flush()
+        return self.text()
+
+    def text(self):
+        blocks = self.blocks or self.fallback
+        if not blocks:
+            # Everything was filtered out: unfiltered text beats an empty page
+            return _WHITESPACE.sub(' ', ''.join(self.raw)).strip()[:self.max_chars]
+        return '\n'.join(blocks)[:self.max_chars]
+
+    def _flush(self):
+        text = _WHITESPACE.sub(' ', ''.join(self._parts)).strip()
+        link_chars, in_heading = self._link_chars, self._in_heading
+        self._parts, self._link_chars, self._in_heading = [], 0, False
+        if not text or self.done:
+            return
+
+        link_density = link_chars / len(text)
+        if in_heading:
+            self._heading = text
+            return
+        if link_density <= self.max_link_density:
+            self.fallback.append(text)
+        in_content = self._content_depth is not None
+        words = len(text.split())
+        if link_density > self.max_link_density or words < (3 if in_content else self.min_words):
+            return
+
+        if self._heading:
+            self.blocks.append(self._heading)
+            self.chars += len(self._heading) + 1
+            self._heading = None
+        self.blocks.append(text)
+        self.chars += len(text) + 1
+        if self.chars >= self.max_chars:
+            self.done = True
+
+class _StdlibParser(HTMLParser):
+    def __init__(self, collector):
+        super().__init__(convert_charrefs=True)
+        self.collector = collector
+
+    def handle_starttag(self, tag, attrs):
+        self.collector.start(tag, dict((key, value or '') for key, value in attrs))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.collector.end(tag)
+
+    def handle_endtag(self, tag):
+        self.collector.end(tag)
+
+    def handle_data(self, data):
+        self.collector.data(data)
+
+class ExtractionSession:
+    """
+    Incremental extraction of one page: feed() decoded HTML as it arrives and
+    stop as soon as it returns True, then read the text with close().
+    """
+
+    def __init__(self, collector, backend):
+        self.collector = collector
+        self.backend = backend
+        if backend == 'lxml':
+            self._parser = etree.HTMLParser(target=collector)
+        else:
+            self._parser = _StdlibParser(collector)
+        self._closed = False
+
+    def feed(self, html):
+        """Parses the next piece of the document and returns whether enough text was collected."""
+        if not self.collector.done:
+            self._parser.feed(html)
+        return self.collector.done
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            try:
+                self._parser.close()
+            except Exception:
+                # Truncated documents are expected when parsing stopped early
+                pass
+        self.collector._flush()
+        return self.collector.text()
+
+class ContentExtractor:
+    """
+    Extracts the main text of an HTML page instead of flattening the whole document.
+
+    Backends, fastest first: selectolax (whole document), lxml and the standard
+    library's html.parser (both incremental, so parsing stops once `max_chars`
+    of body text were found). The fastest installed one is used unless
+    `backend` names another.
+    """
+
+    def __init__(self, max_chars=5000, backend=None):
+        """
+        Args:
+            max_chars (int, optional): Characters of body text to collect. Defaults to 5000.
+            backend (str, optional): 'selectolax', 'lxml' or 'html.parser'. Defaults to the fastest installed.
+        """
+        self.max_chars = max_chars
+        self.backend = backend or self.available_backends()[0]
+        if self.backend not in self.available_backends():
+            raise ValueError(f"HTML parser backend '{self.backend}' is not installed")
+
+    @staticmethod
+    def available_backends():
+        backends = []
+        if SelectolaxParser is not None:
+            backends.append('selectolax')
+        if etree is not None:
+            backends.append('lxml')
+        backends.append('html.parser')
+        return backends
+
+    def extract(self, html):
+        """
+        Returns the main text of `html`, one block per line.
+
+        Args:
+            html (str): Decoded HTML document
+
+        Returns:
+            str: Body text, at most `max_chars` characters
+        """
+        if self.backend == 'selectolax':
+            collector = self._collector()
+            self._walk(SelectolaxParser(html).root, collector)
+            return collector.close()
+        session = self.session()
+        session.feed(html)
+        return session.close()
+
+    def session(self):
+        """Starts an incremental extraction, using the fastest incremental backend."""
+        backend = self.backend if self.backend != 'selectolax' else ('lxml' if etree is not None else 'html.parser')
+        return ExtractionSession(self._collector(), backend)
+
+    def _collector(self):
+        return _BlockCollector(self.max_chars)
+
+    def _walk(self, root, collector):
+        # Iterative walk so deeply nested pages cannot hit the recursion limit
+        if root is None:
+            return
+        stack = [(root, False)]
+        while stack and not collector.done:
+            node, entered = stack.pop()
+            if node.tag == '-text':
+                collector.data(node.text(deep=False))
+                continue
+            if node.tag.startswith('-') or node.tag.startswith('_'):
+                continue
+            if entered:
+                collector.end(node.tag)
+                continue
+            collector.start(node.tag, node.attributes)
+            stack.append((node, True))
+            children = list(node.iter(include_text=True))
+            stack.extend((child, False) for child in reversed(children))
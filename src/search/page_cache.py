@@ -0,0 +1,154 @@
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from src.utils.colors import Colors
+from src.utils.metrics import Metrics
+
+class PageCache:
+    """
+    Persistent cache of extracted page text, stored in SQLite under data/cache.
+
+    This class is responsible for:
+    - Keying pages by normalized URL (scheme/host case, default ports, fragments, tracking params)
+    - Serving entries younger than `ttl` without any network request
+    - Keeping ETag/Last-Modified so stale entries can be revalidated with a conditional GET
+    - Evicting least recently used entries once the stored text exceeds `max_bytes`
+    """
+
+    TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'ref_src')
+
+    def __init__(self, path=None, ttl=6 * 60 * 60, max_bytes=50 * 1024 * 1024):
+        """
+        Args:
+            path (str, optional): SQLite file. Defaults to data/cache/pages.db
+            ttl (int, optional): Seconds an entry is served without revalidation. Defaults to 6 hours.
+            max_bytes (int, optional): Size budget for stored text before LRU eviction. Defaults to 50MB.
+        """
+        if path is None:
+            cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', 'cache')
+            os.makedirs(cache_dir, exist_ok=True)
+            path = os.path.join(cache_dir, 'pages.db')
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS pages ('
+            'url TEXT PRIMARY KEY, text TEXT NOT NULL, etag TEXT, last_modified TEXT, '
+            'fetched_at REAL NOT NULL, accessed_at REAL NOT NULL, size INTEGER NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at)')
+        self._conn.commit()
+
+    @classmethod
+    def normalize_url(cls, url):
+        """
+        Canonicalizes a URL so trivially different links share one cache entry.
+
+        Args:
+            url (str): Absolute URL, already unwrapped from any DuckDuckGo redirect
+
+        Returns:
+            str: Normalized URL
+        """
+        parts = urlsplit(url.strip())
+        scheme = parts.scheme.lower() or 'https'
+        host = (parts.hostname or '').lower()
+        if parts.port and (scheme, parts.port) not in (('http', 80), ('https', 443)):
+            host = f'{host}:{parts.port}'
+        path = parts.path or '/'
+        if len(path) > 1 and path.endswith('/'):
+            path = path[:-1]
+        query = urlencode(sorted(
+            (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not key.lower().startswith(cls.TRACKING_PARAMS)
+        ))
+        return urlunsplit((scheme, host, path, query, ''))
+
+    def get(self, url):
+        """
+        Looks up a page and marks it as recently used.
+
+        Returns:
+            dict: Entry with 'text', 'etag', 'last_modified', 'fetched_at' and 'fresh', or None
+        """
+        key = self.normalize_url(url)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT text, etag, last_modified, fetched_at FROM pages WHERE url = ?', (key,)
+            ).fetchone()
+            if row is None:
+                Metrics.incr('page_cache.miss')
+                return None
+            self._conn.execute('UPDATE pages SET accessed_at = ? WHERE url = ?', (time.time(), key))
+            self._conn.commit()
+
+        entry = {'text': row[0], 'etag': row[1], 'last_modified': row[2], 'fetched_at': row[3]}
+        entry['fresh'] = time.time() - entry['fetched_at'] < self.ttl
+        Metrics.incr('page_cache.hit' if entry['fresh'] else 'page_cache.stale')
+        return entry
+
+    def conditional_headers(self, entry):
+        """Returns the If-None-Match/If-Modified-Since headers for revalidating a stale entry."""
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def revalidated(self, url):
+        """Restarts the TTL of an entry after the server answered 304 Not Modified."""
+        with self._lock:
+            self._conn.execute(
+                'UPDATE pages SET fetched_at = ? WHERE url = ?', (time.time(), self.normalize_url(url))
+            )
+            self._conn.commit()
+        Metrics.incr('page_cache.revalidated')
+
+    def put(self, url, text, etag=None, last_modified=None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO pages (url, text, etag, last_modified, fetched_at, accessed_at, size) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (self.normalize_url(url), text, etag, last_modified, now, now, len(text.encode('utf-8')))
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for url, size in self._conn.execute('SELECT url, size FROM pages ORDER BY accessed_at').fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute('DELETE FROM pages WHERE url = ?', (url,))
+            total -= size
+            evicted += 1
+        Metrics.incr('page_cache.evicted', evicted)
+
+    def stats(self):
+        """
+        Returns cache counters.
+
+        Returns:
+            dict: 'hits' (fresh or revalidated), 'misses' (absent or re-downloaded) and 'hit_rate'
+        """
+        hits = Metrics.get('page_cache.hit') + Metrics.get('page_cache.revalidated')
+        lookups = Metrics.get('page_cache.hit') + Metrics.get('page_cache.stale') + Metrics.get('page_cache.miss')
+        return {
+            'hits': hits,
+            'misses': lookups - hits,
+            'evicted': Metrics.get('page_cache.evicted'),
+            'hit_rate': hits / lookups if lookups else 0.0
+        }
+
+    def report(self):
+        stats = self.stats()
+        Colors.print(f"Page cache: {stats['hits']} hits / {stats['misses']} misses ({stats['hit_rate']:.0%})", Colors.SYSTEM)
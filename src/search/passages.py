@@ -0,0 +1,101 @@
+import re
+from src.utils.metrics import Metrics
+from src.utils.text import tokenize, bm25_scores, estimate_tokens
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+class PassageSelector:
+    """
+    Picks the passages of a page that matter for a query, within a token budget.
+
+    Extracted page text (one block per line) is cut into passages of about
+    `chunk_words` words, each scored with BM25 against the search query and,
+    with less weight, the user prompt. The best passages are packed into the
+    budget and returned in page order, so the model reads them in context.
+    Pages that share no terms with the query fall back to their opening passages.
+    """
+
+    SEPARATOR = '\n...\n'
+
+    def __init__(self, chunk_words=80, prompt_weight=0.5):
+        """
+        Args:
+            chunk_words (int, optional): Target passage length in words. Defaults to 80.
+            prompt_weight (float, optional): Weight of user prompt terms relative to query terms
+        """
+        self.chunk_words = chunk_words
+        self.prompt_weight = prompt_weight
+
+    def select(self, text, query, prompt='', max_tokens=1000):
+        """
+        Returns the most relevant passages of `text` that fit in `max_tokens`.
+
+        Args:
+            text (str): Extracted page text
+            query (str): Search query that found the page
+            prompt (str, optional): User prompt behind the query
+            max_tokens (int, optional): Token budget for the returned text. Defaults to 1000.
+
+        Returns:
+            str: Selected passages in page order
+        """
+        if not text or estimate_tokens(text) <= max_tokens:
+            return text
+
+        passages = self.chunk(text)
+        weights = {term: 1.0 for term in tokenize(query)}
+        for term in tokenize(prompt):
+            weights.setdefault(term, self.prompt_weight)
+        scores = bm25_scores([tokenize(p) for p in passages], weights)
+
+        # Highest score first; ties (including all-zero pages) keep page order
+        order = sorted(range(len(passages)), key=lambda i: (-scores[i], i))
+        chosen, used = [], 0
+        for i in order:
+            cost = estimate_tokens(passages[i]) + 1
+            if used + cost > max_tokens:
+                continue
+            chosen.append(i)
+            used += cost
+
+        if not chosen:
+            # A single passage larger than the whole budget: cut the best one
+            return passages[order[0]][:max_tokens * 4]
+        Metrics.observe('passages.tokens_selected', used)
+        Metrics.observe('passages.tokens_dropped', max(estimate_tokens(text) - used, 0))
+        return self._join(passages, sorted(chosen))
+
+    def chunk(self, text):
+        """Splits text into passages of about `chunk_words` words along block and sentence boundaries."""
+        pieces = []
+        for block in text.splitlines():
+            block = block.strip()
+            if not block:
+                continue
+            if len(block.split()) <= self.chunk_words:
+                pieces.append(block)
+            else:
+                pieces.extend(s for s in _SENTENCE_END.split(block) if s)
+
+        passages, current, words = [], [], 0
+        for piece in pieces:
+            piece_words = len(piece.split())
+            if current and words + piece_words > self.chunk_words:
+                passages.append(' '.join(current))
+                current, words = [], 0
+            current.append(piece)
+            words += piece_words
+        if current:
+            passages.append(' '.join(current))
+        return passages
+
+    def _join(self, passages, indices):
+        parts = []
+        for position, i in enumerate(indices):
+            # Mark gaps so the model does not read two distant passages as one
+            if position and i != indices[position - 1] + 1:
+                parts.append(self.SEPARATOR)
+            elif position:
+                parts.append('\n')
+            parts.append(passages[i])
+        return ''.join(parts)
@@ -2,6 +2,7 @@ import ollama
 from datetime import datetime
 from src.config import system_messages as msgs
 from src.utils.logging import log_step
+from src.utils.model_manager import ModelManager
 from colorama import Fore, Style
 
 class QueryGenerator:
@@ -13,7 +14,7 @@ class QueryGenerator:
         ]
 
     @log_step("Generating search query")
-    def generate(self, convo):
+    def generate(self, convo, session='default'):
         query_msg = (
             'CREATE A SEARCH QUERY FOR THIS PROMPT. '
             'Make it specific and include time frame and topic areas. '
@@ -21,7 +22,7 @@ class QueryGenerator:
             f'{convo[-1]["content"]}'
         )
 
-        response = self._get_model_response(msgs.query_msg, query_msg)
+        response = self._get_model_response(msgs.query_msg, query_msg, session)
         return self._clean_query(response)
 
     def _clean_query(self, query):
@@ -46,9 +47,9 @@ class QueryGenerator:
         
         return query
 
-    def _get_model_response(self, sys_msg, query_msg):
+    def _get_model_response(self, sys_msg, query_msg, session='default'):
         try:
-            response = ollama.chat(
+            response = ModelManager.chat(
                 model=self.model,
                 messages=[
                     {'role': 'system', 'content': (
@@ -61,7 +62,8 @@ class QueryGenerator:
                         '5. Maximum 6-8 words'
                     )},
                     {'role': 'user', 'content': query_msg}
-                ]
+                ],
+                session=session
             )
             return response['message']['content']
         except Exception as e:
@@ -0,0 +1,132 @@
+import re
+import time
+from collections import Counter
+from urllib.parse import urlparse, parse_qs
+from src.utils.text import tokenize, bm25_scores, TIME_SENSITIVE
+
+class ResultRanker:
+    """
+    Local pre-ranking of search results before any LLM is asked to choose.
+
+    Each result is scored on:
+    - BM25 between the search query (and, with less weight, the user prompt)
+      and the result's title and description, normalized to the best result
+    - A prior for the result's domain (reference and primary sources up,
+      content farms and forums down)
+    - Freshness hints in the snippet, for time-sensitive queries only
+
+    When the top result leads the runner-up by a clear margin the LLM selection
+    call can be skipped; otherwise a short list of the best few is enough.
+    """
+
+    DOMAIN_PRIORS = {
+        'wikipedia.org': 0.6,
+        'britannica.com': 0.4,
+        'reuters.com': 0.5,
+        'apnews.com': 0.5,
+        'bbc.com': 0.4,
+        'bbc.co.uk': 0.4,
+        'nytimes.com': 0.3,
+        'theguardian.com': 0.3,
+        'github.com': 0.3,
+        'stackoverflow.com': 0.4,
+        'docs.python.org': 0.5,
+        'reddit.com': -0.2,
+        'quora.com': -0.4,
+        'pinterest.com': -0.8,
+        'answers.com': -0.5
+    }
+    SUFFIX_PRIORS = {'.gov': 0.5, '.edu': 0.4, '.int': 0.3}
+    TIME_SENSITIVE = TIME_SENSITIVE
+    RECENT_HINT = re.compile(r'\b\d+\s+(minutes?|hours?|days?)\s+ago\b', re.IGNORECASE)
+    YEAR = re.compile(r'\b(19\d\d|20\d\d)\b')
+
+    def __init__(self, k1=1.5, b=0.75, prompt_weight=0.5, margin=0.35, shortlist_size=3):
+        """
+        Args:
+            k1 (float, optional): BM25 term frequency saturation. Defaults to 1.5.
+            b (float, optional): BM25 length normalization. Defaults to 0.75.
+            prompt_weight (float, optional): Weight of user prompt terms relative to query terms
+            margin (float, optional): Score lead over the runner-up that makes the top result a clear winner
+            shortlist_size (int, optional): Results offered to the LLM when there is no clear winner
+        """
+        self.k1 = k1
+        self.b = b
+        self.prompt_weight = prompt_weight
+        self.margin = margin
+        self.shortlist_size = shortlist_size
+
+    def rank(self, results, query, prompt=''):
+        """
+        Orders results from most to least promising.
+
+        Args:
+            results (list): Result dictionaries from SearchEngine.search
+            query (str): The search query that produced them
+            prompt (str, optional): The user prompt behind the query
+
+        Returns:
+            list: (score, result) tuples, best first
+        """
+        if not results:
+            return []
+        documents = [tokenize(f"{r.get('title', '')} {r.get('search_description', '')}") for r in results]
+        weights = Counter({term: 1.0 for term in tokenize(query)})
+        for term in tokenize(prompt):
+            weights[term] = max(weights[term], self.prompt_weight)
+
+        relevance = bm25_scores(documents, weights, self.k1, self.b)
+        best = max(relevance) or 1.0
+        time_sensitive = bool(self.TIME_SENSITIVE.search(f'{query} {prompt}'))
+
+        scored = []
+        for result, score in zip(results, relevance):
+            score = score / best + self.domain_prior(result['link'])
+            if time_sensitive:
+                score += self._freshness(f"{result.get('title', '')} {result.get('search_description', '')}")
+            scored.append((score, result))
+        # sorted is stable, so ties keep the search engine's order
+        return sorted(scored, key=lambda item: item[0], reverse=True)
+
+    def clear_winner(self, ranked):
+        """Returns the top result if it leads the runner-up by at least `margin`, else None."""
+        if len(ranked) == 1:
+            return ranked[0][1]
+        if len(ranked) > 1 and ranked[0][0] - ranked[1][0] >= self.margin:
+            return ranked[0][1]
+        return None
+
+    def shortlist(self, ranked):
+        return [result for _, result in ranked[:self.shortlist_size]]
+
+    def domain_prior(self, link):
+        host = self.host(link)
+        for domain, prior in self.DOMAIN_PRIORS.items():
+            if host == domain or host.endswith('.' + domain):
+                return prior
+        for suffix, prior in self.SUFFIX_PRIORS.items():
+            if host.endswith(suffix):
+                return prior
+        return 0.0
+
+    @staticmethod
+    def host(link):
+        """Host of a result link, looking through DuckDuckGo redirect URLs."""
+        if link.startswith('//'):
+            link = 'https:' + link
+        parsed = urlparse(link)
+        if parsed.netloc.endswith('duckduckgo.com') and parsed.path.startswith('/l/'):
+            target = parse_qs(parsed.query).get('uddg')
+            if target:
+                parsed = urlparse(target[0])
+        host = parsed.netloc.lower().split(':')[0]
+        return host[4:] if host.startswith('www.') else host
+
+    def _freshness(self, text):
+        if self.RECENT_HINT.search(text):
+            return 0.3
+        years = [int(year) for year in self.YEAR.findall(text)]
+        if not years:
+            return 0.0
+        age = time.localtime().tm_year - max(years)
+        return 0.2 if age <= 0 else -0.1 * min(age, 3)
@@ -1,61 +1,152 @@
+import codecs
+import re
 import requests
-from bs4 import BeautifulSoup
 from colorama import Fore, Style
-import time
 from src.utils.colors import Colors
+from src.utils.metrics import Metrics
+from src.utils.http_client import HttpClient
+from src.utils.rate_limiter import RateLimiter
+from src.search.page_cache import PageCache
+from src.search.extractor import ContentExtractor
 
 class WebScraper:
+    HTML_TYPES = ('text/html', 'application/xhtml+xml')
+    MAX_BYTES = 3 * 1024 * 1024
+    CHUNK_SIZE = 16 * 1024
+    META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([a-zA-Z0-9_-]+)', re.IGNORECASE)
+
+    def __init__(self, http_client=None, rate_limiter=None, page_cache=None, extractor=None, max_bytes=MAX_BYTES):
+        self.http_client = http_client or HttpClient.shared()
+        # Throttles per host, so fetches to different domains never wait on each other
+        self.rate_limiter = rate_limiter or RateLimiter(rate=1.0, burst=2)
+        self.page_cache = page_cache or PageCache()
+        # Extract more than any prompt uses; PassageSelector picks the relevant part per query
+        self.extractor = extractor or ContentExtractor(max_chars=20000)
+        # Hard cap on body bytes read per page, whatever the server claims
+        self.max_bytes = max_bytes
+
     def scrape(self, url):
         Colors.print("Scraping webpage", Colors.SYSTEM)
         try:
-            # Fix URLs missing scheme
-            if url.startswith('//'):
-                url = 'https:' + url
+            url = self._resolve_url(url)
 
-            # Extract actual URL from DuckDuckGo redirect
-            if 'duckduckgo.com/l/?' in url:
-                url = url.split('uddg=')[1].split('&')[0]
-                url = requests.utils.unquote(url)
-                Colors.print(f"Redirecting to: {url}", Colors.SYSTEM)
-            
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
+            # Serve fresh pages from disk, revalidate stale ones with a conditional GET
+            cached = self.page_cache.get(url)
+            if cached and cached['fresh']:
+                Colors.print("Using cached page", Colors.SUCCESS)
+                return cached['text']
             
-            # Add delay to avoid rate limiting
-            time.sleep(1)
+            # Only delay when the same host is being hit too frequently
+            self.rate_limiter.acquire(url)
             
-            response = requests.get(url, headers=headers, timeout=10)
-            
-            # Check for redirect
-            if response.history:
-                print(f'{Fore.YELLOW}[Redirecting to: {response.url}]{Style.RESET_ALL}')
-                
-            # Handle common error codes
-            if response.status_code == 403:
-                print(f'{Fore.RED}[Access denied - trying alternative source]{Style.RESET_ALL}')
-                return None
-            elif response.status_code != 200:
-                print(f'{Fore.RED}[Error: HTTP {response.status_code}]{Style.RESET_ALL}')
-                return None
+            # Stream the body so it can be rejected up front and abandoned once enough text is found
+            response = self.http_client.get(
+                url, timeout=10, headers=self.page_cache.conditional_headers(cached), stream=True
+            )
+            try:
+                if response.status_code == 304 and cached:
+                    Colors.print("Cached page not modified", Colors.SUCCESS)
+                    self.page_cache.revalidated(url)
+                    return cached['text']
                 
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
-                
-            text = soup.get_text()
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            text = ' '.join(chunk for chunk in chunks if chunk)
-            
-            return text[:5000]  # Limit text length
+                # Check for redirect
+                if response.history:
+                    print(f'{Fore.YELLOW}[Redirecting to: {response.url}]{Style.RESET_ALL}')
+                    
+                # Handle common error codes
+                if response.status_code == 403:
+                    print(f'{Fore.RED}[Access denied - trying alternative source]{Style.RESET_ALL}')
+                    return None
+                elif response.status_code != 200:
+                    print(f'{Fore.RED}[Error: HTTP {response.status_code}]{Style.RESET_ALL}')
+                    return None
+
+                if not self._acceptable(response):
+                    return None
+
+                # Keep the article body rather than menus, footers and cookie banners
+                text = self._read_text(response)
+            finally:
+                response.close()
+
+            if text:
+                self.page_cache.put(
+                    url, text,
+                    etag=response.headers.get('ETag'),
+                    last_modified=response.headers.get('Last-Modified')
+                )
+            return text
             
         except requests.exceptions.RequestException as e:
             print(f'{Fore.RED}[Scraping error: {str(e)}]{Style.RESET_ALL}')
             return None
 
+    def _acceptable(self, response):
+        """Checks the response headers before any of the body is read."""
+        content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type and content_type not in self.HTML_TYPES:
+            Metrics.incr('scraper.skipped_type')
+            print(f'{Fore.RED}[Skipping non-HTML content: {content_type}]{Style.RESET_ALL}')
+            return False
+        length = response.headers.get('Content-Length')
+        if length and length.isdigit() and int(length) > self.max_bytes:
+            Metrics.incr('scraper.skipped_size')
+            print(f'{Fore.RED}[Skipping oversized page: {int(length) // 1024} KB]{Style.RESET_ALL}')
+            return False
+        return True
+
+    def _read_text(self, response):
+        """
+        Decodes the body chunk by chunk into an incremental extraction.
+
+        Reading stops when the extractor has enough text or `max_bytes` were
+        read; the rest of the body is never downloaded.
+        """
+        session = self.extractor.session()
+        decoder = None
+        received = 0
+        for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder(self._encoding(response, chunk))(errors='replace')
+            received += len(chunk)
+            if session.feed(decoder.decode(chunk)):
+                Metrics.incr('scraper.early_stop')
+                break
+            if received >= self.max_bytes:
+                Metrics.incr('scraper.byte_cap')
+                print(f'{Fore.YELLOW}[Page truncated at {self.max_bytes // 1024} KB]{Style.RESET_ALL}')
+                break
+        else:
+            if decoder is not None:
+                session.feed(decoder.decode(b'', final=True))
+        Metrics.incr('scraper.bytes_read', received)
+        return session.close()
+
+    def _encoding(self, response, first_chunk):
+        # requests assumes ISO-8859-1 for text/* without a charset; HTML usually declares its own
+        if 'charset' in response.headers.get('Content-Type', '').lower() and response.encoding:
+            encoding = response.encoding
+        else:
+            match = self.META_CHARSET.search(first_chunk)
+            encoding = match.group(1).decode('ascii') if match else 'utf-8'
+        try:
+            codecs.lookup(encoding)
+            return encoding
+        except LookupError:
+            return 'utf-8'
+
+    def _resolve_url(self, url):
+        # Fix URLs missing scheme
+        if url.startswith('//'):
+            url = 'https:' + url
+
+        # Extract actual URL from DuckDuckGo redirect
+        if 'duckduckgo.com/l/?' in url:
+            url = url.split('uddg=')[1].split('&')[0]
+            url = requests.utils.unquote(url)
+            Colors.print(f"Redirecting to: {url}", Colors.SYSTEM)
+        return url
+
     def scrape_alternative(self, url):
         # Implementation of scrape_alternative method
         pass
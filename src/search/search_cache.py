@@ -0,0 +1,122 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from src.utils.metrics import Metrics
+from src.utils.text import tokenize
+
+class SearchCache:
+    """
+    Short-lived cache in front of SearchEngine.search.
+
+    This class is responsible for:
+    - Keying results on a canonical query (stopword-stripped, token-sorted), so
+      "latest ukraine news" and "ukraine latest news" share one entry
+    - Expiring entries after a short, news-friendly TTL, and keeping at most
+      `max_entries` in memory whether or not they are persisted
+    - Coalescing concurrent identical queries into a single HTTP request
+    - Optionally persisting entries to data/cache/search_cache.json across restarts
+    """
+
+    def __init__(self, ttl=300, persist=False, path=None, max_entries=512):
+        """
+        Args:
+            ttl (int, optional): Seconds a result list stays valid. Defaults to 5 minutes.
+            max_entries (int, optional): Entries kept; the oldest go first beyond it. Defaults to 512.
+            persist (bool, optional): Whether to keep entries on disk across restarts. Defaults to False.
+            path (str, optional): JSON file used when persisting. Defaults to data/cache/search_cache.json
+        """
+        self.ttl = ttl
+        self.persist = persist
+        self.max_entries = max_entries
+        if persist and path is None:
+            cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', 'cache')
+            os.makedirs(cache_dir, exist_ok=True)
+            path = os.path.join(cache_dir, 'search_cache.json')
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = self._load() if persist else {}
+        self._inflight = {}
+
+    @staticmethod
+    def canonical_query(query):
+        return ' '.join(sorted(set(tokenize(query)))) or query.strip().lower()
+
+    def get_or_fetch(self, query, fetch):
+        """
+        Returns cached results for `query`, or runs `fetch(query)` once for all concurrent callers.
+
+        Args:
+            query (str): Search query as generated by QueryGenerator
+            fetch (callable): Performs the real search and returns a list of results
+
+        Returns:
+            list: Copy of the result dictionaries (callers are free to mutate it)
+        """
+        key = self.canonical_query(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.time() - entry['stored_at'] < self.ttl:
+                Metrics.incr('search_cache.hit')
+                return self._copy(entry['results'])
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+
+        if not owner:
+            Metrics.incr('search_cache.coalesced')
+            return self._copy(future.result())
+
+        Metrics.incr('search_cache.miss')
+        results = []
+        try:
+            results = fetch(query)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+                # Failed or empty searches are not cached so the next turn retries
+                if results:
+                    self._put(key, results)
+                    if self.persist:
+                        self._save()
+            future.set_result(results)
+        return self._copy(results)
+
+    def stats(self):
+        hits = Metrics.get('search_cache.hit') + Metrics.get('search_cache.coalesced')
+        lookups = hits + Metrics.get('search_cache.miss')
+        return {'hits': hits, 'misses': lookups - hits, 'hit_rate': hits / lookups if lookups else 0.0}
+
+    def _put(self, key, results):
+        now = time.time()
+        # Expired entries are dropped on every write, so distinct queries never pile up
+        self._entries = {k: v for k, v in self._entries.items() if now - v['stored_at'] < self.ttl and k != key}
+        self._entries[key] = {'stored_at': now, 'results': results}
+        # Insertion order is storage order: the oldest entries are evicted first
+        for stale in list(self._entries)[:max(len(self._entries) - self.max_entries, 0)]:
+            del self._entries[stale]
+
+    def _copy(self, results):
+        return [dict(result) for result in results]
+
+    def _load(self):
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r') as f:
+                    entries = json.load(f)
+                now = time.time()
+                return {k: v for k, v in entries.items() if now - v['stored_at'] < self.ttl}
+        except Exception:
+            pass
+        return {}
+
+    def _save(self):
+        tmp_path = f'{self.path}.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
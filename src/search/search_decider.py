@@ -0,0 +1,263 @@
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from src.config import system_messages as msgs
+from src.utils.colors import Colors
+from src.utils.metrics import Metrics
+from src.utils.model_manager import ModelManager
+from src.utils.model_scheduler import Priority
+from src.utils.text import tokenize, TIME_SENSITIVE
+from src.utils.thinking_indicator import thinking_context
+
+class _TextClassifier:
+    """TF-IDF features over unigrams and bigrams with an L2-regularized logistic regression."""
+
+    def __init__(self):
+        self.idf = {}
+        self.weights = {}
+        self.bias = 0.0
+
+    def _terms(self, text):
+        tokens = tokenize(text, drop_stopwords=False)
+        return tokens + [f'{a}_{b}' for a, b in zip(tokens, tokens[1:])]
+
+    def _vector(self, text):
+        counts = Counter(term for term in self._terms(text) if term in self.idf)
+        vector = {term: count * self.idf[term] for term, count in counts.items()}
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        return {term: v / norm for term, v in vector.items()}
+
+    def fit(self, texts, labels, epochs=30, learning_rate=0.5, l2=1e-4):
+        documents = len(texts)
+        df = Counter(term for text in texts for term in set(self._terms(text)))
+        self.idf = {term: math.log((1 + documents) / (1 + count)) + 1 for term, count in df.items()}
+        vectors = [self._vector(text) for text in texts]
+        self.weights, self.bias = {}, 0.0
+        order = list(range(documents))
+        rng = random.Random(0)
+        for _ in range(epochs):
+            rng.shuffle(order)
+            for i in order:
+                error = self._sigmoid(vectors[i]) - labels[i]
+                for term, value in vectors[i].items():
+                    weight = self.weights.get(term, 0.0)
+                    self.weights[term] = weight - learning_rate * (error * value + l2 * weight)
+                self.bias -= learning_rate * error
+
+    def coverage(self, text):
+        """Share of the text's terms seen during training."""
+        terms = self._terms(text)
+        return sum(term in self.idf for term in terms) / len(terms) if terms else 0.0
+
+    def predict_proba(self, text):
+        return self._sigmoid(self._vector(text))
+
+    def _sigmoid(self, vector):
+        z = self.bias + sum(self.weights.get(term, 0.0) * value for term, value in vector.items())
+        return 1.0 / (1.0 + math.exp(-max(min(z, 30.0), -30.0)))
+
+class SearchDecider:
+    """
+    Tiered decision whether a user prompt needs a web search.
+
+    Tiers, cheapest first:
+    1. Rules: time-sensitive language means search, greetings/thanks/acknowledgements mean no search
+    2. A local TF-IDF + logistic regression model trained on logged LLM decisions
+    3. The LLM gate, only for prompts the first two tiers are unsure about
+
+    Every LLM decision is appended to data/search_decisions.jsonl and the local
+    model is retrained in the background every `retrain_every` labels, on the
+    most recent `max_examples` (the log is compacted to match). A sample of
+    local decisions is audited against the LLM in the background to track the
+    agreement rate.
+    """
+
+    TIME_SENSITIVE = TIME_SENSITIVE
+    SMALL_TALK = re.compile(
+        r"^\s*(hi|hello|hey|yo|thanks|thank you|thx|ok|okay|cool|nice|great|bye|goodbye|good (morning|evening|night)|"
+        r"how are you|who are you|what'?s up|yes|no|sure)\b",
+        re.IGNORECASE
+    )
+
+    def __init__(self, log_path=None, confident=0.85, min_examples=30, retrain_every=20, audit_rate=0.05,
+                 min_coverage=0.5, max_examples=2000):
+        """
+        Args:
+            log_path (str, optional): JSONL file of LLM decisions. Defaults to data/search_decisions.jsonl
+            confident (float, optional): Model probability (or 1 - probability) needed to skip the LLM
+            min_examples (int, optional): Labels required before the local model is used
+            retrain_every (int, optional): New labels between retraining runs
+            audit_rate (float, optional): Share of local decisions re-checked by the LLM in the background
+            min_coverage (float, optional): Share of a prompt's terms the model must know to be trusted
+            max_examples (int, optional): Most recent labels kept for training. Defaults to 2000.
+        """
+        if log_path is None:
+            data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data')
+            os.makedirs(data_dir, exist_ok=True)
+            log_path = os.path.join(data_dir, 'search_decisions.jsonl')
+        self.log_path = log_path
+        self.confident = confident
+        self.min_examples = min_examples
+        self.retrain_every = retrain_every
+        self.audit_rate = audit_rate
+        self.min_coverage = min_coverage
+        self.max_examples = max_examples
+        self.model = None
+        self._examples = deque(self._load_examples(), maxlen=max_examples)
+        self._new_labels = 0
+        self._logged = len(self._examples)
+        self._training = False
+        self._lock = threading.Lock()
+        self._train()
+
+    def should_search(self, prompt, session='default'):
+        start = time.perf_counter()
+        decision, tier = self._local_decision(prompt)
+        if decision is None:
+            with thinking_context("Checking if search needed"):
+                decision = self._ask_llm(prompt, session=session)
+            tier = 'llm'
+        elif random.random() < self.audit_rate:
+            threading.Thread(target=self._audit, args=(prompt, decision, session), daemon=True).start()
+
+        Metrics.incr(f'search_decider.{tier}')
+        Metrics.observe(f'search_decider.latency.{tier}', time.perf_counter() - start)
+        Colors.print(f"Search needed: {decision} ({tier})", Colors.SUCCESS)
+        return decision
+
+    def _local_decision(self, prompt):
+        if self.TIME_SENSITIVE.search(prompt):
+            return True, 'rules'
+        if self.SMALL_TALK.match(prompt) and len(prompt.split()) <= 6:
+            return False, 'rules'
+        # Prompts made mostly of unseen words say little about the model's confidence
+        if self.model is not None and self.model.coverage(prompt) >= self.min_coverage:
+            probability = self.model.predict_proba(prompt)
+            if probability >= self.confident:
+                return True, 'model'
+            if probability <= 1 - self.confident:
+                return False, 'model'
+        return None, None
+
+    def _ask_llm(self, prompt, priority=Priority.GATE, session='default', audit=False):
+        response = ModelManager.chat(
+            messages=[
+                {'role': 'system', 'content': msgs.search_or_not_msg},
+                {'role': 'user', 'content': prompt}
+            ],
+            model='llama3.2:3b',
+            priority=priority,
+            session=session
+        )
+        if response is None:
+            return False
+        decision = 'true' in response['message']['content'].lower()
+        # Audits are counted separately in _audit, so each comparison is counted once
+        if not audit:
+            self._track_agreement(prompt, decision)
+        self._record(prompt, decision)
+        return decision
+
+    def _audit(self, prompt, local_decision, session='default'):
+        try:
+            llm_decision = self._ask_llm(prompt, priority=Priority.BACKGROUND, session=session, audit=True)
+        except Exception as e:
+            Colors.print(f"Search decision audit failed: {str(e)}", Colors.ERROR)
+            return
+        Metrics.incr('search_decider.audit.agree' if llm_decision == local_decision else 'search_decider.audit.disagree')
+
+    def _track_agreement(self, prompt, llm_decision):
+        # In the uncertain band the model still has a best guess; compare it with the LLM
+        if self.model is not None:
+            model_decision = self.model.predict_proba(prompt) >= 0.5
+            Metrics.incr('search_decider.agree' if model_decision == llm_decision else 'search_decider.disagree')
+
+    def agreement_rate(self):
+        agree = Metrics.get('search_decider.agree') + Metrics.get('search_decider.audit.agree')
+        total = agree + Metrics.get('search_decider.disagree') + Metrics.get('search_decider.audit.disagree')
+        return agree / total if total else None
+
+    def report(self):
+        tiers = {tier: Metrics.get(f'search_decider.{tier}') for tier in ('rules', 'model', 'llm')}
+        if not any(tiers.values()):
+            return
+        latencies = ', '.join(
+            f"{tier} {count} ({Metrics.mean(f'search_decider.latency.{tier}') * 1000:.1f}ms)"
+            for tier, count in tiers.items() if count
+        )
+        agreement = self.agreement_rate()
+        agreement = f'{agreement:.0%}' if agreement is not None else 'n/a'
+        Colors.print(f"Search decisions: {latencies}; agreement with LLM: {agreement}", Colors.SYSTEM)
+
+    def _record(self, prompt, decision):
+        with self._lock:
+            self._examples.append((prompt, decision))
+            self._new_labels += 1
+            self._logged += 1
+            # One training run at a time, off the gate path: the current model keeps serving meanwhile
+            retrain = self._new_labels >= self.retrain_every and not self._training
+            if retrain:
+                self._training = True
+            try:
+                with open(self.log_path, 'a') as f:
+                    f.write(json.dumps({'prompt': prompt, 'search': decision}) + '\n')
+            except OSError as e:
+                Colors.print(f"Could not log search decision: {str(e)}", Colors.ERROR)
+        if retrain:
+            threading.Thread(target=self._retrain, name='search-decider-train', daemon=True).start()
+
+    def _retrain(self):
+        try:
+            self._compact_log()
+            self._train()
+        finally:
+            with self._lock:
+                self._training = False
+
+    def _compact_log(self):
+        # The log only needs the labels still used for training; rewrite it once it holds twice as many
+        with self._lock:
+            if self._logged < 2 * self.max_examples:
+                return
+            examples = list(self._examples)
+            temp_path = self.log_path + '.tmp'
+            try:
+                with open(temp_path, 'w') as f:
+                    for prompt, search in examples:
+                        f.write(json.dumps({'prompt': prompt, 'search': search}) + '\n')
+                os.replace(temp_path, self.log_path)
+                self._logged = len(examples)
+            except OSError as e:
+                Colors.print(f"Could not compact search decision log: {str(e)}", Colors.ERROR)
+
+    def _load_examples(self):
+        examples = []
+        try:
+            if os.path.exists(self.log_path):
+                with open(self.log_path, 'r') as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                            examples.append((entry['prompt'], bool(entry['search'])))
+                        except (ValueError, KeyError):
+                            continue
+        except OSError:
+            pass
+        return examples
+
+    def _train(self):
+        with self._lock:
+            examples = list(self._examples)
+            self._new_labels = 0
+        labels = [1.0 if search else 0.0 for _, search in examples]
+        # Both classes are needed for a meaningful decision boundary
+        if len(examples) < self.min_examples or len(set(labels)) < 2:
+            return
+        model = _TextClassifier()
+        model.fit([prompt for prompt, _ in examples], labels)
+        self.model = model
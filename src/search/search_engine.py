@@ -1,9 +1,10 @@
-import requests
 from bs4 import BeautifulSoup
 from src.utils.logging import log_step
 from colorama import Fore, Style
 from urllib.parse import urljoin, urlparse, unquote
 from src.utils.colors import Colors
+from src.utils.http_client import HttpClient
+from src.search.search_cache import SearchCache
 
 class SearchEngine:
     """
@@ -14,8 +15,18 @@ class SearchEngine:
     - Parsing search results into a structured format
     - Filtering out problematic URLs and file types
     - Handling errors and providing appropriate feedback
+    - Caching results of recent, equivalent queries
     """
 
+    def __init__(self, http_client=None, cache=None):
+        """
+        Args:
+            http_client (HttpClient, optional): Pooled client to use. Defaults to the shared client.
+            cache (SearchCache, optional): Result cache to use. Defaults to an in-memory cache with a 5 minute TTL.
+        """
+        self.http_client = http_client or HttpClient.shared()
+        self.cache = cache or SearchCache()
+
     @log_step("Searching the web")
     def search(self, query, num_results=10):
         """
@@ -26,21 +37,29 @@ class SearchEngine:
             num_results (int, optional): Maximum number of results to return. Defaults to 10.
             
         Returns:
-            list: List of dictionaries containing search results with 'id', 'link', and 'search_description'
+            list: List of dictionaries containing search results with 'id', 'title', 'link', and 'search_description'
         """
-        Colors.print("Searching DuckDuckGo", Colors.SYSTEM)
+        # Identical or reordered queries (e.g. from both debate agents) share one request
+        return self.cache.get_or_fetch(query, self._fetch_results)
+
+    def _fetch_results(self, query):
+        """
+        Queries DuckDuckGo's HTML endpoint, bypassing the cache.
         
-        # Set up headers to mimic a real browser request
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        }
+        Args:
+            query (str): The search query to execute
+            
+        Returns:
+            list: Parsed search results, empty on failure
+        """
+        Colors.print("Searching DuckDuckGo", Colors.SYSTEM)
         
         # Construct the DuckDuckGo HTML search URL
         url = f'https://html.duckduckgo.com/html/?q={query}'
         
         try:
-            # Make the request and verify successful response
-            response = requests.get(url, headers=headers)
+            # Make the request over the shared keep-alive session (browser User-Agent is set on the session)
+            response = self.http_client.get(url)
             response.raise_for_status()
             
             # Parse the results and handle success/failure cases
@@ -95,6 +114,7 @@ class SearchEngine:
             # Add the parsed result to our list
             results.append({
                 'id': i,  # Unique identifier for this result
+                'title': title_tag.text.strip(),  # Headline of the result
                 'link': link,  # URL of the result
                 'search_description': snippet  # Preview text from the webpage
             })
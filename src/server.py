@@ -0,0 +1,235 @@
+"""
+Network front-end for the Assistant: an asyncio HTTP server streaming tokens over SSE.
+
+Usage:
+    python -m src.server --port 8000 --max-concurrent 8
+    curl -N -X POST localhost:8000/chat -d '{"prompt": "hello", "session_id": "alice"}'
+
+Endpoints:
+    POST /chat    {"prompt": str, "session_id": str (optional, defaults to 'default')}
+                  Streams Server-Sent Events as the turn runs:
+                    event: token  data: {"channel": "answer" | debate stage name, "text": str}
+                    event: done   data: {"session_id": str, "messages": int}
+                    event: error  data: {"error": str}
+    GET  /health  Active requests, the concurrency limit and session table stats
+
+Requests beyond `max_concurrent` are refused with 503 rather than queued, so a
+client can retry elsewhere instead of waiting on a saturated process. When a
+client disconnects mid-turn, its session's streams are cancelled at once, even
+if they are stalled or still queued for the model, and the turn is rolled back.
+"""
+import argparse
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.main import Assistant
+from src.pipeline.session_manager import SessionManager
+from src.utils.colors import Colors
+from src.utils.metrics import Metrics
+from src.utils.model_manager import ModelManager, ChatStream, GenerationCancelled
+
+class AssistantServer:
+    """
+    Serves Assistant.process_input over HTTP.
+
+    Each turn runs on a worker thread (the pipeline is synchronous); its tokens
+    are handed to the event loop through on_token and written to the client as
+    SSE events. A watcher on the connection notices the client going away and
+    keeps cancelling the session's streams until the turn has stopped, so a
+    stream opened after the disconnect is cancelled too; a token that still
+    arrives makes the callback raise GenerationCancelled.
+    """
+
+    MAX_BODY = 64 * 1024
+    HEADER_TIMEOUT = 10
+
+    def __init__(self, assistant=None, host='127.0.0.1', port=8000, max_concurrent=8):
+        """
+        Args:
+            assistant (Assistant, optional): Assistant to serve. Defaults to a new one.
+            host (str, optional): Interface to listen on. Defaults to 127.0.0.1.
+            port (int, optional): Port to listen on, 0 for any free one. Defaults to 8000.
+            max_concurrent (int, optional): Turns processed at once; more get 503. Defaults to 8.
+        """
+        self.assistant = assistant or Assistant(concurrent_turns=max_concurrent)
+        self.host = host
+        self.port = port
+        self.max_concurrent = max_concurrent
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix='server-turn')
+        self.active = 0
+
+    async def serve(self):
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        # With port 0 the OS picks a free port
+        self.port = server.sockets[0].getsockname()[1]
+        Colors.print(f"Serving on http://{self.host}:{self.port} (max {self.max_concurrent} concurrent)", Colors.SYSTEM)
+        async with server:
+            await server.serve_forever()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+        self.assistant.sessions.save_all()
+        self.assistant.pipeline.shutdown()
+
+    async def _handle(self, reader, writer):
+        try:
+            try:
+                method, path, body = await asyncio.wait_for(self._read_request(reader), self.HEADER_TIMEOUT)
+                if method == 'GET' and path == '/health':
+                    await self._send_json(writer, 200, {
+                        'status': 'ok',
+                        'active': self.active,
+                        'max_concurrent': self.max_concurrent,
+                        'rejected': Metrics.get('server.rejected'),
+                        'cancelled': Metrics.get('server.cancelled'),
+                        'sessions': self.assistant.sessions.stats()
+                    })
+                elif method == 'POST' and path == '/chat':
+                    await self._chat(reader, writer, body)
+                else:
+                    await self._send_json(writer, 404, {'error': 'not found'})
+            except (ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError) as e:
+                await self._send_json(writer, 400, {'error': f'bad request: {str(e)}'})
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        request_line = (await reader.readline()).decode('latin-1').strip()
+        if not request_line:
+            raise ValueError('empty request')
+        method, path, _ = request_line.split(' ', 2)
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get('content-length') or 0)
+        if length > self.MAX_BODY:
+            raise ValueError('body too large')
+        body = await reader.readexactly(length) if length else b''
+        return method, path.split('?', 1)[0], body
+
+    async def _chat(self, reader, writer, body):
+        request = json.loads(body or b'{}')
+        if not isinstance(request, dict):
+            raise ValueError('body must be a JSON object')
+        prompt = request.get('prompt')
+        session_id = request.get('session_id') or SessionManager.DEFAULT_SESSION
+        if not isinstance(prompt, str) or not prompt.strip():
+            raise ValueError("'prompt' must be a non-empty string")
+        if not isinstance(session_id, str) or not SessionManager.SESSION_ID.match(session_id):
+            raise ValueError("'session_id' must be 1-64 letters, digits, '-' or '_'")
+
+        # Refuse instead of queueing: a queued request would hold its client without a first token
+        if self.active >= self.max_concurrent:
+            Metrics.incr('server.rejected')
+            await self._send_json(writer, 503, {'error': 'server busy'}, {'Retry-After': '1'})
+            return
+
+        self.active += 1
+        Metrics.incr('server.requests')
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue()
+        # Set on the loop, read by the turn's thread
+        disconnected = threading.Event()
+
+        def on_token(channel, text):
+            # Runs on the turn's thread; raising here leaves the stream and aborts the generation
+            if disconnected.is_set():
+                raise GenerationCancelled()
+            loop.call_soon_threadsafe(events.put_nowait, ('token', {'channel': channel, 'text': text}))
+
+        def run_turn():
+            return self.assistant.process_input(prompt, session_id, on_token=on_token)
+
+        turn = loop.run_in_executor(self.executor, run_turn)
+        turn.add_done_callback(lambda _: events.put_nowait(None))
+        watcher = asyncio.ensure_future(self._watch_disconnect(reader, disconnected, session_id, turn))
+        try:
+            writer.write(
+                b'HTTP/1.1 200 OK\r\n'
+                b'Content-Type: text/event-stream\r\n'
+                b'Cache-Control: no-cache\r\n'
+                b'Connection: close\r\n\r\n'
+            )
+            await writer.drain()
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                await self._send_event(writer, *event)
+            conversation = turn.result()
+            await self._send_event(writer, 'done', {'session_id': session_id, 'messages': len(conversation)})
+        except ConnectionError:
+            disconnected.set()
+        except Exception as e:
+            Colors.print(f"Turn failed: {str(e)}", Colors.ERROR)
+            await self._send_event(writer, 'error', {'error': str(e)})
+        finally:
+            if disconnected.is_set():
+                Metrics.incr('server.cancelled')
+            watcher.cancel()
+            # The slot is released once the turn's thread has actually stopped
+            if disconnected.is_set():
+                await self._cancel_turn(turn, session_id)
+            else:
+                await asyncio.wait([turn])
+            self.active -= 1
+
+    async def _watch_disconnect(self, reader, disconnected, session_id, turn):
+        """
+        Waits for the client to go away: EOF or a connection error. Stray bytes
+        after the request body are ignored. A client that half-closes its
+        sending side also reads as EOF, so it counts as gone; HTTP clients
+        don't do that while waiting for a response.
+        """
+        try:
+            while await reader.read(1024):
+                pass
+        except ConnectionError:
+            pass
+        disconnected.set()
+        await self._cancel_turn(turn, session_id)
+
+    async def _cancel_turn(self, turn, session_id):
+        # Stops the generation now rather than at its next token, which a stalled model
+        # never sends; repeated for streams the turn opens later, e.g. one queued for a slot
+        while not turn.done():
+            ModelManager.cancel_streams(session_id)
+            await asyncio.wait([turn], timeout=ChatStream.POLL_INTERVAL)
+
+    async def _send_event(self, writer, event, data):
+        writer.write(f'event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n'.encode('utf-8'))
+        await writer.drain()
+
+    async def _send_json(self, writer, status, data, headers=None):
+        reasons = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 503: 'Service Unavailable'}
+        payload = json.dumps(data).encode('utf-8')
+        head = f'HTTP/1.1 {status} {reasons[status]}\r\nContent-Type: application/json\r\n'
+        head += f'Content-Length: {len(payload)}\r\nConnection: close\r\n'
+        head += ''.join(f'{name}: {value}\r\n' for name, value in (headers or {}).items())
+        writer.write(head.encode('latin-1') + b'\r\n' + payload)
+        await writer.drain()
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the assistant over HTTP with SSE token streaming')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--max-concurrent', type=int, default=8, help='Turns processed at once; more get 503')
+    args = parser.parse_args()
+
+    server = AssistantServer(host=args.host, port=args.port, max_concurrent=args.max_concurrent)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        print("\nGoodbye!")
+    finally:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
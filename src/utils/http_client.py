@@ -0,0 +1,145 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+from src.utils.metrics import Metrics
+
+class _CountingHTTPConnection(HTTPConnection):
+    def request(self, *args, **kwargs):
+        Metrics.incr('http.pool.checkout')
+        return super().request(*args, **kwargs)
+
+    def connect(self):
+        # Only called when no live keep-alive socket is available
+        Metrics.incr('http.pool.miss')
+        return super().connect()
+
+class _CountingHTTPSConnection(HTTPSConnection):
+    def request(self, *args, **kwargs):
+        Metrics.incr('http.pool.checkout')
+        return super().request(*args, **kwargs)
+
+    def connect(self):
+        Metrics.incr('http.pool.miss')
+        return super().connect()
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _CountingHTTPConnection
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _CountingHTTPSConnection
+
+class _CountingAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools count new connections versus reused keep-alive ones."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _CountingHTTPConnectionPool,
+            'https': _CountingHTTPSConnectionPool
+        }
+
+class _BoundedRetry(Retry):
+    """Retry whose Retry-After waits are capped at `max_retry_after` seconds."""
+
+    def __init__(self, *args, max_retry_after=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_retry_after = max_retry_after
+
+    def new(self, **kw):
+        # urllib3 rebuilds the retry state after every attempt; keep the cap on the copy
+        retry = super().new(**kw)
+        retry.max_retry_after = self.max_retry_after
+        return retry
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None or self.max_retry_after is None:
+            return retry_after
+        return min(retry_after, self.max_retry_after)
+
+class HttpClient:
+    """
+    Shared, pooled HTTP client used by SearchEngine and WebScraper.
+
+    Wraps a single requests.Session so repeated requests to the same host
+    reuse keep-alive connections instead of paying a new TCP/TLS handshake.
+
+    Features:
+    - Per-host connection limit (pool_maxsize) across a bounded number of hosts (pool_connections)
+    - Retries with exponential backoff on connection errors and retryable status codes
+    - Retry-After waits (429/503) capped at the request timeout, so a server cannot stall a worker
+    - Pool hit/miss counters via stats()
+    """
+
+    USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, pool_connections=16, pool_maxsize=4, retries=2, backoff_factor=0.5,
+                 status_forcelist=(429, 500, 502, 503, 504), timeout=10):
+        """
+        Args:
+            pool_connections (int): Number of per-host pools kept alive
+            pool_maxsize (int): Maximum open connections per host
+            retries (int): Retry attempts for failed connections and `status_forcelist` responses
+            backoff_factor (float): Exponential backoff factor between retries in seconds
+            status_forcelist (tuple): HTTP status codes that trigger a retry
+            timeout (float): Default request timeout in seconds
+        """
+        self.timeout = timeout
+        retry = _BoundedRetry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=status_forcelist,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False,
+            max_retry_after=timeout
+        )
+        # pool_block keeps concurrent scrapes within the per-host connection limit
+        adapter = _CountingAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry,
+            pool_block=True
+        )
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': self.USER_AGENT})
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    @classmethod
+    def shared(cls):
+        """Returns the process-wide client so every component reuses the same connection pools."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        Metrics.incr('http.requests')
+        return self.session.get(url, **kwargs)
+
+    def stats(self):
+        """
+        Returns connection pool counters.
+
+        Returns:
+            dict: 'requests', 'hits' (reused connections), 'misses' (new connections) and 'hit_rate'
+        """
+        checkouts = Metrics.get('http.pool.checkout')
+        misses = Metrics.get('http.pool.miss')
+        hits = max(checkouts - misses, 0)
+        return {
+            'requests': Metrics.get('http.requests'),
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / checkouts if checkouts else 0.0
+        }
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,130 @@
+import ast
+import json
+import re
+
+_TRAILING_COMMA = re.compile(r',\s*([}\]])')
+
+class JsonObjectExtractor:
+    """
+    Finds the first JSON object in model output, fed as a whole or chunk by chunk.
+
+    Tolerates what small models wrap around or do to JSON: leading prose, code
+    fences, trailing commentary, trailing commas, Python-style literals
+    (single quotes, True/None) and output cut off before the closing braces.
+    Braces inside strings are tracked, so a '}' in a value does not end the object.
+
+    Usage:
+        extractor = JsonObjectExtractor()
+        for chunk in stream:
+            if extractor.feed(chunk) is not None:
+                break
+        result = extractor.close()
+    """
+
+    def __init__(self):
+        self.result = None
+        self.repaired = False
+        self._buffer = []
+        self._stack = []
+        # Buffer length at the last member boundary of each open container
+        self._marks = []
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, text):
+        """
+        Scans the next piece of output.
+
+        Returns:
+            dict: The object once a complete one was found, else None
+        """
+        if self.result is not None:
+            return self.result
+        for char in text:
+            if not self._stack:
+                # Outside any object: prose, code fences and quotes in prose are ignored
+                if char == '{':
+                    self._buffer = [char]
+                    self._stack = ['}']
+                    self._marks = [1]
+                continue
+
+            self._buffer.append(char)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == self._in_string:
+                    self._in_string = False
+            elif char in '"\'':
+                self._in_string = char
+            elif char in '{[':
+                self._stack.append('}' if char == '{' else ']')
+                self._marks.append(len(self._buffer))
+            elif char == ',':
+                self._marks[-1] = len(self._buffer)
+            elif char in '}]':
+                if char == self._stack[-1]:
+                    self._stack.pop()
+                    self._marks.pop()
+                if not self._stack:
+                    self.result = self._parse(''.join(self._buffer))
+                    if self.result is not None:
+                        return self.result
+                    # Not an object after all (e.g. "{placeholder}" in prose); keep looking
+                    self._buffer = []
+        return None
+
+    def close(self):
+        """
+        Ends the input and returns the object, completing one cut off mid-way if possible.
+
+        A key or value cut off inside its string is dropped with the rest of
+        its member, so a half-written value is never returned as if complete.
+
+        Returns:
+            dict: The extracted object, or None
+        """
+        if self.result is None and self._stack:
+            text = ''.join(self._buffer)
+            if self._in_string:
+                text = text[:self._marks[-1]]
+            text = text.rstrip().rstrip(',')
+            self.result = self._parse(text + ''.join(reversed(self._stack)))
+            if self.result is not None:
+                self.repaired = True
+        return self.result
+
+    def _parse(self, text):
+        try:
+            value = json.loads(text)
+        except ValueError:
+            cleaned = _TRAILING_COMMA.sub(r'\1', text)
+            try:
+                value = json.loads(cleaned)
+            except ValueError:
+                try:
+                    # Single-quoted keys/values and True/False/None, as in a Python dict repr
+                    value = ast.literal_eval(
+                        re.sub(r'\btrue\b', 'True', re.sub(r'\bfalse\b', 'False', re.sub(r'\bnull\b', 'None', cleaned)))
+                    )
+                except (ValueError, SyntaxError, MemoryError, RecursionError):
+                    return None
+            if isinstance(value, dict):
+                self.repaired = True
+        return value if isinstance(value, dict) else None
+
+def extract_json_object(text):
+    """
+    Returns the first JSON object in `text`, or None.
+
+    Args:
+        text (str): Model output, possibly with prose, code fences or a truncated object
+
+    Returns:
+        dict: The parsed object, or None if there is none to recover
+    """
+    extractor = JsonObjectExtractor()
+    extractor.feed(text or '')
+    return extractor.close()
@@ -0,0 +1,110 @@
+import time
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from src.utils.colors import Colors
+
+class Metrics:
+    """
+    Process-wide counters and timing observations shared by all components.
+
+    Observations are kept as running aggregates (count, sum, min, max) rather
+    than every value, so a long-running server uses constant memory per metric.
+    """
+    _lock = threading.Lock()
+    _counters = defaultdict(int)
+    # name -> [count, sum, min, max]
+    _observations = {}
+
+    @staticmethod
+    def incr(name, amount=1):
+        with Metrics._lock:
+            Metrics._counters[name] += amount
+
+    @staticmethod
+    def observe(name, value):
+        with Metrics._lock:
+            aggregate = Metrics._observations.get(name)
+            if aggregate is None:
+                Metrics._observations[name] = [1, value, value, value]
+            else:
+                aggregate[0] += 1
+                aggregate[1] += value
+                aggregate[2] = min(aggregate[2], value)
+                aggregate[3] = max(aggregate[3], value)
+
+    @staticmethod
+    def get(name):
+        with Metrics._lock:
+            return Metrics._counters.get(name, 0)
+
+    @staticmethod
+    def ratio(numerator, denominator_names):
+        """Returns counter `numerator` divided by the sum of `denominator_names`."""
+        with Metrics._lock:
+            total = sum(Metrics._counters.get(name, 0) for name in denominator_names)
+            return Metrics._counters.get(numerator, 0) / total if total else 0.0
+
+    @staticmethod
+    def mean(name):
+        with Metrics._lock:
+            aggregate = Metrics._observations.get(name)
+            return aggregate[1] / aggregate[0] if aggregate else 0.0
+
+    @staticmethod
+    def summary(name):
+        """
+        Returns:
+            dict: count, sum, min, max and mean of observation `name` (zeros if never observed)
+        """
+        with Metrics._lock:
+            return Metrics._summary(Metrics._observations.get(name))
+
+    @staticmethod
+    def _summary(aggregate):
+        count, total, low, high = aggregate or (0, 0.0, 0.0, 0.0)
+        return {'count': count, 'sum': total, 'min': low, 'max': high, 'mean': total / count if count else 0.0}
+
+    @staticmethod
+    def snapshot():
+        with Metrics._lock:
+            return {
+                'counters': dict(Metrics._counters),
+                'observations': {k: Metrics._summary(v) for k, v in Metrics._observations.items()}
+            }
+
+    @staticmethod
+    def reset():
+        with Metrics._lock:
+            Metrics._counters.clear()
+            Metrics._observations.clear()
+
+class StageTimer:
+    """Collects wall-clock durations of the named stages of a single turn."""
+
+    def __init__(self, name='turn'):
+        self.name = name
+        self.started = time.perf_counter()
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+        Metrics.observe(f'{self.name}.{name}', seconds)
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+    def report(self, color=Colors.SYSTEM):
+        with self._lock:
+            parts = [f'{name}={seconds:.2f}s' for name, seconds in self.stages.items()]
+        Colors.print(f"{self.name} timing: {', '.join(parts)}", color)
@@ -1,30 +1,395 @@
+import asyncio
+import concurrent.futures
+import queue
+import threading
 import ollama
 from src.utils.colors import Colors
+from src.utils.model_scheduler import ModelScheduler, Priority
+
+class GenerationCancelled(Exception):
+    """
+    Raised by a token callback to abandon a streamed generation, e.g. when the
+    client it streams to has disconnected. Leaving the ChatStream iteration
+    with it aborts the request on the server.
+    """
+
+class ChatStream:
+    """
+    Synchronous view of a streamed generation running on the ModelManager event loop.
+
+    Iterating yields response chunks as they arrive; errors raised by the model
+    call are re-raised from the iteration. cancel() aborts the request on the
+    server side, after which iteration simply ends and `cancelled` is True.
+    Leaving the iteration early (break, exception, KeyboardInterrupt) cancels
+    the generation as well.
+    """
+
+    _END = object()
+    # How often a consumer waiting for chunks checks that the generation is still running
+    POLL_INTERVAL = 0.5
+
+    def __init__(self, agen_factory, max_buffered=64):
+        # A bounded buffer applies backpressure: a slow consumer pauses the read from the server
+        self._queue = queue.Queue(maxsize=max_buffered)
+        self.cancelled = False
+        self._future = asyncio.run_coroutine_threadsafe(self._pump(agen_factory), ModelManager._get_loop())
+
+    async def _pump(self, agen_factory):
+        loop = asyncio.get_running_loop()
+        try:
+            async for chunk in agen_factory():
+                if not await loop.run_in_executor(None, self._put, chunk):
+                    return
+            await loop.run_in_executor(None, self._put, self._END)
+        except asyncio.CancelledError:
+            # Cancelled from outside (cancel_session, cancel_all)
+            self.cancelled = True
+            self._end()
+            raise
+        except Exception as e:
+            await loop.run_in_executor(None, self._put, e)
+
+    def _put(self, item):
+        """
+        Waits for room in the buffer, giving up once the stream is cancelled, so
+        an executor thread is never left blocked on a consumer that stopped reading.
+
+        Returns:
+            bool: True if `item` was queued
+        """
+        while not self.cancelled:
+            try:
+                self._queue.put(item, timeout=self.POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _end(self):
+        # Chunks still buffered are dropped: nothing is yielded after a cancel
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        try:
+            # Wakes a consumer waiting on an empty buffer; if a late put took the
+            # slot, the consumer still stops at its next check of `cancelled`
+            self._queue.put_nowait(self._END)
+        except queue.Full:
+            pass
+
+    def __iter__(self):
+        # The pump may still be winding down after queuing its last item; that is not a cancel
+        finished = False
+        try:
+            while not self.cancelled:
+                try:
+                    item = self._queue.get(timeout=self.POLL_INTERVAL)
+                except queue.Empty:
+                    # A pump cancelled before it started never sends the end marker
+                    if self._future.done():
+                        return
+                    continue
+                if self.cancelled:
+                    return
+                if item is self._END:
+                    finished = True
+                    return
+                if isinstance(item, Exception):
+                    finished = True
+                    raise item
+                yield item
+        finally:
+            if not finished and not self._future.done():
+                self.cancel()
+
+    def cancel(self):
+        # Set first, so a pump waiting for room and the consumer both stop at their next check
+        self.cancelled = True
+        self._future.cancel()
+        self._end()
 
 class ModelManager:
+    """
+    Single entry point for all model calls.
+
+    Every request runs on one background asyncio event loop through
+    ollama.AsyncClient, which makes generations cancellable and lets
+    deadlines abort the HTTP request instead of merely being ignored.
+
+    This class is responsible for:
+    - Async API (achat/astream) for callers running on the model loop
+    - Blocking wrappers (chat) for the synchronous pipeline stages
+    - Per-call deadlines and cancellation of in-flight generations, per session
+    - Admission through a ModelScheduler: per-model concurrency limits,
+      priority classes and fair queuing across sessions
+    """
+
     FAST_MODEL = 'llama3.2:3b'
     DEFAULT_MODEL = 'deepseek-r1:7b'
-    
+    # How long Ollama keeps a model loaded after the last request
+    KEEP_ALIVE = '10m'
+    # Concurrent requests allowed per model; the daemon queues anything beyond this anyway
+    MAX_CONCURRENCY = {FAST_MODEL: 2, DEFAULT_MODEL: 1}
+
+    _loop = None
+    _client = None
+    scheduler = ModelScheduler(MAX_CONCURRENCY)
+    # session -> in-flight request tasks, so one session can be cancelled without touching others
+    _tasks = {}
+    # session -> open interactive streams (answers, debate stages), see cancel_streams
+    _streams = {}
+    _lock = threading.Lock()
+
     @staticmethod
     def get_model(fast_mode=False):
         return ModelManager.FAST_MODEL if fast_mode else ModelManager.DEFAULT_MODEL
-    
+
+    @staticmethod
+    def _get_loop():
+        with ModelManager._lock:
+            if ModelManager._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='model-loop', daemon=True).start()
+                ModelManager._client = ollama.AsyncClient()
+                ModelManager._loop = loop
+            return ModelManager._loop
+
     @staticmethod
-    def chat(messages, model=FAST_MODEL, stream=False, timeout=None):
+    async def achat(messages, model=FAST_MODEL, timeout=None, options=None, format=None, keep_alive=KEEP_ALIVE,
+                    priority=Priority.GATE, session='default'):
+        """
+        Runs a non-streamed chat request on the model loop.
+
+        Args:
+            messages (list): Chat messages
+            model (str, optional): Model name. Defaults to FAST_MODEL.
+            timeout (float, optional): Deadline in seconds covering queueing and generation
+            options (dict, optional): Ollama model options
+            format (str|dict, optional): 'json' or a JSON schema for structured output
+            keep_alive (str, optional): How long the model stays loaded afterwards
+            priority (int, optional): Priority class. Defaults to Priority.GATE.
+            session (str, optional): Session the request belongs to, for fair queuing
+
+        Returns:
+            ChatResponse: The model response
+
+        Raises:
+            asyncio.TimeoutError: If the deadline passed; the request is aborted
+        """
+        task = ModelManager._track(session)
         try:
-            options = {}
-            if timeout:
-                options['timeout'] = timeout
-            response = ollama.chat(
+            return await asyncio.wait_for(
+                ModelManager._achat(messages, model, options, format, keep_alive, priority, session), timeout
+            )
+        finally:
+            ModelManager._untrack(session, task)
+
+    @staticmethod
+    async def _achat(messages, model, options, format, keep_alive, priority, session):
+        async with ModelManager.scheduler.slot(model, priority, session):
+            return await ModelManager._client.chat(
                 model=model,
                 messages=messages,
-                stream=stream,
-                options=options
+                options=options,
+                format=format,
+                keep_alive=keep_alive
             )
+
+    @staticmethod
+    async def astream(messages, model=FAST_MODEL, timeout=None, options=None, keep_alive=KEEP_ALIVE,
+                      priority=Priority.INTERACTIVE, session='default', format=None):
+        """
+        Streams a chat response on the model loop.
+
+        The deadline covers the whole generation; once it passes the stream is
+        closed and asyncio.TimeoutError is raised. The scheduler slot is held
+        until the stream finishes or is cancelled.
+
+        Yields:
+            ChatResponse: Response chunks
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout else None
+        task = ModelManager._track(session)
+        try:
+            async with ModelManager.scheduler.slot(model, priority, session):
+                stream = await asyncio.wait_for(
+                    ModelManager._client.chat(
+                        model=model,
+                        messages=messages,
+                        stream=True,
+                        options=options,
+                        format=format,
+                        keep_alive=keep_alive
+                    ),
+                    deadline - loop.time() if deadline else None
+                )
+                try:
+                    while True:
+                        remaining = deadline - loop.time() if deadline else None
+                        try:
+                            chunk = await asyncio.wait_for(stream.__anext__(), remaining)
+                        except StopAsyncIteration:
+                            break
+                        yield chunk
+                finally:
+                    await stream.aclose()
+        finally:
+            ModelManager._untrack(session, task)
+
+    @staticmethod
+    def submit(coro):
+        """Schedules a coroutine on the model loop and returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, ModelManager._get_loop())
+
+    @staticmethod
+    def chat(messages, model=FAST_MODEL, stream=False, timeout=None, options=None, format=None,
+             keep_alive=KEEP_ALIVE, priority=None, session='default'):
+        """
+        Blocking wrapper around achat/astream for synchronous callers.
+
+        Streams default to Priority.INTERACTIVE, single responses to Priority.GATE.
+
+        Returns:
+            ChatResponse | ChatStream | None: The response, a cancellable stream
+            when `stream` is True, or None if the call failed or timed out
+        """
+        try:
             if stream:
-                return response  # Return the stream directly for the caller to process
-            return response
+                priority = Priority.INTERACTIVE if priority is None else priority
+                response_stream = ChatStream(lambda: ModelManager.astream(
+                    messages, model, timeout=timeout, options=options, keep_alive=keep_alive,
+                    priority=priority, session=session, format=format
+                ))
+                if priority == Priority.INTERACTIVE:
+                    ModelManager._add_stream(session, response_stream)
+                return response_stream
+            return ModelManager.submit(ModelManager.achat(
+                messages, model, timeout, options, format, keep_alive,
+                priority=Priority.GATE if priority is None else priority, session=session
+            )).result()
+        except asyncio.TimeoutError:
+            Colors.print(f"Chat timed out after {timeout}s", Colors.ERROR)
+            return None
         except Exception as e:
             Colors.print(f"Chat error: {str(e)}", Colors.ERROR)
             # Consider invoking a centralized error handler here
-            return None 
\ No newline at end of file
+            return None
+
+    @staticmethod
+    def scheduler_stats():
+        """Returns queue depths, active slots and mean waits of the scheduler (read on the model loop)."""
+        return ModelManager.submit(ModelManager._scheduler_stats()).result()
+
+    @staticmethod
+    async def _scheduler_stats():
+        return ModelManager.scheduler.stats()
+
+    @staticmethod
+    def _track(session):
+        task = asyncio.current_task()
+        ModelManager._tasks.setdefault(session, set()).add(task)
+        return task
+
+    @staticmethod
+    def _untrack(session, task):
+        tasks = ModelManager._tasks.get(session)
+        if tasks is not None:
+            tasks.discard(task)
+            if not tasks:
+                del ModelManager._tasks[session]
+
+    @staticmethod
+    def _add_stream(session, stream):
+        with ModelManager._lock:
+            ModelManager._streams.setdefault(session, set()).add(stream)
+        stream._future.add_done_callback(lambda _: ModelManager._remove_stream(session, stream))
+
+    @staticmethod
+    def _remove_stream(session, stream):
+        with ModelManager._lock:
+            streams = ModelManager._streams.get(session)
+            if streams is not None:
+                streams.discard(stream)
+                if not streams:
+                    del ModelManager._streams[session]
+
+    @staticmethod
+    def cancel_streams(session='default'):
+        """
+        Cancels the open interactive streams of one session, whether they are
+        generating or still waiting for a slot. Its gate and background
+        requests (memory extraction, summaries) keep running.
+
+        Returns:
+            int: Number of streams cancelled
+        """
+        with ModelManager._lock:
+            streams = list(ModelManager._streams.get(session, ()))
+        for stream in streams:
+            stream.cancel()
+        return len(streams)
+
+    @staticmethod
+    def cancel_preloads(session='default'):
+        """Aborts the warm-ups of one session, leaving its other requests running."""
+        ModelManager.cancel_session(ModelManager._preload_key(session))
+
+    @staticmethod
+    def cancel_session(session='default'):
+        """Aborts the in-flight model requests of one session (warm-ups are tracked apart, see cancel_preloads)."""
+        loop = ModelManager._get_loop()
+        loop.call_soon_threadsafe(
+            lambda: [task.cancel() for task in list(ModelManager._tasks.get(session, ()))]
+        )
+
+    @staticmethod
+    def cancel_all():
+        """Aborts every in-flight model request of every session (e.g. on shutdown)."""
+        loop = ModelManager._get_loop()
+        loop.call_soon_threadsafe(
+            lambda: [task.cancel() for tasks in list(ModelManager._tasks.values()) for task in list(tasks)]
+        )
+
+    @staticmethod
+    def preload(model, system_msg=None, session='default'):
+        """
+        Loads `model` into the server and, if given, evaluates `system_msg` so a
+        following request sharing that prefix skips model load and most of its prefill.
+        An empty message list only loads the model.
+
+        Warm-ups go through the scheduler at background priority, so they respect
+        the model's concurrency limit and never take a slot a waiting request needs.
+        """
+        messages = [{'role': 'system', 'content': system_msg}] if system_msg else []
+        try:
+            ModelManager.submit(ModelManager._apreload(model, messages, session)).result()
+            return True
+        except concurrent.futures.CancelledError:
+            # Cancelled through cancel_preloads
+            return False
+        except Exception as e:
+            Colors.print(f"Preload error: {str(e)}", Colors.ERROR)
+            return False
+
+    @staticmethod
+    async def _apreload(model, messages, session):
+        # Tracked under their own key, so they can be dropped without the session's background work
+        key = ModelManager._preload_key(session)
+        task = ModelManager._track(key)
+        try:
+            async with ModelManager.scheduler.slot(model, Priority.BACKGROUND, session):
+                await ModelManager._client.chat(
+                    model=model,
+                    messages=messages,
+                    options={'num_predict': 1},
+                    keep_alive=ModelManager.KEEP_ALIVE
+                )
+        finally:
+            ModelManager._untrack(key, task)
+
+    @staticmethod
+    def _preload_key(session):
+        return f'{session}:preload'
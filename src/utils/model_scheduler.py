@@ -0,0 +1,140 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from src.utils.metrics import Metrics
+
+class Priority:
+    """Priority classes of model requests, lower values are served first."""
+    INTERACTIVE = 0  # Answers and debate stages the user is watching
+    GATE = 1         # Search decision, result selection, validation, opinion check, query generation
+    BACKGROUND = 2   # Memory extraction, summarization
+
+    NAMES = {INTERACTIVE: 'interactive', GATE: 'gate', BACKGROUND: 'background'}
+
+class _ModelQueue:
+    def __init__(self, limit):
+        self.limit = limit
+        self.active = 0
+        # priority -> session -> waiting futures; sessions are served round-robin
+        self.waiting = {priority: OrderedDict() for priority in Priority.NAMES}
+
+    def depth(self, priority=None):
+        priorities = [priority] if priority is not None else list(self.waiting)
+        return sum(len(q) for p in priorities for q in self.waiting[p].values())
+
+class ModelScheduler:
+    """
+    Admission control in front of the Ollama daemon.
+
+    Every model has its own concurrency limit and wait queue. When a slot
+    frees up it goes to the highest priority class with waiters; within a
+    class, sessions take turns so one busy session cannot starve the others.
+    Wait times and queue depths are recorded per priority class.
+
+    All methods must be called from the event loop the requests run on. To exercise
+    the scheduler without a real model server, start scripts/stub_ollama_server.py
+    and point OLLAMA_HOST at it; tests/test_model_scheduler.py drives it that way.
+    """
+
+    def __init__(self, limits=None, default_limit=1):
+        """
+        Args:
+            limits (dict, optional): Concurrent requests allowed per model name
+            default_limit (int, optional): Limit for models missing from `limits`. Defaults to 1.
+        """
+        self.limits = dict(limits or {})
+        self.default_limit = default_limit
+        self._queues = {}
+
+    def _queue(self, model):
+        if model not in self._queues:
+            self._queues[model] = _ModelQueue(self.limits.get(model, self.default_limit))
+        return self._queues[model]
+
+    @asynccontextmanager
+    async def slot(self, model, priority=Priority.GATE, session='default'):
+        """Waits for a free slot of `model` and holds it for the duration of the block."""
+        await self._acquire(model, priority, session)
+        try:
+            yield
+        finally:
+            self._release(model)
+
+    async def _acquire(self, model, priority, session):
+        model_queue = self._queue(model)
+        started = time.perf_counter()
+        if model_queue.active < model_queue.limit and model_queue.depth() == 0:
+            model_queue.active += 1
+            self._record_wait(model, priority, 0.0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        sessions = model_queue.waiting[priority]
+        sessions.setdefault(session, deque()).append(future)
+        Metrics.observe(f'scheduler.{model}.depth', model_queue.depth())
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted just before the cancellation arrived
+                self._release(model)
+            else:
+                self._discard(sessions, session, future)
+            raise
+        self._record_wait(model, priority, time.perf_counter() - started)
+
+    def _release(self, model):
+        model_queue = self._queue(model)
+        model_queue.active -= 1
+        while model_queue.active < model_queue.limit:
+            future = self._next_waiter(model_queue)
+            if future is None:
+                break
+            model_queue.active += 1
+            future.set_result(None)
+
+    def _next_waiter(self, model_queue):
+        for priority in sorted(model_queue.waiting):
+            sessions = model_queue.waiting[priority]
+            while sessions:
+                session, waiters = next(iter(sessions.items()))
+                future = waiters.popleft()
+                # Rotate the session to the back so the next slot goes to another session
+                del sessions[session]
+                if waiters:
+                    sessions[session] = waiters
+                if not future.done():
+                    return future
+        return None
+
+    def _discard(self, sessions, session, future):
+        waiters = sessions.get(session)
+        if waiters and future in waiters:
+            waiters.remove(future)
+            if not waiters:
+                del sessions[session]
+
+    def _record_wait(self, model, priority, seconds):
+        name = Priority.NAMES.get(priority, str(priority))
+        Metrics.observe(f'scheduler.wait.{name}', seconds)
+        Metrics.incr(f'scheduler.requests.{name}')
+
+    def stats(self):
+        """
+        Returns the current state of every model queue.
+
+        Returns:
+            dict: Per model: 'active', 'limit' and queue depth per priority class,
+            plus the mean wait time per priority class under 'wait'
+        """
+        stats = {
+            model: {
+                'active': q.active,
+                'limit': q.limit,
+                'queued': {Priority.NAMES[p]: q.depth(p) for p in q.waiting}
+            }
+            for model, q in list(self._queues.items())
+        }
+        stats['wait'] = {name: Metrics.mean(f'scheduler.wait.{name}') for name in Priority.NAMES.values()}
+        return stats
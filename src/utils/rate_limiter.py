@@ -0,0 +1,74 @@
+import asyncio
+import threading
+import time
+from urllib.parse import urlparse
+from src.utils.metrics import Metrics
+
+class _TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def reserve(self, now):
+        """Takes one token (possibly going into debt) and returns how long the caller must wait."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+class RateLimiter:
+    """
+    Per-host token-bucket rate limiter.
+
+    Each host gets its own bucket refilled at `rate` requests per second and
+    holding at most `burst` tokens, so requests only wait when the same host
+    is hit too frequently. Safe to share between threads and asyncio tasks:
+    the token is reserved under a lock and the caller sleeps outside of it.
+    """
+
+    def __init__(self, rate=1.0, burst=2, host_limits=None):
+        """
+        Args:
+            rate (float): Default requests per second allowed per host
+            burst (int): Default number of back-to-back requests allowed per host
+            host_limits (dict, optional): Per-host overrides as {host: (rate, burst)}
+        """
+        self.rate = rate
+        self.burst = burst
+        self.host_limits = host_limits or {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _reserve(self, url_or_host):
+        host = self._host(url_or_host)
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, burst = self.host_limits.get(host, (self.rate, self.burst))
+                bucket = self._buckets[host] = _TokenBucket(rate, burst)
+            delay = bucket.reserve(time.monotonic())
+        if delay > 0:
+            Metrics.incr('ratelimit.delayed')
+            Metrics.observe('ratelimit.delay', delay)
+        return delay
+
+    def acquire(self, url_or_host):
+        """Blocks the calling thread until a request to this host is allowed."""
+        delay = self._reserve(url_or_host)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self, url_or_host):
+        """Awaitable variant of acquire() that does not block the event loop."""
+        delay = self._reserve(url_or_host)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def _host(self, url_or_host):
+        host = urlparse(url_or_host).netloc if '://' in url_or_host else url_or_host
+        host = host.lower().split('@')[-1].split(':')[0]
+        return host[4:] if host.startswith('www.') else host
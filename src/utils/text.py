@@ -0,0 +1,66 @@
+import math
+import re
+from collections import Counter
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having he her here hers herself him himself his how i if in into is it its itself just me more most
+my myself no nor not now of off on once only or other our ours ourselves out over own same she should
+so some such than that the their theirs them themselves then there these they this those through to
+too under until up very was we were what when where which while who whom why will with would you your
+yours yourself yourselves
+""".split())
+
+# Language asking for current information: forces a search and favours fresh results
+TIME_SENSITIVE = re.compile(
+    r"\b(news|latest|today|tonight|yesterday|tomorrow|this (week|month|year)|right now|current(ly)?|"
+    r"recent(ly)?|breaking|update[sd]?|happening|score[sd]?|weather|forecast|price[sd]?|stocks?|"
+    r"elections?|polls?|who won|release date|20[2-9]\d)\b",
+    re.IGNORECASE
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+def tokenize(text, drop_stopwords=True):
+    """Lowercases `text` and splits it into word tokens, optionally without stopwords."""
+    tokens = _TOKEN_RE.findall(text.lower())
+    if drop_stopwords:
+        return [token for token in tokens if token not in STOPWORDS]
+    return tokens
+
+def estimate_tokens(text):
+    """Cheap token estimate (~4 characters per token for English text) without loading a tokenizer."""
+    return len(text) // 4 + 1 if text else 0
+
+def bm25_scores(documents, weights, k1=1.5, b=0.75):
+    """
+    Scores tokenized documents against weighted query terms with BM25.
+
+    Args:
+        documents (list): Token lists; document frequencies are taken from this collection
+        weights (dict): Query term -> weight
+        k1 (float, optional): Term frequency saturation. Defaults to 1.5.
+        b (float, optional): Length normalization. Defaults to 0.75.
+
+    Returns:
+        list: One score per document
+    """
+    count = len(documents)
+    if not count:
+        return []
+    average_length = sum(len(d) for d in documents) / count or 1.0
+    df = Counter(term for document in documents for term in set(document))
+    scores = []
+    for document in documents:
+        frequencies = Counter(document)
+        score = 0.0
+        for term, weight in weights.items():
+            tf = frequencies.get(term)
+            if not tf:
+                continue
+            idf = math.log(1 + (count - df[term] + 0.5) / (df[term] + 0.5))
+            norm = tf + k1 * (1 - b + b * len(document) / average_length)
+            score += weight * idf * tf * (k1 + 1) / norm
+        scores.append(score)
+    return scores
@@ -0,0 +1,26 @@
+import importlib.util
+import os
+import threading
+from http.server import ThreadingHTTPServer
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+def _load_stub():
+    spec = importlib.util.spec_from_file_location('stub_ollama_server', os.path.join(ROOT, 'scripts', 'stub_ollama_server.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+@pytest.fixture
+def stub_ollama():
+    """Runs scripts/stub_ollama_server.py in-process; yields (url, StubState)."""
+    stub = _load_stub()
+    stub.StubState.token_delay = 0.01
+    server = ThreadingHTTPServer(('127.0.0.1', 0), stub.StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f'http://127.0.0.1:{server.server_port}', stub.StubState
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,21 @@
+from src.search.content_quality import ContentScorer
+
+QUERY = 'python release schedule'
+PROMPT = 'when is the next python release'
+NAVIGATION = ' '.join([
+    'Home News Sport Weather Python Tutorial Releases Downloads Documentation Community',
+    'Success Stories About Contact Login Register Python Release Schedule Menu Search Donate Jobs Events'
+] * 3)
+ARTICLE = (
+    'Python 3.13 was released in October 2024 after a year of development. The release schedule '
+    'is described in PEP 719, which lists the planned dates. Each feature release receives bug fix '
+    'updates for two years. After that it gets security fixes until five years after the release. '
+) * 3
+
+def test_single_line_navigation_is_not_accepted():
+    assessment = ContentScorer().assess(NAVIGATION, QUERY, PROMPT)
+    assert assessment['verdict'] != 'accept'
+
+def test_single_line_article_is_accepted():
+    assessment = ContentScorer().assess(ARTICLE, QUERY, PROMPT)
+    assert assessment['verdict'] == 'accept'
@@ -0,0 +1,40 @@
+from src.memory.conversation_summarizer import ConversationSummarizer
+from src.pipeline.context_window import ContextWindow
+from src.pipeline.prompt_builder import PromptBuilder
+
+SYSTEM = {'role': 'system', 'content': 'system prompt'}
+
+def _search_turns(count):
+    conversation = [SYSTEM]
+    for i in range(count):
+        content = f"SEARCH RESULT: {'page text ' * 200}\n\nUSER PROMPT: question {i}"
+        conversation.append(PromptBuilder.message('user', content, 'search'))
+        conversation.append(PromptBuilder.message('assistant', f'answer {i} ' * 40))
+    return conversation + [PromptBuilder.message('user', 'current question')]
+
+def test_dropping_a_turn_never_orphans_its_reply():
+    conversation = [SYSTEM]
+    for i in range(6):
+        conversation.append(PromptBuilder.message('user', f'question {i} ' * 60))
+        conversation.append(PromptBuilder.message('assistant', f'answer {i} ' * 60))
+    conversation.append(PromptBuilder.message('user', 'current question'))
+
+    trimmed = ContextWindow({'model': 600}).fit(conversation, 'model')
+
+    assert len(trimmed) < len(conversation)
+    assert trimmed[1]['role'] == 'user'
+    roles = [m['role'] for m in trimmed[1:-1]]
+    assert roles == ['user', 'assistant'] * (len(roles) // 2)
+
+def test_summary_applies_after_the_window_compressed_folded_turns():
+    conversation = _search_turns(6)
+    summarizer = ConversationSummarizer()
+    # As left by update(): the first four turns were folded into a summary
+    summarizer._pending = ({m['id'] for m in conversation[1:9]}, 'the user asked about four things')
+
+    compressed = ContextWindow({'model': 1000}).fit(conversation, 'model')
+    assert compressed[1] is not conversation[1]
+
+    applied = summarizer.apply(compressed)
+    assert applied[1]['kind'] == 'summary'
+    assert [m['content'] for m in applied[2:]] == [m['content'] for m in compressed[9:]]
@@ -0,0 +1,55 @@
+from src.memory.extraction_scheduler import MemoryExtractionScheduler
+
+class _Memory:
+    def update_memory(self, batch, session='default'):
+        pass
+
+def _scheduler(**kwargs):
+    submitted = []
+    scheduler = MemoryExtractionScheduler(
+        _Memory(), lambda name, fn, *args: submitted.append((name, *args)), **kwargs
+    )
+    return scheduler, submitted
+
+def test_questions_and_chit_chat_never_reach_the_llm():
+    scheduler, submitted = _scheduler(batch_size=1)
+    for message in ('What is the weather in Oslo?', 'thanks!', 'Explain how vaccines work'):
+        scheduler.observe(message)
+
+    assert submitted == []
+    assert scheduler.flush() is None
+
+def test_candidates_are_batched_until_batch_size():
+    scheduler, submitted = _scheduler(batch_size=3, session='alice')
+    scheduler.observe('I live in Lisbon these days')
+    scheduler.observe('I work as a nurse at night')
+    assert submitted == []
+
+    scheduler.observe('I enjoy long walks by the sea')
+    assert submitted == [('memory', [
+        'I live in Lisbon these days', 'I work as a nurse at night', 'I enjoy long walks by the sea'
+    ], 'alice')]
+
+def test_pending_candidate_waits_at_most_max_delay_turns():
+    scheduler, submitted = _scheduler(batch_size=3, max_delay_turns=2)
+    scheduler.observe('I prefer tea over coffee')
+    scheduler.observe('What time is it in Tokyo?')
+    assert submitted == []
+
+    scheduler.observe('How tall is Everest?')
+    assert submitted == [('memory', ['I prefer tea over coffee'], 'default')]
+
+def test_strong_cue_flushes_at_once():
+    scheduler, submitted = _scheduler(batch_size=3)
+    scheduler.observe('I like old films a lot')
+    scheduler.observe('From now on answer in French')
+
+    assert submitted == [('memory', ['I like old films a lot', 'From now on answer in French'], 'default')]
+
+def test_flush_submits_pending_messages_once():
+    scheduler, submitted = _scheduler(batch_size=5)
+    scheduler.observe('I have two cats at home')
+    scheduler.flush()
+    scheduler.flush()
+
+    assert submitted == [('memory', ['I have two cats at home'], 'default')]
@@ -0,0 +1,38 @@
+import glob
+import os
+import pytest
+from src.search.extractor import ContentExtractor, is_boilerplate
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'html_corpus')
+PARAGRAPH = '<p>' + 'This is a sentence of article text with enough words to be kept. ' * 3 + '</p>'
+
+@pytest.mark.parametrize('path', sorted(glob.glob(os.path.join(CORPUS, '*.html'))), ids=os.path.basename)
+def test_corpus_pages_extract_to_their_article_text(path):
+    with open(path, encoding='utf-8') as f:
+        html = f.read()
+    with open(os.path.splitext(path)[0] + '.txt', encoding='utf-8') as f:
+        gold = f.read()
+    for backend in ContentExtractor.available_backends():
+        assert ContentExtractor(backend=backend).extract(html).strip() == gold.strip()
+
+@pytest.mark.parametrize('attrs', [
+    'class="single has-sidebar"',
+    'class="no-sidebar"',
+    'class="comments-open"',
+    'class="menu-closed"',
+    'id="main-content" class="content ads-enabled"',
+    'class="sidebar"'
+])
+def test_state_classes_on_page_wrappers_keep_the_text(attrs):
+    html = f'<html><body {attrs}><div {attrs}>{PARAGRAPH}</div></body></html>'
+    assert ContentExtractor().extract(html).startswith('This is a sentence')
+
+def test_whole_class_tokens_only():
+    assert is_boilerplate('site-footer')
+    assert is_boilerplate('cookie-banner')
+    assert not is_boilerplate('has-sidebar')
+    assert not is_boilerplate('ads-enabled')
+
+def test_falls_back_to_unfiltered_text():
+    html = '<html><body><nav>Opening hours: 9 to 5</nav><script>var x = 1;</script></body></html>'
+    assert ContentExtractor().extract(html) == 'Opening hours: 9 to 5'
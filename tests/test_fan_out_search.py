@@ -0,0 +1,44 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.main import Assistant
+from src.search.ranking import ResultRanker
+
+PAGES = {
+    'https://fast.example/': ('fast', 0.0),
+    'https://slow.example/': ('slow', 1.0)
+}
+
+def _assistant(monkeypatch, validated):
+    assistant = Assistant.__new__(Assistant)
+    assistant.search_fan_out = 2
+    assistant.search_executor = ThreadPoolExecutor(max_workers=4)
+    assistant.ranker = ResultRanker()
+
+    def fetch(link):
+        text, delay = PAGES[link]
+        time.sleep(delay)
+        return text
+
+    def validate(page_text, query, convo, assessment=None, session='default'):
+        validated.append((page_text, time.perf_counter()))
+        return page_text == 'fast'
+
+    monkeypatch.setattr(assistant, '_fetch_page', fetch)
+    monkeypatch.setattr(assistant, '_assess_content', lambda *args: {'verdict': 'uncertain', 'score': 0.5})
+    monkeypatch.setattr(assistant, '_validate_content', validate)
+    return assistant
+
+def test_validation_starts_before_slow_fetches_finish(monkeypatch):
+    validated = []
+    assistant = _assistant(monkeypatch, validated)
+    results = [{'link': link, 'title': '', 'search_description': ''} for link in PAGES]
+
+    start = time.perf_counter()
+    page = assistant._fan_out_search(results, 'query', [{'role': 'user', 'content': 'question'}], 'default')
+
+    assert page == 'fast'
+    assert validated[0][0] == 'fast'
+    # The fast page was validated and returned without waiting for the 1s fetch
+    assert validated[0][1] - start < 0.5
+    assert time.perf_counter() - start < 0.5
+    assistant.search_executor.shutdown(wait=False)
@@ -0,0 +1,33 @@
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from src.utils.http_client import HttpClient
+
+class _RateLimitedHandler(BaseHTTPRequestHandler):
+    hits = 0
+
+    def do_GET(self):
+        type(self).hits += 1
+        self.send_response(429)
+        self.send_header('Retry-After', '3600')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+def test_retry_after_is_capped_at_timeout():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _RateLimitedHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = HttpClient(retries=2, timeout=0.5)
+        start = time.perf_counter()
+        response = client.get(f'http://127.0.0.1:{server.server_port}/')
+        elapsed = time.perf_counter() - start
+    finally:
+        server.shutdown()
+
+    assert response.status_code == 429
+    assert _RateLimitedHandler.hits == 3
+    # Two retries, each waiting at most the 0.5s timeout instead of an hour
+    assert elapsed < 3
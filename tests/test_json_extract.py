@@ -0,0 +1,19 @@
+from src.utils.json_extract import JsonObjectExtractor, extract_json_object
+
+def test_value_cut_inside_string_is_dropped():
+    extractor = JsonObjectExtractor()
+    extractor.feed('{"personal_info": {"name": "Ann", "city": "Par')
+    assert extractor.close() == {'personal_info': {'name': 'Ann'}}
+    assert extractor.repaired
+
+def test_key_cut_inside_string_is_dropped():
+    assert extract_json_object('{"interests": ["tea", "hiking"], "ci') == {'interests': ['tea', 'hiking']}
+
+def test_array_item_cut_inside_string_is_dropped():
+    assert extract_json_object('{"interests": ["tea", "hik') == {'interests': ['tea']}
+
+def test_complete_values_are_closed():
+    assert extract_json_object('Sure: {"name": "Ann", "age": 30') == {'name': 'Ann', 'age': 30}
+
+def test_braces_inside_strings_do_not_end_object():
+    assert extract_json_object('{"note": "use {x}, then }", "ok": true} trailing') == {'note': 'use {x}, then }', 'ok': True}
@@ -0,0 +1,49 @@
+from src.memory.memory_index import MemoryIndex
+from src.memory.memory_store import MemoryStore
+from src.memory.user_memory import UserMemory
+from src.pipeline.prompt_builder import PromptBuilder
+from src.utils.metrics import Metrics
+from src.utils.text import estimate_tokens
+
+MEMORY = {
+    'personal_info': {'name': 'Ann', 'city': 'Paris', 'job': 'nurse', 'pet': 'a cat called Miso'},
+    'interests': ['green tea', 'mountain hiking', 'jazz piano', 'astronomy'],
+    'preferences': {'answer_length': 'short answers', 'units': 'metric units'},
+    'last_updated': None
+}
+
+def _index(**kwargs):
+    index = MemoryIndex(**kwargs)
+    index.rebuild(MEMORY)
+    return index
+
+def test_search_returns_pinned_then_relevant_facts():
+    facts = _index().search('Any good hiking trails near Paris this weekend?')
+
+    assert facts[0] == ('personal_info', 'name', 'Ann')
+    assert set(facts[1:]) == {('personal_info', 'city', 'Paris'), ('interests', 'mountain hiking', 'mountain hiking')}
+
+def test_unrelated_prompt_gets_only_pinned_facts():
+    assert _index().search('What is the capital of Peru?') == [('personal_info', 'name', 'Ann')]
+
+def test_top_k_and_token_budget_are_respected():
+    prompt = 'tea hiking piano astronomy paris nurse cat units answers'
+    assert len(_index(top_k=3).search(prompt)) == 3
+
+    facts = _index(max_tokens=12).search(prompt)
+    assert sum(estimate_tokens(f'{key}={value}') for _, key, value in facts) <= 12
+
+def test_injected_memory_tokens_are_counted(tmp_path):
+    memory = UserMemory(MemoryStore(path=str(tmp_path / 'memory.db')))
+    memory.memory.update(MEMORY)
+    memory.index.rebuild(memory.memory)
+    before = Metrics.summary('memory.tokens_injected')
+
+    relevant = memory.get_relevant_memory('Which tea should I bring hiking?')
+    serialized = PromptBuilder().serialize_memory(relevant)
+    after = Metrics.summary('memory.tokens_injected')
+
+    assert relevant == {'personal_info': {'name': 'Ann'}, 'interests': ['green tea', 'mountain hiking'], 'preferences': {}}
+    assert 'Paris' not in serialized
+    assert after['count'] == before['count'] + 1
+    assert after['sum'] - before['sum'] == estimate_tokens(serialized)
@@ -0,0 +1,51 @@
+import json
+import os
+import sqlite3
+from src.memory.memory_store import MemoryStore
+
+LEGACY = {
+    'personal_info': {'name': 'Ann', 'city': 'Paris'},
+    'interests': ['tea', 'hiking'],
+    'preferences': {'answers': 'short'},
+    'last_updated': '2026-01-02T03:04:05'
+}
+
+def _write_legacy(tmp_path):
+    legacy = tmp_path / 'user_memory.json'
+    legacy.write_text(json.dumps(LEGACY))
+    return str(legacy)
+
+def test_legacy_json_is_imported_once(tmp_path):
+    legacy = _write_legacy(tmp_path)
+    store = MemoryStore(path=str(tmp_path / 'memory.db'), legacy_json=legacy)
+
+    assert store.load() == LEGACY
+    assert not os.path.exists(legacy)
+    assert os.path.exists(legacy + '.migrated')
+
+def test_failed_import_keeps_legacy_json_for_retry(tmp_path):
+    path = str(tmp_path / 'memory.db')
+    MemoryStore(path=path)
+    legacy = _write_legacy(tmp_path)
+
+    # Another writer holds the database, so the import cannot commit
+    blocker = sqlite3.connect(path)
+    blocker.execute('BEGIN EXCLUSIVE')
+    try:
+        store = MemoryStore(path=path, legacy_json=legacy)
+        assert store.load()['personal_info'] == {}
+    finally:
+        blocker.rollback()
+        blocker.close()
+
+    assert os.path.exists(legacy)
+    assert not os.path.exists(legacy + '.migrated')
+    # The next start imports it
+    assert MemoryStore(path=path, legacy_json=legacy).load() == LEGACY
+
+def test_apply_reports_failure(tmp_path):
+    store = MemoryStore(path=str(tmp_path / 'memory.db'))
+    assert store.apply([('personal_info', 'name', 'Ann')])
+    # A value sqlite cannot bind makes the whole batch fail
+    assert not store.apply([('personal_info', 'city', 'Paris'), ('interests', 'tea', {'not': 'bindable'})])
+    assert store.load()['personal_info'] == {'name': 'Ann'}
@@ -0,0 +1,18 @@
+from src.utils.metrics import Metrics
+
+def test_observations_keep_running_aggregates():
+    for value in (0.5, 2.0, 1.0, 0.25):
+        Metrics.observe('test.metrics.latency', value)
+
+    assert Metrics.summary('test.metrics.latency') == {
+        'count': 4, 'sum': 3.75, 'min': 0.25, 'max': 2.0, 'mean': 0.9375
+    }
+    assert Metrics.mean('test.metrics.latency') == 0.9375
+    assert Metrics.snapshot()['observations']['test.metrics.latency']['count'] == 4
+
+def test_observations_use_constant_memory():
+    for value in range(10000):
+        Metrics.observe('test.metrics.many', value)
+
+    assert Metrics._observations['test.metrics.many'] == [10000, sum(range(10000)), 0, 9999]
+    assert Metrics.summary('test.metrics.unseen')['count'] == 0
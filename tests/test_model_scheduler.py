@@ -0,0 +1,54 @@
+import asyncio
+import ollama
+from src.utils.model_scheduler import ModelScheduler, Priority
+
+MODEL = 'stub-model'
+
+async def _drive(url, requests):
+    """
+    Holds the model's only slot with one request, queues `requests` behind it
+    and returns the order in which they were admitted.
+    """
+    client = ollama.AsyncClient(host=url)
+    scheduler = ModelScheduler({MODEL: 1})
+    order = []
+
+    async def call(name, priority, session):
+        async with scheduler.slot(MODEL, priority, session):
+            order.append(name)
+            await client.chat(model=MODEL, messages=[{'role': 'user', 'content': name}])
+
+    blocker = asyncio.ensure_future(call('blocker', Priority.INTERACTIVE, 'blocker'))
+    await asyncio.sleep(0.05)
+    waiting = []
+    for request in requests:
+        waiting.append(asyncio.ensure_future(call(*request)))
+        # Let each request reach the queue before the next one, so arrival order is fixed
+        await asyncio.sleep(0.01)
+    stats = scheduler.stats()[MODEL]
+    await asyncio.gather(blocker, *waiting)
+    return order[1:], stats
+
+def test_priority_classes_are_served_in_order(stub_ollama):
+    url, state = stub_ollama
+    order, stats = asyncio.run(_drive(url, [
+        ('memory', Priority.BACKGROUND, 'a'),
+        ('gate', Priority.GATE, 'a'),
+        ('answer', Priority.INTERACTIVE, 'a')
+    ]))
+    assert stats['queued'] == {'interactive': 1, 'gate': 1, 'background': 1}
+    assert order == ['answer', 'gate', 'memory']
+    assert state.max_active == 1
+
+def test_sessions_take_turns_within_a_priority_class(stub_ollama):
+    url, state = stub_ollama
+    order, _ = asyncio.run(_drive(url, [
+        ('a1', Priority.GATE, 'a'),
+        ('a2', Priority.GATE, 'a'),
+        ('a3', Priority.GATE, 'a'),
+        ('b1', Priority.GATE, 'b'),
+        ('c1', Priority.GATE, 'c')
+    ]))
+    # A busy session does not hold back sessions that queued after it
+    assert order == ['a1', 'b1', 'c1', 'a2', 'a3']
+    assert state.max_active == 1
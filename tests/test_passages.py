@@ -0,0 +1,39 @@
+from src.search.passages import PassageSelector
+from src.utils.text import estimate_tokens
+
+FILLER = 'The village council met on Tuesday to discuss road repairs and the summer fair schedule.'
+RELEVANT = 'The Hubble telescope captured new images of the Andromeda galaxy using its infrared camera.'
+
+def _page(relevant_at):
+    blocks = [FILLER.replace('Tuesday', f'day {i}') for i in range(30)]
+    for i in relevant_at:
+        blocks[i] = RELEVANT
+    return '\n'.join(blocks)
+
+def test_short_text_is_returned_unchanged():
+    assert PassageSelector().select(FILLER, 'andromeda', max_tokens=100) == FILLER
+
+def test_relevant_passages_fit_the_budget_in_page_order():
+    selector = PassageSelector(chunk_words=15)
+    text = _page(relevant_at=[20, 5])
+    selected = selector.select(text, 'hubble andromeda galaxy', max_tokens=60)
+
+    assert estimate_tokens(selected) <= 60
+    assert selected.count(RELEVANT) == 2
+    # Distant passages are kept apart by a gap marker
+    assert selected.index(RELEVANT) < selected.index(PassageSelector.SEPARATOR)
+
+def test_page_without_query_terms_falls_back_to_opening():
+    selector = PassageSelector(chunk_words=15)
+    text = _page(relevant_at=[])
+    selected = selector.select(text, 'quantum chromodynamics', max_tokens=60)
+
+    assert selected.startswith(FILLER.replace('Tuesday', 'day 0'))
+    assert PassageSelector.SEPARATOR not in selected
+
+def test_chunk_splits_long_blocks_on_sentences():
+    block = ' '.join(f'Sentence number {i} has exactly six words.' for i in range(10))
+    passages = PassageSelector(chunk_words=20).chunk(block)
+
+    assert all(len(p.split()) <= 20 for p in passages)
+    assert ' '.join(passages) == block
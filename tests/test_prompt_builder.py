@@ -0,0 +1,50 @@
+from src.pipeline.prompt_builder import PromptBuilder, FAILED_SEARCH_NOTE
+from src.utils.metrics import Metrics
+
+SYSTEM = {'role': 'system', 'content': 'You are a helpful assistant.'}
+
+def test_volatile_context_sits_in_the_newest_message_in_fixed_order():
+    builder = PromptBuilder()
+    message = builder.user_message('What now?', 'personal_info: name=Ann', search_context='Page text')
+
+    assert message['content'] == (
+        'USER MEMORY CONTEXT:\npersonal_info: name=Ann\n\nSEARCH RESULT: Page text\n\nUSER PROMPT: What now?'
+    )
+    assert message['kind'] == 'search'
+    failed = builder.user_message('What now?', search_failed=True)
+    assert failed['content'] == f'{FAILED_SEARCH_NOTE}\n\nUSER PROMPT: What now?'
+    assert builder.user_message('hi')['content'] == 'hi'
+
+def test_memory_serialization_is_deterministic():
+    builder = PromptBuilder()
+    first = builder.serialize_memory({'interests': ['tea', 'jazz'], 'personal_info': {'name': 'Ann', 'city': 'Paris'}})
+    second = builder.serialize_memory({'personal_info': {'city': 'Paris', 'name': 'Ann'}, 'interests': ['jazz', 'tea']})
+
+    assert first == second == 'interests: jazz; tea\npersonal_info: city=Paris; name=Ann'
+    assert builder.serialize_memory({'interests': [], 'preferences': {}}) is None
+
+def test_consecutive_turns_extend_a_stable_prefix():
+    builder = PromptBuilder()
+    conversation = [SYSTEM, builder.user_message('First question', 'personal_info: name=Ann')]
+    first = builder.render(conversation)
+    conversation += [PromptBuilder.message('assistant', 'First answer'), builder.user_message('Second question')]
+    second = builder.render(conversation)
+
+    assert second[:len(first)] == first
+    # Bookkeeping keys never reach the model
+    assert all(set(m) == {'role', 'content'} for m in second)
+
+def test_prefix_reuse_is_measured():
+    builder = PromptBuilder()
+    conversation = [SYSTEM, builder.user_message('First question')]
+    builder.render(conversation)
+    first = builder._last_prompt
+    conversation += [PromptBuilder.message('assistant', 'Short answer'), builder.user_message('Second question')]
+    before = Metrics.summary('prompt.prefix_reuse')
+    builder.render(conversation)
+    after = Metrics.summary('prompt.prefix_reuse')
+
+    assert builder._last_prompt.startswith(first)
+    assert after['count'] == before['count'] + 1
+    assert abs((after['sum'] - before['sum']) - len(first) / len(builder._last_prompt)) < 1e-9
+    assert builder._common_prefix('abcdef', 'abcxyz') == 3
@@ -0,0 +1,57 @@
+from src.search.ranking import ResultRanker
+
+def _result(link, title, description=''):
+    return {'link': link, 'title': title, 'search_description': description}
+
+def test_bm25_orders_results_by_query_terms():
+    results = [
+        _result('https://a.example/', 'Garden furniture sale', 'Chairs and tables for summer'),
+        _result('https://b.example/', 'Green tea brewing guide', 'How to brew green tea: temperature and steeping time'),
+        _result('https://c.example/', 'Tea shop opening hours', 'Visit our shop'),
+    ]
+    ranked = ResultRanker().rank(results, 'green tea brewing temperature')
+
+    assert [r['link'] for _, r in ranked] == ['https://b.example/', 'https://c.example/', 'https://a.example/']
+    # Normalized to the best match
+    assert ranked[0][0] == 1.0
+
+def test_domain_prior_breaks_equal_relevance():
+    results = [
+        _result('https://www.pinterest.com/pin/1', 'Battle of Hastings'),
+        _result('https://example.com/hastings', 'Battle of Hastings'),
+        _result('https://en.wikipedia.org/wiki/Battle_of_Hastings', 'Battle of Hastings'),
+    ]
+    ranked = ResultRanker().rank(results, 'battle of hastings')
+
+    assert [ResultRanker.host(r['link']) for _, r in ranked] == ['en.wikipedia.org', 'example.com', 'pinterest.com']
+
+def test_ties_keep_search_engine_order():
+    results = [_result(f'https://site{i}.example/', 'Same title') for i in range(3)]
+    ranked = ResultRanker().rank(results, 'same title')
+    assert [r['link'] for _, r in ranked] == [r['link'] for r in results]
+
+def test_freshness_only_counts_for_time_sensitive_queries():
+    results = [
+        _result('https://old.example/', 'Election results 2019', 'Final count'),
+        _result('https://new.example/', 'Election results', 'Updated 2 hours ago'),
+    ]
+    ranker = ResultRanker()
+
+    assert ranker.rank(results, 'latest election results')[0][1]['link'] == 'https://new.example/'
+    # Without time-sensitive wording only relevance counts
+    assert ranker.rank(results, 'election results count')[0][1]['link'] == 'https://old.example/'
+
+def test_clear_winner_needs_margin():
+    ranker = ResultRanker(margin=0.35)
+    first, second = _result('https://a.example/', 'a'), _result('https://b.example/', 'b')
+
+    assert ranker.clear_winner([(1.0, first), (0.5, second)]) is first
+    assert ranker.clear_winner([(1.0, first), (0.9, second)]) is None
+    assert ranker.clear_winner([(0.2, first)]) is first
+    assert ranker.shortlist([(1.0, first), (0.9, second)]) == [first, second]
+
+def test_host_looks_through_duckduckgo_redirects():
+    link = '//duckduckgo.com/l/?uddg=https%3A%2F%2Fwww.reuters.com%2Fworld%2F&rut=abc'
+    assert ResultRanker.host(link) == 'reuters.com'
+    assert ResultRanker().domain_prior(link) == 0.5
+    assert ResultRanker().domain_prior('https://data.census.gov/table') == 0.5
@@ -0,0 +1,41 @@
+import asyncio
+import time
+from src.utils.rate_limiter import RateLimiter, _TokenBucket
+
+def test_bucket_allows_burst_then_refills_at_rate():
+    bucket = _TokenBucket(rate=2.0, burst=2)
+    now = bucket.updated
+
+    assert bucket.reserve(now) == 0.0
+    assert bucket.reserve(now) == 0.0
+    # Third request in the same instant waits for half a token interval
+    assert bucket.reserve(now) == 0.5
+    # One second later two tokens were refilled, one of them paying the debt
+    assert bucket.reserve(now + 1.0) == 0.0
+    assert bucket.reserve(now + 1.0) == 0.5
+
+def test_refill_is_capped_at_burst():
+    bucket = _TokenBucket(rate=1.0, burst=2)
+    now = bucket.updated
+    bucket.reserve(now + 60)
+    bucket.reserve(now + 60)
+    assert bucket.reserve(now + 60) == 1.0
+
+def test_hosts_have_independent_buckets():
+    limiter = RateLimiter(rate=1.0, burst=1, host_limits={'api.example': (10.0, 5)})
+
+    assert limiter._reserve('https://www.news.example/a') == 0.0
+    # Same host, different URL, scheme case and port
+    assert limiter._reserve('HTTP://news.example:443/b') > 0.9
+    assert limiter._reserve('https://other.example/') == 0.0
+    assert all(limiter._reserve('https://api.example/x') == 0.0 for _ in range(5))
+
+def test_acquire_waits_for_the_next_token():
+    limiter = RateLimiter(rate=10.0, burst=1)
+    start = time.perf_counter()
+    limiter.acquire('https://a.example/')
+    limiter.acquire('https://a.example/')
+    asyncio.run(limiter.acquire_async('https://a.example/'))
+    elapsed = time.perf_counter() - start
+
+    assert 0.18 <= elapsed < 0.5
@@ -0,0 +1,148 @@
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from src.search.extractor import ContentExtractor
+from src.search.page_cache import PageCache
+from src.search.scraper import WebScraper
+from src.utils.http_client import HttpClient
+from src.utils.metrics import Metrics
+from src.utils.rate_limiter import RateLimiter
+
+PARAGRAPH = (
+    '<p>The committee spent most of the afternoon reviewing the budget for the coming year, '
+    'and several members asked for the figures to be published before the next meeting.</p>'
+)
+ARTICLE = (
+    '<html><head><title>Budget</title></head><body class="single has-sidebar">'
+    '<nav><a href="/">Home</a> <a href="/news">News</a></nav>'
+    f'<article>{PARAGRAPH * 3}</article>'
+    '<footer>Copyright 2026</footer></body></html>'
+).encode('utf-8')
+ETAG = '"v1"'
+
+class _PageHandler(BaseHTTPRequestHandler):
+    # Close-delimited bodies when no Content-Length is sent
+    protocol_version = 'HTTP/1.0'
+    requests = []
+
+    def do_GET(self):
+        type(self).requests.append((self.path, self.headers.get('If-None-Match')))
+        if self.path == '/article':
+            if self.headers.get('If-None-Match') == ETAG:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self._send(ARTICLE, 'text/html; charset=utf-8', {'ETag': ETAG})
+        elif self.path == '/report.pdf':
+            self._send(b'%PDF-1.4' + b'\0' * 4096, 'application/pdf')
+        elif self.path == '/declared-huge':
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(10 * 1024 * 1024))
+            self.end_headers()
+        elif self.path == '/endless-menu':
+            # No article and no Content-Length: only the byte cap stops the read
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html')
+            self.end_headers()
+            self._stream(b'<html><body>', b'<li><a href="/x">Link</a></li>' * 100, 1024 * 1024)
+        elif self.path == '/long-article':
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html')
+            self.end_headers()
+            self._stream(b'<html><body><article>', PARAGRAPH.encode('utf-8') * 20, 1024 * 1024)
+        else:
+            self.send_error(404)
+
+    def _send(self, body, content_type, headers=None):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, head, block, total):
+        try:
+            self.wfile.write(head)
+            for _ in range(total // len(block)):
+                self.wfile.write(block)
+        except ConnectionError:
+            # The scraper hung up once it had read enough
+            pass
+
+    def log_message(self, *args):
+        pass
+
+def _serve():
+    _PageHandler.requests = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+def _scraper(tmp_path, **kwargs):
+    # ttl=0 makes every cached page stale, so each scrape goes back to the server
+    return WebScraper(
+        http_client=HttpClient(retries=0, timeout=5),
+        rate_limiter=RateLimiter(rate=100, burst=100),
+        page_cache=PageCache(path=str(tmp_path / 'pages.db'), ttl=0),
+        **kwargs
+    )
+
+def test_stale_page_is_revalidated_with_etag(tmp_path):
+    server, base = _serve()
+    try:
+        scraper = _scraper(tmp_path)
+        first = scraper.scrape(f'{base}/article')
+        second = scraper.scrape(f'{base}/article')
+    finally:
+        server.shutdown()
+
+    assert 'budget for the coming year' in first
+    assert 'Copyright' not in first
+    assert second == first
+    assert _PageHandler.requests == [('/article', None), ('/article', ETAG)]
+
+def test_non_html_and_oversized_pages_are_skipped(tmp_path):
+    server, base = _serve()
+    skipped_type = Metrics.get('scraper.skipped_type')
+    skipped_size = Metrics.get('scraper.skipped_size')
+    try:
+        scraper = _scraper(tmp_path, max_bytes=64 * 1024)
+        pdf = scraper.scrape(f'{base}/report.pdf')
+        huge = scraper.scrape(f'{base}/declared-huge')
+    finally:
+        server.shutdown()
+
+    assert pdf is None and huge is None
+    assert Metrics.get('scraper.skipped_type') == skipped_type + 1
+    assert Metrics.get('scraper.skipped_size') == skipped_size + 1
+
+def test_body_without_length_stops_at_byte_cap(tmp_path):
+    server, base = _serve()
+    byte_cap = Metrics.get('scraper.byte_cap')
+    bytes_read = Metrics.get('scraper.bytes_read')
+    try:
+        scraper = _scraper(tmp_path, max_bytes=64 * 1024)
+        scraper.scrape(f'{base}/endless-menu')
+    finally:
+        server.shutdown()
+
+    assert Metrics.get('scraper.byte_cap') == byte_cap + 1
+    read = Metrics.get('scraper.bytes_read') - bytes_read
+    assert 64 * 1024 <= read < 64 * 1024 + WebScraper.CHUNK_SIZE
+
+def test_read_stops_once_extractor_has_enough(tmp_path):
+    server, base = _serve()
+    early_stop = Metrics.get('scraper.early_stop')
+    bytes_read = Metrics.get('scraper.bytes_read')
+    try:
+        scraper = _scraper(tmp_path, extractor=ContentExtractor(max_chars=2000))
+        text = scraper.scrape(f'{base}/long-article')
+    finally:
+        server.shutdown()
+
+    assert 'budget for the coming year' in text
+    assert Metrics.get('scraper.early_stop') == early_stop + 1
+    # A fraction of the 1MB body
+    assert Metrics.get('scraper.bytes_read') - bytes_read < 128 * 1024
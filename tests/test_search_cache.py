@@ -0,0 +1,62 @@
+import threading
+import time
+from src.search.search_cache import SearchCache
+
+RESULTS = [{'link': 'https://example.com/', 'title': 'Example'}]
+
+def test_word_order_and_stopwords_share_one_entry():
+    cache = SearchCache()
+    calls = []
+
+    def fetch(query):
+        calls.append(query)
+        return RESULTS
+
+    first = cache.get_or_fetch('latest ukraine news', fetch)
+    second = cache.get_or_fetch('the Ukraine latest news', fetch)
+
+    assert SearchCache.canonical_query('latest ukraine news') == SearchCache.canonical_query('Ukraine, the latest news')
+    assert calls == ['latest ukraine news']
+    assert first == second == RESULTS
+    # Callers get copies they may mutate
+    second[0]['title'] = 'changed'
+    assert cache.get_or_fetch('latest ukraine news', fetch)[0]['title'] == 'Example'
+
+def test_concurrent_identical_lookups_fetch_once():
+    cache = SearchCache()
+    calls = []
+    started = threading.Event()
+
+    def fetch(query):
+        calls.append(query)
+        started.set()
+        time.sleep(0.3)
+        return RESULTS
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_fetch('tea prices', fetch))) for _ in range(5)]
+    threads[0].start()
+    started.wait(2)
+    for thread in threads[1:]:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [RESULTS] * 5
+
+def test_empty_results_are_not_cached():
+    cache = SearchCache()
+    calls = []
+    cache.get_or_fetch('tea', lambda query: calls.append(query) or [])
+    cache.get_or_fetch('tea', lambda query: calls.append(query) or RESULTS)
+    assert len(calls) == 2
+
+def test_expired_and_excess_entries_are_evicted_without_persistence():
+    cache = SearchCache(ttl=0.2, max_entries=3)
+    cache.get_or_fetch('old query', lambda query: RESULTS)
+    time.sleep(0.3)
+    for query in ('alpha', 'beta', 'gamma', 'delta'):
+        cache.get_or_fetch(query, lambda query: RESULTS)
+
+    assert list(cache._entries) == ['beta', 'gamma', 'delta']
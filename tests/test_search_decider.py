@@ -0,0 +1,57 @@
+import json
+import time
+from src.search import search_decider
+from src.search.search_decider import SearchDecider
+from src.utils.metrics import Metrics
+
+def _write_log(path, count):
+    with open(path, 'w') as f:
+        for i in range(count):
+            f.write(json.dumps({'prompt': f'prompt number {i}', 'search': i % 2 == 0}) + '\n')
+
+def _wait_for_training(decider, timeout=10):
+    deadline = time.time() + timeout
+    while decider._training and time.time() < deadline:
+        time.sleep(0.01)
+
+def test_labels_are_capped_and_the_log_compacted(tmp_path):
+    log = tmp_path / 'decisions.jsonl'
+    _write_log(log, 50)
+    decider = SearchDecider(log_path=str(log), max_examples=20, retrain_every=5)
+    assert len(decider._examples) == 20
+
+    for i in range(25):
+        decider._record(f'new prompt {i}', True)
+        _wait_for_training(decider)
+
+    assert len(decider._examples) == 20
+    with open(log) as f:
+        assert len(f.readlines()) < 40
+
+def test_retraining_runs_off_the_gate_path(tmp_path, monkeypatch):
+    log = tmp_path / 'decisions.jsonl'
+    _write_log(log, 40)
+    decider = SearchDecider(log_path=str(log), retrain_every=1)
+    monkeypatch.setattr(decider, '_train', lambda: time.sleep(0.5))
+
+    start = time.perf_counter()
+    decider._record('is it going to rain', True)
+    assert time.perf_counter() - start < 0.1
+    _wait_for_training(decider)
+
+def test_an_audit_is_counted_once(tmp_path, monkeypatch):
+    log = tmp_path / 'decisions.jsonl'
+    _write_log(log, 40)
+    decider = SearchDecider(log_path=str(log))
+    assert decider.model is not None
+    reply = {'message': {'content': 'True'}}
+    monkeypatch.setattr(search_decider.ModelManager, 'chat', lambda *args, **kwargs: reply)
+    before = {name: Metrics.get(name) for name in (
+        'search_decider.agree', 'search_decider.disagree',
+        'search_decider.audit.agree', 'search_decider.audit.disagree'
+    )}
+
+    decider._audit('latest election results', True)
+
+    counted = sum(Metrics.get(name) - value for name, value in before.items())
+    assert counted == 1
@@ -0,0 +1,137 @@
+import asyncio
+import http.client
+import json
+import threading
+import time
+import ollama
+import pytest
+from src.agents.opinion_agent import OpinionChecker
+from src.main import Assistant
+from src.pipeline.context_window import ContextWindow
+from src.pipeline.session_manager import SessionManager
+from src.pipeline.turn_pipeline import TurnPipeline
+from src.search.search_decider import SearchDecider
+from src.server import AssistantServer
+from src.utils.metrics import Metrics
+from src.utils.model_manager import ModelManager
+
+@pytest.fixture
+def served(stub_ollama, monkeypatch, tmp_path):
+    """Runs AssistantServer on a free port against the stub; yields (server, state)."""
+    url, state = stub_ollama
+    ModelManager._get_loop()
+    monkeypatch.setattr(ModelManager, '_client', ollama.AsyncClient(host=url))
+
+    assistant = Assistant.__new__(Assistant)
+    assistant.pipeline = TurnPipeline()
+    assistant.context_window = ContextWindow()
+    assistant.sessions = SessionManager(assistant.pipeline.submit_background, path=str(tmp_path))
+    assistant.search_decider = SearchDecider(log_path=str(tmp_path / 'decisions.jsonl'))
+    assistant.opinion_checker = OpinionChecker()
+    monkeypatch.setattr(assistant, '_should_search', lambda message, session: False)
+    monkeypatch.setattr(assistant.opinion_checker, 'check', lambda convo, session: False)
+
+    server = AssistantServer(assistant, port=0, max_concurrent=1)
+    threading.Thread(target=asyncio.run, args=(server.serve(),), daemon=True).start()
+    deadline = time.perf_counter() + 5
+    while server.port == 0 and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    yield server, state
+    assistant.pipeline.shutdown()
+
+def _post(server, body):
+    connection = http.client.HTTPConnection('127.0.0.1', server.port, timeout=10)
+    connection.request('POST', '/chat', body=json.dumps(body), headers={'Content-Type': 'application/json'})
+    return connection, connection.getresponse()
+
+def _events(response):
+    """Parses the SSE stream into (event, data) tuples, checking the framing."""
+    events = []
+    for block in response.read().decode('utf-8').split('\n\n'):
+        if not block:
+            continue
+        event_line, data_line = block.split('\n')
+        assert event_line.startswith('event: ') and data_line.startswith('data: ')
+        events.append((event_line[7:], json.loads(data_line[6:])))
+    return events
+
+def _health(server):
+    connection = http.client.HTTPConnection('127.0.0.1', server.port, timeout=5)
+    connection.request('GET', '/health')
+    health = json.loads(connection.getresponse().read())
+    connection.close()
+    return health
+
+def test_chat_streams_tokens_then_done(served):
+    server, _ = served
+    connection, response = _post(server, {'prompt': 'Tell me about tea -fast', 'session_id': 'alice'})
+    events = _events(response)
+    connection.close()
+
+    assert response.status == 200
+    assert response.getheader('Content-Type') == 'text/event-stream'
+    tokens = [data for event, data in events if event == 'token']
+    assert tokens and all(token['channel'] == 'answer' for token in tokens)
+    # System prompt, the question and the answer
+    assert events[-1] == ('done', {'session_id': 'alice', 'messages': 3})
+    assert server.assistant.sessions.get('alice').conversation[-1]['content'] == ''.join(t['text'] for t in tokens)
+
+def test_failed_turn_sends_error_event(served, monkeypatch):
+    server, _ = served
+
+    def fail(conversation, model):
+        raise RuntimeError('context window exploded')
+
+    monkeypatch.setattr(server.assistant.context_window, 'fit', fail)
+    connection, response = _post(server, {'prompt': 'hello -fast', 'session_id': 'alice'})
+    events = _events(response)
+    connection.close()
+
+    assert events == [('error', {'error': 'context window exploded'})]
+
+def test_bad_requests_get_400(served):
+    server, _ = served
+    connection, response = _post(server, {'prompt': 'hello', 'session_id': '../etc'})
+    response.read()
+    connection.close()
+    assert response.status == 400
+
+def test_busy_server_refuses_with_503(served):
+    server, state = served
+    state.token_delay = 5
+    first, first_response = _post(server, {'prompt': 'hello -fast', 'session_id': 'alice'})
+    rejected = Metrics.get('server.rejected')
+
+    second, response = _post(server, {'prompt': 'hello -fast', 'session_id': 'bob'})
+    body = json.loads(response.read())
+    second.close()
+    first_response.close()
+    first.close()
+
+    assert first_response.status == 200
+    assert response.status == 503
+    assert response.getheader('Retry-After') == '1'
+    assert body == {'error': 'server busy'}
+    assert Metrics.get('server.rejected') == rejected + 1
+
+def test_disconnect_cancels_a_stalled_turn_and_frees_the_slot(served):
+    server, state = served
+    state.token_delay = 5
+    cancelled = Metrics.get('server.cancelled')
+    connection, response = _post(server, {'prompt': 'hello -fast', 'session_id': 'alice'})
+    assert response.status == 200
+    assert _health(server)['active'] == 1
+
+    start = time.perf_counter()
+    # The response keeps the socket open until it is closed too
+    response.close()
+    connection.close()
+    while _health(server)['active'] and time.perf_counter() - start < 3:
+        time.sleep(0.05)
+
+    # Released long before the stalled model's first token
+    assert _health(server)['active'] == 0
+    assert time.perf_counter() - start < 2
+    assert Metrics.get('server.cancelled') == cancelled + 1
+    # The unanswered question was rolled back
+    assert len(server.assistant.sessions.get('alice').conversation) == 1
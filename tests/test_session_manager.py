@@ -0,0 +1,33 @@
+import threading
+from src.pipeline.session_manager import SessionManager
+from src.utils.metrics import Metrics
+
+class _SlowSaveManager(SessionManager):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.saving = threading.Event()
+        self.release = threading.Event()
+
+    def _save(self, session):
+        if session.session_id == 'alice':
+            self.saving.set()
+            self.release.wait(5)
+        super()._save(session)
+
+def test_session_being_saved_is_taken_back_not_reloaded(tmp_path):
+    manager = _SlowSaveManager(lambda *args: None, max_sessions=1, path=str(tmp_path))
+    alice = manager.get('alice')
+    alice.conversation.append({'role': 'user', 'content': 'not on disk yet', 'id': 'm1'})
+
+    # Loading bob evicts alice; her save blocks until released
+    loader = threading.Thread(target=manager.get, args=('bob',))
+    loader.start()
+    assert manager.saving.wait(5)
+    loaded = Metrics.get('sessions.loaded')
+    again = manager.get('alice')
+    manager.release.set()
+    loader.join(5)
+
+    assert again is alice
+    assert again.conversation[-1]['content'] == 'not on disk yet'
+    assert Metrics.get('sessions.loaded') == loaded
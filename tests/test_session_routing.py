@@ -0,0 +1,33 @@
+from src.agents.opinion_agent import OpinionChecker
+from src.memory.conversation_summarizer import ConversationSummarizer
+from src.memory.extraction_scheduler import MemoryExtractionScheduler
+from src.memory.memory_store import MemoryStore
+from src.memory.user_memory import UserMemory
+from src.search.query import QueryGenerator
+from src.utils.model_manager import ModelManager
+
+class _Recorder:
+    """Stands in for ModelManager.chat and records the session of every call."""
+
+    def __init__(self):
+        self.sessions = []
+
+    def __call__(self, messages, stream=False, session='default', **kwargs):
+        self.sessions.append(session)
+        if stream:
+            return iter([{'message': {'content': '{"interests": ["tea"]}'}}])
+        return {'message': {'content': 'false'}, 'prompt_eval_count': 1, 'eval_count': 1}
+
+def test_gate_and_background_calls_carry_the_session(monkeypatch, tmp_path):
+    recorder = _Recorder()
+    monkeypatch.setattr(ModelManager, 'chat', recorder)
+    convo = [{'role': 'user', 'content': 'word ' * 400, 'id': str(i)} for i in range(8)]
+
+    QueryGenerator().generate(convo, 'alice')
+    OpinionChecker().check(convo, 'alice')
+    ConversationSummarizer(trigger_tokens=10).update(convo, 'alice')
+    memory = UserMemory(MemoryStore(path=str(tmp_path / 'memory.db')))
+    extraction = MemoryExtractionScheduler(memory, lambda name, fn, *args: fn(*args), batch_size=1, session='alice')
+    extraction.observe('I love green tea in the morning')
+
+    assert recorder.sessions == ['alice'] * 4
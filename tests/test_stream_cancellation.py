@@ -0,0 +1,123 @@
+import asyncio
+import sys
+import threading
+import time
+import ollama
+import pytest
+from src.agents.debate_scheduler import DebateStage, DebateScheduler
+from src.main import Assistant
+from src.pipeline.context_window import ContextWindow
+from src.pipeline.session_manager import SessionManager
+from src.pipeline.turn_pipeline import TurnPipeline
+from src.utils.model_manager import ModelManager, ChatStream
+from src.utils.model_scheduler import Priority
+
+@pytest.fixture
+def stalled_model(stub_ollama, monkeypatch):
+    """Points ModelManager at the stub, which takes 5s per token."""
+    url, state = stub_ollama
+    state.token_delay = 5
+    ModelManager._get_loop()
+    monkeypatch.setattr(ModelManager, '_client', ollama.AsyncClient(host=url))
+    return state
+
+def _counting(limit=1000):
+    async def chunks():
+        for i in range(limit):
+            yield str(i)
+            await asyncio.sleep(0)
+    return chunks
+
+def _blocked_puts():
+    # Executor threads still waiting for room in a ChatStream buffer
+    return [
+        frame for frame in sys._current_frames().values()
+        if frame.f_code.co_name == 'put' and frame.f_back and frame.f_back.f_code.co_name == '_put'
+    ]
+
+def _wait_until(condition, timeout=3):
+    deadline = time.perf_counter() + timeout
+    while not condition() and time.perf_counter() < deadline:
+        time.sleep(0.05)
+    return condition()
+
+def test_cancel_with_full_buffer_releases_the_pump():
+    streams = [ChatStream(_counting(), max_buffered=2) for _ in range(3)]
+    for stream in streams:
+        assert _wait_until(stream._queue.full)
+        # From another thread, with nobody reading the stream
+        canceller = threading.Thread(target=stream.cancel)
+        canceller.start()
+        canceller.join()
+
+    assert _wait_until(lambda: all(stream._future.done() for stream in streams))
+    assert _wait_until(lambda: not _blocked_puts())
+
+def test_no_chunks_are_yielded_after_cancel():
+    stream = ChatStream(_counting(), max_buffered=4)
+    chunks = iter(stream)
+    first = [next(chunks), next(chunks)]
+    assert _wait_until(stream._queue.full)
+    stream.cancel()
+
+    assert first == ['0', '1']
+    assert list(chunks) == []
+    assert stream.cancelled
+
+def test_finished_stream_is_not_marked_cancelled():
+    stream = ChatStream(_counting(limit=5))
+    assert list(stream) == ['0', '1', '2', '3', '4']
+    assert not stream.cancelled
+
+def _cancel_later(session, delay=0.3):
+    timer = threading.Timer(delay, ModelManager.cancel_streams, args=(session,))
+    timer.start()
+    return timer
+
+def test_cancel_streams_stops_a_stalled_stream_but_not_background_work(stalled_model):
+    messages = [{'role': 'user', 'content': 'hello'}]
+    answer = ModelManager.chat(messages, stream=True, session='alice')
+    background = ModelManager.chat(messages, stream=True, priority=Priority.BACKGROUND, session='alice')
+    _cancel_later('alice')
+    start = time.perf_counter()
+    chunks = list(answer)
+    elapsed = time.perf_counter() - start
+
+    assert chunks == []
+    assert answer.cancelled
+    assert elapsed < 2
+    assert not background.cancelled
+    background.cancel()
+
+def test_cancelled_turn_rolls_back_the_user_message(stalled_model, monkeypatch, tmp_path):
+    assistant = Assistant.__new__(Assistant)
+    assistant.pipeline = TurnPipeline()
+    assistant.context_window = ContextWindow()
+    assistant.sessions = SessionManager(assistant.pipeline.submit_background, path=str(tmp_path))
+    monkeypatch.setattr(assistant, '_should_search', lambda message, session: False)
+    before = list(assistant.sessions.get('alice').conversation)
+
+    _cancel_later('alice', delay=1)
+    conversation = assistant.process_input('Tell me about tea -fast', 'alice')
+
+    assert conversation == before
+    assistant.pipeline.shutdown()
+
+def test_cancelled_debate_leaves_background_requests_running(stalled_model):
+    memory = ModelManager.chat(
+        [{'role': 'user', 'content': 'I love tea'}], model='memory-model', stream=True,
+        priority=Priority.BACKGROUND, session='alice'
+    )
+    stage = DebateStage('first', 'Debating', 'debate-model', 'Argue.', lambda results: [], color='')
+    scheduler = DebateScheduler()
+    scheduler.warm(stage, 'alice')
+    assert _wait_until(lambda: 'alice:preload' in ModelManager._tasks)
+
+    _cancel_later('alice')
+    completed = scheduler.run([stage], session='alice')
+
+    assert completed == []
+    assert _wait_until(lambda: 'alice:preload' not in ModelManager._tasks)
+    assert not memory.cancelled
+    assert not memory._future.done()
+    memory.cancel()